@@ -0,0 +1,69 @@
+import copy
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from oauth2_provider.contrib.rest_framework import OAuth2Authentication
+from rest_framework import exceptions
+
+from apps.authentication.caches import token_cache, token_user_versions
+
+# set on the user by ModelBackend, they must not travel to the next request
+PERMISSION_CACHE_ATTRIBUTES = ('_perm_cache', '_user_perm_cache', '_group_perm_cache')
+
+
+class CachedOAuth2Authentication(OAuth2Authentication):
+    """
+    OAuth2 bearer token authentication which keeps validated tokens in an
+    in-process LRU cache, so a warm request neither loads the token nor its
+    user.
+
+    A cached token is used until it expires, but at most for
+    ``OAUTH2_TOKEN_CACHE_TTL`` seconds: a token revoked through another
+    process keeps working for that long. The user of a cached token always
+    is current: with a shared cache a change of the user bumps its version
+    there, without one the user is loaded again for every request. Tokens of
+    inactive users are rejected.
+    """
+
+    def authenticate(self, request):
+        scheme, _, token = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+        if scheme.lower() != 'bearer' or not token:
+            return super().authenticate(request)
+        checksum = hashlib.sha256(token.encode('utf-8')).hexdigest()
+        if (cached := token_cache.get(checksum)) is not None:
+            user, access_token, version = cached
+            if (user := self.current_user(user, version)) is not None:
+                return self.check_active(user), access_token
+            token_cache.delete(checksum)
+        result = super().authenticate(request)
+        if result is not None:
+            user, access_token = result
+            self.check_active(user)
+            version = token_user_versions.version(user.pk) if settings.SHARED_CACHE else None
+            expires_at = min(access_token.expires.timestamp(), time.time() + settings.OAUTH2_TOKEN_CACHE_TTL)
+            token_cache.set(checksum, (self.detach(user), access_token, version), expires_at)
+        return result
+
+    @staticmethod
+    def current_user(user, version: str | None):
+        # None when the cached copy is outdated or the user is gone
+        if not settings.SHARED_CACHE:
+            return get_user_model()._default_manager.filter(pk=user.pk).first()
+        if token_user_versions.version(user.pk) == version:
+            return copy.copy(user)
+        return None
+
+    @staticmethod
+    def check_active(user):
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        return user
+
+    @staticmethod
+    def detach(user):
+        user = copy.copy(user)
+        for attribute in PERMISSION_CACHE_ATTRIBUTES:
+            user.__dict__.pop(attribute, None)
+        return user
@@ -0,0 +1,23 @@
+from django.contrib.auth.backends import ModelBackend
+
+from apps.authentication.caches import permission_cache
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend which keeps the permission set of a user in the cache
+    between requests. ``ModelBackend`` only caches it on the user object,
+    which is loaded again for every request. Only enabled with a cache
+    shared by all workers, see ``SHARED_CACHE`` in the settings.
+    """
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, '_perm_cache'):
+            permissions = permission_cache.get(user_obj.pk)
+            if permissions is None:
+                permissions = super().get_all_permissions(user_obj)
+                permission_cache.set(user_obj.pk, user_obj.pk, permissions)
+            user_obj._perm_cache = permissions
+        return user_obj._perm_cache
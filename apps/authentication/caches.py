@@ -0,0 +1,14 @@
+from django.conf import settings
+
+from apps.shared.cache import ExpiringLRUCache, VersionedCache
+
+# permission sets of ModelBackend by user id, bumped by the signals in
+# apps.authentication.signals
+permission_cache = VersionedCache('user-permissions', 'AUTH_PERMISSION_CACHE_TTL')
+
+# validated OAuth2 access tokens by token checksum, per process
+token_cache = ExpiringLRUCache(settings.OAUTH2_TOKEN_CACHE_SIZE)
+
+# with a shared cache, a version per user which every cached token of the
+# user carries, bumped by the signals in apps.authentication.signals
+token_user_versions = VersionedCache('token-users', 'OAUTH2_TOKEN_CACHE_TTL')
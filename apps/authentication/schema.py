@@ -0,0 +1,9 @@
+from drf_spectacular.extensions import OpenApiAuthenticationExtension
+
+
+class CachedOAuth2AuthenticationScheme(OpenApiAuthenticationExtension):
+    target_class = 'apps.authentication.authentication.CachedOAuth2Authentication'
+    name = 'oauth2'
+
+    def get_security_definition(self, auto_schema):
+        return {'type': 'http', 'scheme': 'bearer'}
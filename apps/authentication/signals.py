@@ -0,0 +1,67 @@
+from django.contrib.auth.models import Group, Permission
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from oauth2_provider.models import AccessToken
+
+from apps.authentication.caches import permission_cache, token_cache, token_user_versions
+from apps.authentication.models import UserProfile
+
+# pk_set is not passed on clear, so the members are read before they are gone
+CHANGING_ACTIONS = ('post_add', 'post_remove', 'pre_clear')
+
+
+@receiver(m2m_changed, sender=UserProfile.user_permissions.through)
+@receiver(m2m_changed, sender=UserProfile.groups.through)
+def user_memberships_changed(sender, instance, action, reverse, pk_set, using, **kwargs):
+    # forward: user.groups / user.user_permissions, reverse: group.user_set / permission.user_set
+    if action not in CHANGING_ACTIONS:
+        return
+    if not reverse:
+        user_ids = [instance.pk]
+    elif pk_set is None:
+        user_ids = instance.user_set.values_list('pk', flat=True)
+    else:
+        user_ids = pk_set
+    permission_cache.bump(*user_ids, using=using)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(sender, instance, action, reverse, pk_set, using, **kwargs):
+    # forward: group.permissions, reverse: permission.group_set
+    if action not in CHANGING_ACTIONS:
+        return
+    if not reverse:
+        users = instance.user_set.all()
+    elif pk_set is None:
+        users = UserProfile.objects.filter(groups__permissions=instance)
+    else:
+        users = UserProfile.objects.filter(groups__in=pk_set)
+    permission_cache.bump(*users.values_list('pk', flat=True).distinct(), using=using)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def user_changed(sender, instance, using, **kwargs):
+    # is_active and is_superuser change the permission set as well, the
+    # cached tokens hold a copy of the user
+    permission_cache.bump(instance.pk, using=using)
+    token_user_versions.bump(instance.pk, using=using)
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleted(sender, instance, using, **kwargs):
+    permission_cache.bump(*instance.user_set.values_list('pk', flat=True), using=using)
+
+
+@receiver(pre_delete, sender=Permission)
+def permission_deleted(sender, instance, using, **kwargs):
+    users = UserProfile.objects.filter(Q(user_permissions=instance) | Q(groups__permissions=instance))
+    permission_cache.bump(*users.values_list('pk', flat=True).distinct(), using=using)
+
+
+@receiver(post_save, sender=AccessToken)
+@receiver(post_delete, sender=AccessToken)
+def access_token_changed(sender, instance, **kwargs):
+    # revoke() deletes the token, only this process notices right away
+    token_cache.delete(instance.token_checksum)
@@ -1 +1,261 @@
-# Create your tests here.
+import datetime
+import tempfile
+import time
+
+from unittest import skipIf
+
+from django.conf import settings
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from oauth2_provider.models import AccessToken, Application
+from rest_framework import status
+
+from apps.authentication.caches import token_cache
+from apps.authentication.models import UserProfile, Organization
+from apps.core.models import Company, Queue
+
+USERNAME = 'me'
+PASSWORD = '<PASSWORD>'
+# what config.settings picks when a shared cache backend is configured
+SHARED_CACHE_SETTINGS = {
+    'SHARED_CACHE': True,
+    'AUTHENTICATION_BACKENDS': ('apps.authentication.backends.CachedModelBackend',),
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+}
+
+
+@override_settings(**SHARED_CACHE_SETTINGS)
+class PermissionCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.organization = Organization.objects.create(name='my_organization')
+        self.me = UserProfile.objects.create(username=USERNAME, organization=self.organization)
+        self.me.set_password(PASSWORD)
+        self.me.save()
+        self.view_queue = Permission.objects.get(codename='view_queue')
+        self.group = Group.objects.create(name='viewers')
+
+    def has_perm(self, perm: str = 'core.view_queue') -> bool:
+        # a fresh user object, like every request loads one
+        return UserProfile.objects.get(pk=self.me.pk).has_perm(perm)
+
+    def test_warm_request__one_auth_query(self):
+        self.me.user_permissions.add(self.view_queue)
+        self.client.login(username=USERNAME, password=PASSWORD)
+        self.client.get('/api/queues/')
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/queues/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        queries = [query['sql'] for query in context.captured_queries if '"core_' not in query['sql']]
+        # the user, no session and no permission lookup
+        self.assertEqual(len(queries), 1, '\n'.join(queries))
+        self.assertIn('"authentication_userprofile"', queries[0])
+
+    def test_permission_set__cached(self):
+        self.assertFalse(self.has_perm())
+        user = UserProfile.objects.get(pk=self.me.pk)
+        with self.assertNumQueries(0):
+            self.assertFalse(user.has_perm('core.view_queue'))
+
+    def test_user_permissions__invalidate(self):
+        self.assertFalse(self.has_perm())
+        self.me.user_permissions.add(self.view_queue)
+        self.assertTrue(self.has_perm())
+        self.me.user_permissions.remove(self.view_queue)
+        self.assertFalse(self.has_perm())
+        self.view_queue.user_set.add(self.me)
+        self.assertTrue(self.has_perm())
+        self.view_queue.user_set.clear()
+        self.assertFalse(self.has_perm())
+
+    def test_groups__invalidate(self):
+        self.group.permissions.add(self.view_queue)
+        self.assertFalse(self.has_perm())
+        self.me.groups.add(self.group)
+        self.assertTrue(self.has_perm())
+        self.group.permissions.clear()
+        self.assertFalse(self.has_perm())
+        self.view_queue.group_set.add(self.group)
+        self.assertTrue(self.has_perm())
+        self.group.user_set.clear()
+        self.assertFalse(self.has_perm())
+        self.group.user_set.add(self.me)
+        self.assertTrue(self.has_perm())
+        self.group.delete()
+        self.assertFalse(self.has_perm())
+
+    def test_user__invalidates(self):
+        self.assertFalse(self.has_perm())
+        self.me.is_superuser = True
+        self.me.save()
+        self.assertTrue(self.has_perm())
+        self.me.is_active = False
+        self.me.save()
+        self.assertFalse(self.has_perm())
+
+
+@override_settings(**SHARED_CACHE_SETTINGS)
+class TokenAuthenticationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.organization = Organization.objects.create(name='my_organization')
+        self.me = UserProfile.objects.create(username=USERNAME, organization=self.organization)
+        self.me.user_permissions.add(Permission.objects.get(codename='view_queue'))
+        self.application = Application.objects.create(
+            name='kiosk',
+            client_type=Application.CLIENT_CONFIDENTIAL,
+            authorization_grant_type=Application.GRANT_CLIENT_CREDENTIALS,
+            user=self.me,
+        )
+        self.token = self.create_token('token', datetime.timedelta(hours=1))
+        self.headers = {'Authorization': 'Bearer token'}
+
+    def create_token(self, token: str, expires_in: datetime.timedelta) -> AccessToken:
+        return AccessToken.objects.create(
+            user=self.me, application=self.application, token=token,
+            expires=timezone.now() + expires_in, scope='read write',
+        )
+
+    def test_bearer_token(self):
+        response = self.client.get('/api/queues/', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/queues/', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        queries = [query['sql'] for query in context.captured_queries if '"core_' not in query['sql']]
+        self.assertEqual(queries, [])
+
+    def test_bearer_token__no_csrf(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='add_company'))
+        client = Client(enforce_csrf_checks=True)
+
+        response = client.post('/api/companies/', data={'name': 'Alpha Corp'}, headers=self.headers, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+
+    def test_bearer_token__invalid(self):
+        response = self.client.get('/api/queues/', headers={'Authorization': 'Bearer unknown'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bearer_token__revoked(self):
+        self.client.get('/api/queues/', headers=self.headers)
+        self.token.revoke()
+
+        response = self.client.get('/api/queues/', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bearer_token__expires(self):
+        self.create_token('short', datetime.timedelta(seconds=1))
+        headers = {'Authorization': 'Bearer short'}
+        self.assertEqual(self.client.get('/api/queues/', headers=headers).status_code, status.HTTP_200_OK)
+
+        time.sleep(1.1)
+        self.assertEqual(self.client.get('/api/queues/', headers=headers).status_code, status.HTTP_403_FORBIDDEN)
+
+    def assert_deactivated_user_rejected(self):
+        self.assertEqual(self.client.get('/api/queues/', headers=self.headers).status_code, status.HTTP_200_OK)
+        self.me.is_active = False
+        self.me.save()
+
+        # SessionAuthentication comes first, so DRF answers failed authentication with 403
+        response = self.client.get('/api/queues/', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.json()['detail'], 'User inactive or deleted.')
+
+    def test_bearer_token__user_deactivated(self):
+        self.assert_deactivated_user_rejected()
+
+    @override_settings(SHARED_CACHE=False)
+    def test_bearer_token__user_deactivated__local_cache(self):
+        self.assert_deactivated_user_rejected()
+
+    def test_bearer_token__user_changes_organization(self):
+        company = Company.objects.create(name='my_company', organization=self.organization)
+        Queue.objects.create(name='my_queue', company=company)
+        response = self.client.get('/api/queues/', headers=self.headers)
+        self.assertEqual(len(response.json()['results']), 1)
+
+        self.me.organization = Organization.objects.create(name='other_organization')
+        self.me.save()
+        response = self.client.get('/api/queues/', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['results'], [])
+
+    def test_bearer_token__user_deleted(self):
+        self.client.get('/api/queues/', headers=self.headers)
+        self.application.delete()
+        self.me.delete()
+
+        response = self.client.get('/api/queues/', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bearer_token__permissions_stay_current(self):
+        self.client.get('/api/queues/', headers=self.headers)
+        self.me.user_permissions.clear()
+
+        response = self.client.get('/api/queues/', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class WorkerCacheTests(TestCase):
+    """
+    Two workers with a cache instance each, a logout or a permission change
+    in one of them has to reach the other.
+    """
+
+    def setUp(self):
+        self.organization = Organization.objects.create(name='my_organization')
+        self.me = UserProfile.objects.create(username=USERNAME, organization=self.organization)
+        self.me.set_password(PASSWORD)
+        self.me.save()
+        self.view_queue = Permission.objects.get(codename='view_queue')
+        self.me.user_permissions.add(self.view_queue)
+
+    @staticmethod
+    def worker(backend: str, location: str) -> override_settings:
+        # a new cache instance every time, like the cache client of another process
+        return override_settings(CACHES={'default': {'BACKEND': backend, 'LOCATION': location}})
+
+    def assert_changes_reach_both(self, first: override_settings, second: override_settings):
+        for worker in (first, second):
+            with worker:
+                cache.clear()
+        with first:
+            self.client.login(username=USERNAME, password=PASSWORD)
+            self.assertEqual(self.client.get('/api/queues/').status_code, status.HTTP_200_OK)
+        with second:
+            self.assertEqual(self.client.get('/api/queues/').status_code, status.HTTP_200_OK)
+
+        with first:
+            self.me.user_permissions.remove(self.view_queue)
+        with second:
+            self.assertEqual(self.client.get('/api/queues/').status_code, status.HTTP_403_FORBIDDEN)
+        with first:
+            self.me.user_permissions.add(self.view_queue)
+        with second:
+            self.assertEqual(self.client.get('/api/queues/').status_code, status.HTTP_200_OK)
+
+        with first:
+            self.client.post('/api/auth/logout/')
+        with second:
+            self.assertEqual(self.client.get('/api/queues/').status_code, status.HTTP_403_FORBIDDEN)
+
+    @skipIf(settings.SHARED_CACHE, 'a shared cache backend is configured')
+    def test_local_memory_caches(self):
+        backend = settings.CACHES['default']['BACKEND']
+        self.assert_changes_reach_both(self.worker(backend, 'worker-1'), self.worker(backend, 'worker-2'))
+
+    @override_settings(**SHARED_CACHE_SETTINGS)
+    def test_shared_cache(self):
+        # the file system stands in for Redis or Memcached
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        backend = 'django.core.cache.backends.filebased.FileBasedCache'
+        self.assert_changes_reach_both(self.worker(backend, directory), self.worker(backend, directory))
@@ -0,0 +1,109 @@
+import asyncio
+import datetime
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+
+from apps.core.models import QueueEvent
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+
+    def __init__(self, queue_id: int):
+        self.queue_id = queue_id
+        self.events: asyncio.Queue[QueueEvent | None] = asyncio.Queue(maxsize=settings.QUEUE_EVENTS_BUFFER_SIZE)
+
+    def deliver(self, event: QueueEvent | None) -> None:
+        try:
+            self.events.put_nowait(event)
+        except asyncio.QueueFull:
+            # the client is too slow, end its stream so it reconnects with Last-Event-ID
+            self.events.get_nowait()
+            self.events.put_nowait(None)
+
+
+class QueueEventHub:
+    """
+    Fans QueueEvent rows out to the SSE streams of this process.
+
+    The QueueEvent table is the channel between workers: every process runs
+    one poller (only while it has subscribers) that reads the rows written
+    since its last poll. Saves in the same process wake the poller directly.
+    """
+
+    def __init__(self):
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock: asyncio.Lock | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._subscriptions: dict[int, set[Subscription]] = defaultdict(set)
+        self._last_id = 0
+        self._last_prune: datetime.datetime | None = None
+
+    async def subscribe(self, queue_id: int) -> Subscription:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._reset(loop)
+        async with self._lock:
+            if self._task is None or self._task.done():
+                state = await QueueEvent.objects.aaggregate(last_id=Max('id'))
+                self._last_id = state['last_id'] or 0
+                self._task = loop.create_task(self._poll())
+            subscription = Subscription(queue_id)
+            self._subscriptions[queue_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.queue_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.queue_id]
+
+    def notify(self) -> None:
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wakeup.set)
+
+    def _reset(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._subscriptions = defaultdict(set)
+
+    async def _poll(self) -> None:
+        while self._subscriptions:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.QUEUE_EVENTS_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self._dispatch()
+                await self._prune()
+            except Exception:
+                logger.exception('Polling queue events failed')
+
+    async def _dispatch(self) -> None:
+        events = QueueEvent.objects.filter(id__gt=self._last_id).order_by('id')
+        async for event in events[:settings.QUEUE_EVENTS_BUFFER_SIZE]:
+            self._last_id = event.id
+            for subscription in list(self._subscriptions.get(event.queue_id, ())):
+                subscription.deliver(event)
+
+    async def _prune(self) -> None:
+        now = timezone.now()
+        if self._last_prune is not None and now - self._last_prune < datetime.timedelta(minutes=1):
+            return
+        self._last_prune = now
+        retention = datetime.timedelta(seconds=settings.QUEUE_EVENTS_RETENTION)
+        await QueueEvent.objects.filter(created_at__lt=now - retention).adelete()
+
+
+hub = QueueEventHub()
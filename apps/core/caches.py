@@ -0,0 +1,5 @@
+from apps.shared.cache import VersionedCache
+
+# responses of /api/queue-entries/{id}/public/ grouped by queue, a new or
+# closed entry moves the position of every other entry of its queue
+public_entry_cache = VersionedCache('queue-entry-public', 'QUEUE_ENTRY_PUBLIC_CACHE_TTL')
@@ -0,0 +1,40 @@
+import datetime
+import time
+from argparse import ArgumentParser
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.authentication.models import Organization
+from apps.core.models import QueueEntryArchive
+
+
+class Command(BaseCommand):
+    help = (
+        'Moves closed queue entries older than --days into the archive table, in short '
+        'transactions of --batch-size rows with a --pause in between so writers are not blocked.'
+    )
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument(
+            '--days', type=int, default=settings.QUEUE_ENTRY_ARCHIVE_AFTER_DAYS,
+            help='archive entries that started and were closed more than this many days ago'
+        )
+        parser.add_argument('--batch-size', type=int, default=500, help='rows per transaction')
+        parser.add_argument('--pause', type=float, default=0.1, help='seconds to sleep between two batches')
+
+    def handle(self, *args, **options) -> None:
+        closed_before = timezone.now() - datetime.timedelta(days=options['days'])
+        total = 0
+        for organization_id in Organization.objects.order_by('id').values_list('id', flat=True):
+            after = None
+            while True:
+                archived, after = QueueEntryArchive.objects.archive(
+                    organization_id, closed_before, options['batch_size'], after
+                )
+                total += archived
+                if after is None:
+                    break
+                time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {total} queue entries closed before {closed_before:%Y-%m-%d %H:%M}'))
@@ -0,0 +1,53 @@
+import datetime
+from argparse import ArgumentParser
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.models import QueueDailyStats, QueueEntry, QueueEntryArchive
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuilds the daily wait time stats from the closed and archived queue entries. '
+        'Entries closed while the rebuild runs may be missed, rerun it for their days.'
+    )
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument('--queue', type=int, help='only rebuild this queue')
+        parser.add_argument('--from', dest='start', type=datetime.date.fromisoformat, help='first day, YYYY-mm-dd')
+        parser.add_argument('--to', dest='end', type=datetime.date.fromisoformat, help='last day, YYYY-mm-dd')
+
+    def handle(self, *args, **options) -> None:
+        # archived entries are history too
+        sources = [QueueEntry.objects.filter(end_waiting__isnull=False), QueueEntryArchive.objects.all()]
+        stale = QueueDailyStats.objects.all()
+        if options['queue']:
+            sources = [entries.filter(queue_id=options['queue']) for entries in sources]
+            stale = stale.filter(queue_id=options['queue'])
+        if options['start']:
+            sources = [entries.filter(start_waiting__gte=self.day_start(options['start'])) for entries in sources]
+            stale = stale.filter(day__gte=options['start'])
+        if options['end']:
+            end = self.day_start(options['end'] + datetime.timedelta(days=1))
+            sources = [entries.filter(start_waiting__lt=end) for entries in sources]
+            stale = stale.filter(day__lte=options['end'])
+
+        rows: dict[tuple[int, datetime.date], QueueDailyStats] = {}
+        for entries in sources:
+            values = entries.order_by().values_list('queue_id', 'start_waiting', 'end_waiting')
+            for queue_id, start_waiting, end_waiting in values.iterator(chunk_size=5000):
+                key = (queue_id, timezone.localdate(start_waiting))
+                if key not in rows:
+                    rows[key] = QueueDailyStats(queue_id=queue_id, day=key[1])
+                rows[key].add([(end_waiting - start_waiting).total_seconds()])
+
+        with transaction.atomic():
+            stale.delete()
+            QueueDailyStats.objects.bulk_create(rows.values(), batch_size=500)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(rows)} daily stats rows'))
+
+    @staticmethod
+    def day_start(day: datetime.date) -> datetime.datetime:
+        return datetime.datetime.combine(day, datetime.time.min, tzinfo=timezone.get_current_timezone())
@@ -4,6 +4,17 @@ import uuid
 from django.db import migrations, models
 
 
+class AlterIdToUUID(migrations.AlterField):
+    # PostgreSQL cannot cast bigint to uuid, derive the uuid from the old id
+    # and drop the identity of the column first
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        table = schema_editor.quote_name(to_state.apps.get_model(app_label, self.model_name)._meta.db_table)
+        schema_editor.execute(f'ALTER TABLE {table} ALTER COLUMN "id" DROP IDENTITY IF EXISTS')
+        schema_editor.execute(f'ALTER TABLE {table} ALTER COLUMN "id" TYPE uuid USING lpad(to_hex("id"), 32, \'0\')::uuid')
+
+
 class Migration(migrations.Migration):
 
     dependencies = [
@@ -11,7 +22,7 @@ class Migration(migrations.Migration):
     ]
 
     operations = [
-        migrations.AlterField(
+        AlterIdToUUID(
             model_name='queueentry',
             name='id',
             field=models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False),
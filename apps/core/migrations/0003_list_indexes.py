@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-18 16:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_alter_userprofile_managers'),
+        ('core', '0002_alter_queueentry_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['organization', 'name'], name='core_company_org_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='queue',
+            index=models.Index(fields=['company', 'name'], name='core_queue_company_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='queueentry',
+            index=models.Index(fields=['queue', 'start_waiting', 'id'], name='core_qe_queue_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='queueentry',
+            index=models.Index(condition=models.Q(('end_waiting__isnull', True)), fields=['queue', 'start_waiting', 'id'], name='core_qe_queue_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='queueentry',
+            index=models.Index(fields=['start_waiting', 'id'], name='core_qe_start_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 16:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='queue',
+            name='avg_service_seconds',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='queue',
+            name='last_closed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
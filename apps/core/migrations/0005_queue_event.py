@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-18 16:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_queue_service_time'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueueEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entry_id', models.UUIDField()),
+                ('kind', models.CharField(choices=[('entry-created', 'entry-created'), ('entry-closed', 'entry-closed')], max_length=32)),
+                ('start_waiting', models.DateTimeField()),
+                ('end_waiting', models.DateTimeField(blank=True, null=True)),
+                ('avg_service_seconds', models.FloatField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('queue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.queue')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['queue', 'id'], name='core_queueevent_queue_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,71 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_organization(apps, schema_editor):
+    Company = apps.get_model('core', 'Company')
+    Queue = apps.get_model('core', 'Queue')
+    QueueEntry = apps.get_model('core', 'QueueEntry')
+    Queue.objects.update(organization_id=Subquery(
+        Company.objects.filter(id=OuterRef('company_id')).values('organization_id')[:1]
+    ))
+    QueueEntry.objects.update(organization_id=Subquery(
+        Queue.objects.filter(id=OuterRef('queue_id')).values('organization_id')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_alter_userprofile_managers'),
+        ('core', '0005_queue_event'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='queue',
+            name='organization',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, to='authentication.organization'),
+        ),
+        migrations.AddField(
+            model_name='queueentry',
+            name='organization',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, to='authentication.organization'),
+        ),
+        migrations.RunPython(backfill_organization, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='queue',
+            name='organization',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.PROTECT, to='authentication.organization'),
+        ),
+        migrations.AlterField(
+            model_name='queueentry',
+            name='organization',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.PROTECT, to='authentication.organization'),
+        ),
+        migrations.AddIndex(
+            model_name='queue',
+            index=models.Index(fields=['organization', 'name'], name='core_queue_org_name_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='queueentry',
+            name='core_qe_start_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='queueentry',
+            name='core_qe_queue_start_idx',
+        ),
+        migrations.AddIndex(
+            model_name='queueentry',
+            index=models.Index(fields=['organization', 'start_waiting', 'id'], name='core_qe_org_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='queueentry',
+            index=models.Index(fields=['organization', 'queue', 'start_waiting', 'id'], name='core_qe_org_queue_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='queueentry',
+            index=models.Index(condition=models.Q(('end_waiting__isnull', True)), fields=['organization', 'queue', 'start_waiting', 'id'], name='core_qe_org_queue_open_idx'),
+        ),
+    ]
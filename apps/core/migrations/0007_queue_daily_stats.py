@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-18 17:06
+
+import apps.core.models.queue_daily_stats
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_organization'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueueDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('wait_seconds_sum', models.FloatField(default=0)),
+                ('max_wait_seconds', models.FloatField(default=0)),
+                ('buckets', models.JSONField(default=apps.core.models.queue_daily_stats.empty_buckets)),
+                ('queue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.queue')),
+            ],
+            options={
+                'verbose_name_plural': 'queue daily stats',
+                'ordering': ['queue', 'day'],
+                'constraints': [models.UniqueConstraint(fields=('queue', 'day'), name='core_queuedailystats_queue_day_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 17:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_alter_userprofile_managers'),
+        ('core', '0007_queue_daily_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueueEntryArchive',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('description', models.TextField()),
+                ('start_waiting', models.DateTimeField()),
+                ('end_waiting', models.DateTimeField()),
+                ('organization', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, to='authentication.organization')),
+                ('queue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.queue')),
+            ],
+            options={
+                'ordering': ['start_waiting'],
+                'indexes': [models.Index(fields=['organization', 'start_waiting', 'id'], name='core_qea_org_start_idx'), models.Index(fields=['organization', 'queue', 'start_waiting', 'id'], name='core_qea_org_queue_start_idx')],
+            },
+        ),
+    ]
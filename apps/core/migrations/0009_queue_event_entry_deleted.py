@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 18:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_queue_entry_archive'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='queueevent',
+            name='kind',
+            field=models.CharField(choices=[('entry-created', 'entry-created'), ('entry-closed', 'entry-closed'), ('entry-deleted', 'entry-deleted')], max_length=32),
+        ),
+    ]
@@ -1,3 +1,6 @@
 from apps.core.models.company import Company
 from apps.core.models.queue import Queue
+from apps.core.models.queue_daily_stats import QueueDailyStats
 from apps.core.models.queue_entries import QueueEntry
+from apps.core.models.queue_entry_archive import QueueEntryArchive
+from apps.core.models.queue_event import QueueEvent
@@ -1,8 +1,15 @@
-from django.db import models
+from django.db import models, transaction
 
 from config.middlewares import get_current_user
 
 
+def get_current_username() -> str:
+    current_user = get_current_user()
+    if current_user is not None and current_user.username:
+        return current_user.username
+    return 'unknown user'
+
+
 class AuditableModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
@@ -23,21 +30,30 @@ class AuditableModel(models.Model):
         using=None,
         update_fields=None
     ):
-        current_user = get_current_user()
-        if current_user is not None and current_user.username:
-            username = current_user.username
-        else:
-            username = 'unknown user'
-
-        if self.id is None or force_insert:
-            self.created_by = username
-        self.updated_by = username
+        self.set_audit_fields(get_current_username(), adding=self._state.adding or force_insert)
         super().save(
             force_insert=force_insert,
             force_update=force_update,
             using=using,
             update_fields=update_fields
         )
+        self.changed(using)
+
+    def delete(self, using=None, keep_parents=False):
+        # the primary key is gone after the delete, changed() runs before
+        # it and can defer its work to the commit
+        with transaction.atomic(using=using, savepoint=False):
+            self.changed(using)
+            return super().delete(using=using, keep_parents=keep_parents)
+
+    def changed(self, using: str | None) -> None:
+        # runs after every save and before every delete, e.g. to invalidate caches
+        pass
+
+    def set_audit_fields(self, username: str, adding: bool) -> None:
+        if adding:
+            self.created_by = username
+        self.updated_by = username
 
     def __str__(self):
         return f'{self.__class__.__name__}: {self.id}'
@@ -1,4 +1,6 @@
-from django.db import models
+from contextlib import nullcontext
+
+from django.db import models, transaction
 
 from apps.core.models.abstracts import AuditableModel
 
@@ -7,8 +9,34 @@ class Company(AuditableModel):
     name = models.CharField(max_length=255)
     organization = models.ForeignKey('authentication.Organization', on_delete=models.PROTECT)
 
+    _loaded_organization_id = None
+
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_organization_id = instance.__dict__.get('organization_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        from apps.core.models.queue import Queue
+        from apps.core.models.queue_entries import QueueEntry
+        from apps.core.models.queue_entry_archive import QueueEntryArchive
+
+        # queues and their entries carry a copy of the organization
+        moved = not self._state.adding and self._loaded_organization_id not in (None, self.organization_id)
+        with transaction.atomic(using=kwargs.get('using')) if moved else nullcontext():
+            super().save(*args, **kwargs)
+            if moved:
+                Queue.objects.filter(company=self).update(organization_id=self.organization_id)
+                QueueEntry.objects.filter(queue__company=self).update(organization_id=self.organization_id)
+                QueueEntryArchive.objects.filter(queue__company=self).update(organization_id=self.organization_id)
+        self._loaded_organization_id = self.organization_id
+
     class Meta:
         ordering = ('name',)
+        indexes = [
+            models.Index(fields=['organization', 'name'], name='core_company_org_name_idx'),
+        ]
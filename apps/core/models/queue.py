@@ -1,14 +1,88 @@
-from django.db import models
+import datetime
+from contextlib import nullcontext
 
+from django.conf import settings
+from django.db import models, transaction
+
+from apps.core.caches import public_entry_cache
 from apps.core.models.abstracts import AuditableModel
 
 
+class QueueManager(models.Manager):
+
+    def record_service(self, queue_id: int, closed_at: datetime.datetime) -> float | None:
+        # Exponentially weighted moving average of the time between two
+        # closed entries, i.e. how long the desks of this queue need per
+        # customer. Gaps longer than QUEUE_SERVICE_TIME_MAX_GAP (breaks,
+        # nights) only move the reference point. The update is a
+        # compare-and-set on last_closed_at and is retried on conflict.
+        smoothing = settings.QUEUE_SERVICE_TIME_SMOOTHING
+        for _ in range(3):
+            state = self.filter(pk=queue_id).values('avg_service_seconds', 'last_closed_at').first()
+            if state is None:
+                return None
+            last_closed_at = state['last_closed_at']
+            average = state['avg_service_seconds']
+            if last_closed_at is not None and closed_at < last_closed_at:
+                return average
+            if last_closed_at is not None:
+                interval = (closed_at - last_closed_at).total_seconds()
+                if interval <= settings.QUEUE_SERVICE_TIME_MAX_GAP:
+                    average = interval if average is None else smoothing * interval + (1 - smoothing) * average
+            updated = self.filter(pk=queue_id, last_closed_at=last_closed_at).update(
+                avg_service_seconds=average, last_closed_at=closed_at
+            )
+            if updated:
+                return average
+        return average
+
+
 class Queue(AuditableModel):
     name = models.CharField(max_length=255)
     company = models.ForeignKey('Company', on_delete=models.CASCADE)
+    # copy of company.organization, so tenant scoping needs no join
+    organization = models.ForeignKey(
+        'authentication.Organization', on_delete=models.PROTECT, editable=False, db_index=False
+    )
+    avg_service_seconds = models.FloatField(null=True, blank=True, editable=False)
+    last_closed_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = QueueManager()
+
+    _loaded_company_id = None
+    _loaded_organization_id = None
 
     def __str__(self):
         return f'{self.company.name}: {self.name}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_company_id = instance.__dict__.get('company_id')
+        instance._loaded_organization_id = instance.__dict__.get('organization_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        from apps.core.models.queue_entries import QueueEntry
+        from apps.core.models.queue_entry_archive import QueueEntryArchive
+
+        if self.organization_id is None or self.company_id != self._loaded_company_id:
+            self.organization_id = self.company.organization_id
+        moved = not self._state.adding and self._loaded_organization_id not in (None, self.organization_id)
+        with transaction.atomic(using=kwargs.get('using')) if moved else nullcontext():
+            super().save(*args, **kwargs)
+            if moved:
+                QueueEntry.objects.filter(queue=self).update(organization_id=self.organization_id)
+                QueueEntryArchive.objects.filter(queue=self).update(organization_id=self.organization_id)
+        self._loaded_company_id = self.company_id
+        self._loaded_organization_id = self.organization_id
+
+    def changed(self, using: str | None) -> None:
+        public_entry_cache.bump(self.pk, using=using)
+
     class Meta:
         ordering = ('name',)
+        indexes = [
+            models.Index(fields=['company', 'name'], name='core_queue_company_name_idx'),
+            models.Index(fields=['organization', 'name'], name='core_queue_org_name_idx'),
+        ]
@@ -0,0 +1,143 @@
+import datetime
+from bisect import bisect_right
+from collections import defaultdict
+
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+
+# upper bounds in seconds of the wait time histogram buckets, the last bucket
+# takes everything above
+WAIT_BUCKET_BOUNDS = (
+    30, 60, 120, 180, 300, 450, 600, 900, 1200, 1800, 2700, 3600,
+    5400, 7200, 10800, 14400, 21600, 28800, 43200, 86400,
+)
+
+
+def empty_buckets() -> list[int]:
+    return [0] * (len(WAIT_BUCKET_BOUNDS) + 1)
+
+
+def wait_percentile(buckets: list[int], count: int, max_wait_seconds: float, q: float) -> float | None:
+    # linear interpolation inside the bucket holding the q-th wait
+    if not count:
+        return None
+    rank = q * count
+    seen = 0
+    for index, bucket_count in enumerate(buckets):
+        if bucket_count and seen + bucket_count >= rank:
+            lower = WAIT_BUCKET_BOUNDS[index - 1] if index else 0
+            upper = WAIT_BUCKET_BOUNDS[index] if index < len(WAIT_BUCKET_BOUNDS) else max_wait_seconds
+            value = lower + (upper - lower) * (rank - seen) / bucket_count
+            return min(value, max_wait_seconds)
+        seen += bucket_count
+    return max_wait_seconds
+
+
+class QueueDailyStatsManager(models.Manager):
+
+    def record(self, entries: list, removed: list[tuple] = ()) -> None:
+        # removed: (queue_id, start_waiting, end_waiting) of waits recorded
+        # before, of entries since edited, reopened or deleted
+        waits = defaultdict(lambda: ([], []))
+        for entry in entries:
+            if entry.end_waiting is not None:
+                waits[(entry.queue_id, timezone.localdate(entry.start_waiting))][0].append(
+                    (entry.end_waiting - entry.start_waiting).total_seconds()
+                )
+        for queue_id, start_waiting, end_waiting in removed:
+            waits[(queue_id, timezone.localdate(start_waiting))][1].append((end_waiting - start_waiting).total_seconds())
+        for (queue_id, day), (seconds, removed_seconds) in waits.items():
+            self.add_waits(queue_id, day, seconds, removed_seconds)
+
+    def add_waits(self, queue_id: int, day: datetime.date, seconds: list[float], removed: list[float] = ()) -> None:
+        # read-modify-write under a lock, the histogram is a JSON column and
+        # cannot be incremented in SQL: the row lock on server databases, the
+        # write lock of the IMMEDIATE transaction on SQLite
+        with transaction.atomic(using=self.db, savepoint=False):
+            try:
+                stats = self.select_for_update().get(queue_id=queue_id, day=day)
+            except self.model.DoesNotExist:
+                if not seconds:
+                    # nothing recorded for the day, nothing to remove
+                    return
+                stats = self.model(queue_id=queue_id, day=day)
+                stats.add(seconds)
+                try:
+                    with transaction.atomic(using=self.db):
+                        stats.save(force_insert=True, using=self.db)
+                    return
+                except IntegrityError:
+                    # the first waits of the day were added concurrently
+                    stats = self.select_for_update().get(queue_id=queue_id, day=day)
+            stats.remove(removed)
+            stats.add(seconds)
+            stats.save(update_fields=['count', 'wait_seconds_sum', 'max_wait_seconds', 'buckets'], using=self.db)
+
+    def summarize(self, queue_id: int, start: datetime.date, end: datetime.date) -> dict:
+        total = QueueDailyStats(queue_id=queue_id)
+        days = []
+        for stats in self.filter(queue_id=queue_id, day__gte=start, day__lte=end).order_by('day'):
+            total.merge(stats)
+            days.append({'day': stats.day, **stats.summary()})
+        return {'queue': queue_id, 'from': start, 'to': end, **total.summary(), 'days': days}
+
+
+class QueueDailyStats(models.Model):
+    queue = models.ForeignKey('Queue', on_delete=models.CASCADE)
+    day = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+    wait_seconds_sum = models.FloatField(default=0)
+    max_wait_seconds = models.FloatField(default=0)
+    buckets = models.JSONField(default=empty_buckets)
+
+    objects = QueueDailyStatsManager()
+
+    def __str__(self):
+        return f'{self.queue_id}: {self.day}'
+
+    def add(self, seconds: list[float]) -> None:
+        waits = [wait if wait > 0 else 0 for wait in seconds]
+        if not waits:
+            return
+        self.count += len(waits)
+        self.wait_seconds_sum += sum(waits)
+        self.max_wait_seconds = max(self.max_wait_seconds, max(waits))
+        buckets = self.buckets
+        for wait in waits:
+            buckets[bisect_right(WAIT_BUCKET_BOUNDS, wait)] += 1
+
+    def remove(self, seconds: list[float]) -> None:
+        # max_wait_seconds cannot be taken back and stays an upper bound,
+        # rebuild_queue_stats recomputes it
+        waits = [wait if wait > 0 else 0 for wait in seconds]
+        if not waits:
+            return
+        self.count = max(self.count - len(waits), 0)
+        self.wait_seconds_sum = max(self.wait_seconds_sum - sum(waits), 0) if self.count else 0
+        if not self.count:
+            self.max_wait_seconds = 0
+        buckets = self.buckets
+        for wait in waits:
+            index = bisect_right(WAIT_BUCKET_BOUNDS, wait)
+            buckets[index] = max(buckets[index] - 1, 0)
+
+    def merge(self, other: 'QueueDailyStats') -> None:
+        self.count += other.count
+        self.wait_seconds_sum += other.wait_seconds_sum
+        self.max_wait_seconds = max(self.max_wait_seconds, other.max_wait_seconds)
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+    def summary(self) -> dict:
+        return {
+            'count': self.count,
+            'avg_wait_seconds': self.wait_seconds_sum / self.count if self.count else None,
+            'p50_wait_seconds': wait_percentile(self.buckets, self.count, self.max_wait_seconds, 0.5),
+            'p95_wait_seconds': wait_percentile(self.buckets, self.count, self.max_wait_seconds, 0.95),
+        }
+
+    class Meta:
+        ordering = ['queue', 'day']
+        verbose_name_plural = 'queue daily stats'
+        constraints = [
+            models.UniqueConstraint(fields=['queue', 'day'], name='core_queuedailystats_queue_day_uniq'),
+        ]
@@ -1,19 +1,235 @@
 import uuid
 
-from django.db import models
+from django.db import connections, models, transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
 
-from apps.core.models.abstracts import AuditableModel
+from apps.core.caches import public_entry_cache
+from apps.core.models.abstracts import AuditableModel, get_current_username
+
+
+def can_return_from_update(connection) -> bool:
+    # UPDATE ... RETURNING, PostgreSQL and SQLite 3.35+
+    return connection.vendor in ('postgresql', 'sqlite') and connection.features.can_return_columns_from_insert
+
+
+class QueueEntryManager(models.Manager):
+
+    def call_next(self, queue_id: int) -> 'QueueEntry | None':
+        # One transaction claims the first open entry and records the close,
+        # so the stats, the event and the entry are committed together.
+        # Server databases lock the candidate with SKIP LOCKED so concurrent
+        # callers pick different rows, SQLite runs the transaction IMMEDIATE
+        # and holds the write lock from the start.
+        connection = connections[self.db]
+        candidates = self.filter(queue_id=queue_id, end_waiting__isnull=True).order_by('start_waiting', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        with transaction.atomic(using=self.db):
+            now = timezone.now()
+            username = get_current_username()
+            if can_return_from_update(connection):
+                entry = self.claim(candidates, now, username)
+            else:
+                entry = candidates.first()
+                if entry is not None:
+                    self.filter(pk=entry.pk).update(end_waiting=now, updated_at=now, updated_by=username)
+                    entry.end_waiting = entry.updated_at = now
+                    entry.updated_by = username
+            if entry is None:
+                return None
+            entry._loaded_end_waiting = entry.end_waiting
+            self.record_closed([entry])
+        return entry
+
+    def claim(self, candidates: models.QuerySet, now, username: str) -> 'QueueEntry | None':
+        # UPDATE ... WHERE id = (SELECT ... LIMIT 1) RETURNING *, the select
+        # and the update in a single statement
+        connection = connections[self.db]
+        quote_name = connection.ops.quote_name
+        opts = self.model._meta
+        select, params = candidates.values('pk')[:1].query.get_compiler(self.db).as_sql()
+        column = {name: quote_name(opts.get_field(name).column) for name in ('end_waiting', 'updated_at', 'updated_by')}
+        timestamp = connection.ops.adapt_datetimefield_value(now)
+        sql = (
+            f'UPDATE {quote_name(opts.db_table)} '
+            f'SET {column["end_waiting"]} = %s, {column["updated_at"]} = %s, {column["updated_by"]} = %s '
+            f'WHERE {quote_name(opts.pk.column)} = ({select}) RETURNING *'
+        )
+        return next(iter(self.raw(sql, [timestamp, timestamp, username, *params])), None)
+
+    def create_many(self, values: list[dict], organization_ids: dict[int, int] | None = None) -> list['QueueEntry']:
+        # organization_ids maps queue ids to their organization, when the caller resolved them already
+        from apps.core.models.queue import Queue
+
+        username = get_current_username()
+        entries = [self.model(**value) for value in values]
+        if organization_ids is None:
+            organization_ids = dict(
+                Queue.objects.filter(id__in={entry.queue_id for entry in entries}).values_list('id', 'organization_id')
+            )
+        for entry in entries:
+            entry.organization_id = organization_ids.get(entry.queue_id)
+            entry.set_audit_fields(username, adding=True)
+        with transaction.atomic(using=self.db):
+            self.bulk_create(entries, batch_size=500)
+            self.record_created(entries)
+        return entries
+
+    def close_all(self, queue_id: int) -> list['QueueEntry']:
+        # Closing everything at once is a cleanup, not a service, so the
+        # service time average is left alone.
+        now = timezone.now()
+        username = get_current_username()
+        with transaction.atomic(using=self.db):
+            entries = self.filter(queue_id=queue_id, end_waiting__isnull=True)
+            if connections[self.db].features.has_select_for_update_skip_locked:
+                entries = entries.select_for_update(skip_locked=True)
+            entries = list(entries.only('id', 'queue_id', 'start_waiting'))
+            for offset in range(0, len(entries), 500):
+                self.filter(
+                    pk__in=[entry.pk for entry in entries[offset:offset + 500]],
+                    end_waiting__isnull=True,
+                ).update(end_waiting=now, updated_at=now, updated_by=username)
+            for entry in entries:
+                entry.end_waiting = now
+            self.record_closed(entries, served=False)
+        return entries
+
+    def record_created(self, entries: list['QueueEntry']) -> None:
+        from apps.core.models.queue_event import QueueEvent
+
+        public_entry_cache.bump(*{entry.queue_id for entry in entries}, using=self.db)
+        QueueEvent.objects.publish(QueueEvent.ENTRY_CREATED, entries)
+
+    def record_closed(self, entries: list['QueueEntry'], served: bool = True) -> None:
+        from apps.core.models.queue import Queue
+        from apps.core.models.queue_daily_stats import QueueDailyStats
+        from apps.core.models.queue_event import QueueEvent
+
+        averages = {}
+        for entry in sorted(entries, key=lambda e: e.end_waiting) if served else ():
+            averages[entry.queue_id] = Queue.objects.record_service(entry.queue_id, entry.end_waiting)
+        QueueDailyStats.objects.record(entries)
+        QueueEvent.objects.publish(QueueEvent.ENTRY_CLOSED, entries, averages)
+        public_entry_cache.bump(*{entry.queue_id for entry in entries}, using=self.db)
 
 
 class QueueEntry(AuditableModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     queue = models.ForeignKey('Queue', on_delete=models.CASCADE)
+    # copy of queue.organization, so tenant scoping needs no join
+    organization = models.ForeignKey(
+        'authentication.Organization', on_delete=models.PROTECT, editable=False, db_index=False
+    )
     description = models.TextField()
     start_waiting = models.DateTimeField(auto_now_add=True)
     end_waiting = models.DateTimeField(null=True, blank=True)
 
+    objects = QueueEntryManager()
+
+    _loaded_end_waiting = None
+    _loaded_start_waiting = None
+    _loaded_queue_id = None
+
     def __str__(self):
         return f'{self.queue} - [{self.start_waiting} - {self.end_waiting or ""}]'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_end_waiting = instance.__dict__.get('end_waiting', models.DEFERRED)
+        instance._loaded_start_waiting = instance.__dict__.get('start_waiting', models.DEFERRED)
+        instance._loaded_queue_id = instance.__dict__.get('queue_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        from apps.core.models.queue_daily_stats import QueueDailyStats
+
+        adding = self._state.adding
+        closing = (
+            not self._state.adding
+            and self.end_waiting is not None
+            and self._loaded_end_waiting is None
+        )
+        recorded = None if adding else self.recorded_wait()
+        if self.organization_id is None or self.queue_id != self._loaded_queue_id:
+            self.organization_id = self.queue.organization_id
+        super().save(*args, **kwargs)
+        self._loaded_end_waiting = self.end_waiting
+        self._loaded_start_waiting = self.start_waiting
+        self._loaded_queue_id = self.queue_id
+        if adding:
+            QueueEntry.objects.record_created([self])
+        if closing:
+            QueueEntry.objects.record_closed([self])
+        elif recorded is not None and recorded != self.recorded_wait():
+            # a closed entry was edited or reopened, its wait moves in the daily stats
+            QueueDailyStats.objects.record([self], removed=[recorded])
+
+    def delete(self, using=None, keep_parents=False):
+        from apps.core.models.queue_daily_stats import QueueDailyStats
+        from apps.core.models.queue_event import QueueEvent
+
+        # an open entry leaves the queue, the entries behind it move up; the
+        # wait of a closed one leaves the daily stats
+        with transaction.atomic(using=using, savepoint=False):
+            if self.end_waiting is None:
+                QueueEvent.objects.publish(QueueEvent.ENTRY_DELETED, [self])
+            elif (recorded := self.recorded_wait()) is not None:
+                QueueDailyStats.objects.db_manager(using).record([], removed=[recorded])
+            return super().delete(using=using, keep_parents=keep_parents)
+
+    def recorded_wait(self) -> tuple | None:
+        # the wait the daily stats hold for this entry, from the values as loaded
+        loaded = (self._loaded_end_waiting, self._loaded_start_waiting)
+        if loaded[0] is None or any(value is models.DEFERRED for value in loaded):
+            return None
+        return self._loaded_queue_id, self._loaded_start_waiting, self._loaded_end_waiting
+
+    def changed(self, using: str | None) -> None:
+        # runs before _loaded_queue_id is updated, so a move invalidates both queues
+        public_entry_cache.bump(self.queue_id, self._loaded_queue_id, using=using)
+
+    @cached_property
+    def position(self) -> int | None:
+        if self.end_waiting is not None:
+            return None
+        return self.waiting_ahead().count() + 1
+
+    async def aposition(self) -> int | None:
+        if 'position' not in self.__dict__:
+            self.position = None if self.end_waiting is not None else await self.waiting_ahead().acount() + 1
+        return self.position
+
+    def waiting_ahead(self) -> models.QuerySet:
+        return QueueEntry.objects.filter(
+            queue_id=self.queue_id,
+            end_waiting__isnull=True,
+            start_waiting__lte=self.start_waiting,
+        ).exclude(start_waiting=self.start_waiting, id__gte=self.id)
+
+    @property
+    def estimated_wait_seconds(self) -> int | None:
+        if self.position is None or self.queue.avg_service_seconds is None:
+            return None
+        return round(self.position * self.queue.avg_service_seconds)
+
     class Meta:
         ordering = ['start_waiting']
+        indexes = [
+            models.Index(fields=['organization', 'start_waiting', 'id'], name='core_qe_org_start_idx'),
+            models.Index(fields=['organization', 'queue', 'start_waiting', 'id'], name='core_qe_org_queue_start_idx'),
+            # open entries are few, so the partial indexes are cheap: one for the
+            # tenant scoped lists and one for call_next and positions
+            models.Index(
+                fields=['organization', 'queue', 'start_waiting', 'id'],
+                condition=models.Q(end_waiting__isnull=True),
+                name='core_qe_org_queue_open_idx',
+            ),
+            models.Index(
+                fields=['queue', 'start_waiting', 'id'],
+                condition=models.Q(end_waiting__isnull=True),
+                name='core_qe_queue_open_idx',
+            ),
+        ]
@@ -0,0 +1,59 @@
+import datetime
+
+from django.db import models, transaction
+
+
+class QueueEntryArchiveManager(models.Manager):
+
+    def archive(self, organization_id: int, closed_before: datetime.datetime, batch_size: int,
+                after: tuple | None = None) -> tuple[int, tuple | None]:
+        # One batch of one organization, walked along core_qe_org_start_idx
+        # from `after`. Rows are read outside of the transaction, so the write
+        # lock is only held for one INSERT and one DELETE.
+        from apps.core.models.queue_entries import QueueEntry
+
+        candidates = QueueEntry.objects.filter(
+            organization_id=organization_id, start_waiting__lt=closed_before
+        ).order_by('start_waiting', 'id')
+        if after is not None:
+            candidates = candidates.filter(
+                models.Q(start_waiting__gt=after[0]) | models.Q(start_waiting=after[0], id__gt=after[1])
+            )
+        rows = list(candidates.values(
+            'id', 'queue_id', 'organization_id', 'description', 'start_waiting', 'end_waiting'
+        )[:batch_size])
+        if not rows:
+            return 0, None
+        last = (rows[-1]['start_waiting'], rows[-1]['id'])
+        rows = [row for row in rows if row['end_waiting'] is not None and row['end_waiting'] < closed_before]
+        with transaction.atomic(using=self.db):
+            self.bulk_create([self.model(**row) for row in rows], ignore_conflicts=True)
+            QueueEntry.objects.filter(
+                id__in=[row['id'] for row in rows], end_waiting__isnull=False
+            ).delete()
+        return len(rows), last
+
+
+class QueueEntryArchive(models.Model):
+    """
+    Closed queue entries moved out of the hot QueueEntry table by the
+    archive_queue_entries command, without the audit fields.
+    """
+    id = models.UUIDField(primary_key=True, editable=False)
+    queue = models.ForeignKey('Queue', on_delete=models.CASCADE)
+    organization = models.ForeignKey('authentication.Organization', on_delete=models.PROTECT, db_index=False)
+    description = models.TextField()
+    start_waiting = models.DateTimeField()
+    end_waiting = models.DateTimeField()
+
+    objects = QueueEntryArchiveManager()
+
+    def __str__(self):
+        return f'{self.queue_id} - [{self.start_waiting} - {self.end_waiting}]'
+
+    class Meta:
+        ordering = ['start_waiting']
+        indexes = [
+            models.Index(fields=['organization', 'start_waiting', 'id'], name='core_qea_org_start_idx'),
+            models.Index(fields=['organization', 'queue', 'start_waiting', 'id'], name='core_qea_org_queue_start_idx'),
+        ]
@@ -0,0 +1,47 @@
+from django.db import models, transaction
+
+
+class QueueEventManager(models.Manager):
+
+    def publish(self, kind: str, entries: list, avg_service_seconds: dict[int, float | None] | None = None) -> None:
+        from apps.core.broadcast import hub
+
+        self.bulk_create([
+            QueueEvent(
+                queue_id=entry.queue_id,
+                entry_id=entry.id,
+                kind=kind,
+                start_waiting=entry.start_waiting,
+                end_waiting=entry.end_waiting,
+                avg_service_seconds=(avg_service_seconds or {}).get(entry.queue_id),
+            )
+            for entry in entries
+        ])
+        transaction.on_commit(hub.notify)
+
+
+class QueueEvent(models.Model):
+    ENTRY_CREATED = 'entry-created'
+    ENTRY_CLOSED = 'entry-closed'
+    ENTRY_DELETED = 'entry-deleted'
+
+    queue = models.ForeignKey('Queue', on_delete=models.CASCADE)
+    entry_id = models.UUIDField()
+    kind = models.CharField(max_length=32, choices=[
+        (ENTRY_CREATED, ENTRY_CREATED), (ENTRY_CLOSED, ENTRY_CLOSED), (ENTRY_DELETED, ENTRY_DELETED),
+    ])
+    start_waiting = models.DateTimeField()
+    end_waiting = models.DateTimeField(null=True, blank=True)
+    avg_service_seconds = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    objects = QueueEventManager()
+
+    def __str__(self):
+        return f'{self.kind}: {self.entry_id}'
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['queue', 'id'], name='core_queueevent_queue_idx'),
+        ]
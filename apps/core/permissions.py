@@ -1,21 +1,37 @@
-from django.shortcuts import get_object_or_404
+from django.http import Http404
 from rest_framework import permissions
 
 from apps.authentication.models import UserProfile
 from apps.core.models import Queue, Company, QueueEntry
 
 
+def get_organization_id(request, queryset, pk, lookup: str) -> int | None:
+    # One query per referenced object and request, no matter how many
+    # permission classes ask for it.
+    if pk is None:
+        return None
+    checks = request.__dict__.setdefault('_organization_checks', {})
+    key = (queryset.model, pk, lookup)
+    if key not in checks:
+        checks[key] = queryset.filter(pk=pk).values_list(lookup, flat=True).first()
+    return checks[key]
+
+
 class QueuePermission(permissions.BasePermission):
+    # columns has_object_permission reads, kept by sparse fieldsets
+    object_fields = ('organization',)
 
     def has_permission(self, request, view):
         user: UserProfile = request.user
         company_id = request.data.get('company')
         if request.method in ['POST']:
-            if company := get_object_or_404(Company, id=company_id):
-                return company.organization_id == user.organization_id
+            organization_id = get_organization_id(request, Company.objects, company_id, 'organization_id')
+            if organization_id is None:
+                raise Http404
+            return organization_id == user.organization_id
         if request.method in ['PUT', 'PATCH']:
-            company = Company.objects.filter(id=company_id).first()
-            if company is None or company.organization_id == user.organization_id:
+            organization_id = get_organization_id(request, Company.objects, company_id, 'organization_id')
+            if organization_id is None or organization_id == user.organization_id:
                 return True
         if request.method in ['GET', 'DELETE']:
             return True
@@ -23,21 +39,25 @@ class QueuePermission(permissions.BasePermission):
 
     def has_object_permission(self, request, view, obj: Queue):
         user: UserProfile = request.user
-        if obj.company.organization_id == user.organization_id:
+        if obj.organization_id == user.organization_id:
             return True
         return False
 
 class QueueEntryPermission(permissions.BasePermission):
+    # columns has_object_permission reads, kept by sparse fieldsets
+    object_fields = ('organization',)
 
     def has_permission(self, request, view):
         user: UserProfile = request.user
         queue_id = request.data.get('queue')
         if request.method in ['POST']:
-            if queue := get_object_or_404(Queue, id=queue_id):
-                return queue.company.organization_id == user.organization_id
+            organization_id = get_organization_id(request, Queue.objects, queue_id, 'organization_id')
+            if organization_id is None:
+                raise Http404
+            return organization_id == user.organization_id
         if request.method in ['PUT', 'PATCH']:
-            queue = Queue.objects.filter(id=queue_id).first()
-            if queue is None or queue.company.organization_id == user.organization_id:
+            organization_id = get_organization_id(request, Queue.objects, queue_id, 'organization_id')
+            if organization_id is None or organization_id == user.organization_id:
                 return True
         if request.method in ['GET', 'DELETE']:
             return True
@@ -45,6 +65,19 @@ class QueueEntryPermission(permissions.BasePermission):
 
     def has_object_permission(self, request, view, obj: QueueEntry):
         user: UserProfile = request.user
-        if obj.queue.company.organization_id == user.organization_id:
+        if obj.organization_id == user.organization_id:
+            return True
+        return False
+
+class QueueEntryClosePermission(permissions.BasePermission):
+    # columns has_object_permission reads, kept by sparse fieldsets
+    object_fields = ('organization',)
+
+    def has_permission(self, request, view):
+        return request.user.has_perm('core.change_queueentry')
+
+    def has_object_permission(self, request, view, obj: Queue):
+        user: UserProfile = request.user
+        if obj.organization_id == user.organization_id:
             return True
         return False
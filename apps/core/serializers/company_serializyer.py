@@ -16,5 +16,5 @@ class CompanySerializer(serializers.ModelSerializer):
 
     def create(self, validated_data: dict) -> Company:
         user: UserProfile = get_current_user()
-        validated_data['organization'] = user.organization
+        validated_data['organization_id'] = user.organization_id
         return super().create(validated_data)
\ No newline at end of file
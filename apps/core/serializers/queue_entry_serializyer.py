@@ -1,15 +1,42 @@
 from rest_framework import serializers
 
-from apps.core.models import QueueEntry
+from apps.core.models import QueueEntry, QueueEntryArchive
+from apps.shared.export import EXPORT_OUTPUTS
 
 
 class QueueEntryFilterSerializer(serializers.Serializer):
     queue_id = serializers.IntegerField(required=False)
-    waiting_end_is_null = serializers.BooleanField(required=False)
+    waiting_end_is_null = serializers.BooleanField(required=False, allow_null=True, default=None)
     date = serializers.DateField(required=False)
 
+class QueueEntryExportSerializer(QueueEntryFilterSerializer):
+    output = serializers.ChoiceField(choices=list(EXPORT_OUTPUTS), default='csv')
+
 class QueueEntrySerializer(serializers.ModelSerializer):
 
     class Meta:
         model = QueueEntry
-        fields = '__all__'
+        exclude = ('organization',)
+
+class QueueEntryBulkCreateSerializer(serializers.Serializer):
+    queue = serializers.IntegerField()
+    description = serializers.CharField()
+
+class QueueEntryPublicSerializer(QueueEntrySerializer):
+    position = serializers.IntegerField(read_only=True, allow_null=True)
+    estimated_wait_seconds = serializers.IntegerField(read_only=True, allow_null=True)
+
+class PublicCacheStatsSerializer(serializers.Serializer):
+    hits = serializers.IntegerField()
+    misses = serializers.IntegerField()
+    hit_ratio = serializers.FloatField(allow_null=True)
+
+class QueueEntryArchiveFilterSerializer(serializers.Serializer):
+    queue_id = serializers.IntegerField(required=False)
+    date = serializers.DateField(required=False)
+
+class QueueEntryArchiveSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = QueueEntryArchive
+        exclude = ('organization',)
@@ -1,3 +1,6 @@
+import datetime
+
+from django.utils import timezone
 from rest_framework import serializers
 
 from apps.core.models import Queue
@@ -10,4 +13,41 @@ class QueueSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Queue
-        fields = '__all__'
+        exclude = ('organization',)
+
+class QueueStatsFilterSerializer(serializers.Serializer):
+    to = serializers.DateField(required=False)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # `from` is a keyword and cannot be declared as an attribute
+        fields['from'] = serializers.DateField(required=False)
+        return fields
+
+    def validate(self, attrs: dict) -> dict:
+        attrs.setdefault('to', timezone.localdate())
+        attrs.setdefault('from', attrs['to'] - datetime.timedelta(days=29))
+        if attrs['from'] > attrs['to']:
+            raise serializers.ValidationError({'from': 'Must not be after `to`.'})
+        return attrs
+
+class QueueWaitStatsSerializer(serializers.Serializer):
+    count = serializers.IntegerField()
+    avg_wait_seconds = serializers.FloatField(allow_null=True)
+    p50_wait_seconds = serializers.FloatField(allow_null=True)
+    p95_wait_seconds = serializers.FloatField(allow_null=True)
+
+class QueueDailyStatsSerializer(QueueWaitStatsSerializer):
+    day = serializers.DateField()
+
+class QueueStatsSerializer(QueueWaitStatsSerializer):
+    queue = serializers.IntegerField()
+    to = serializers.DateField()
+    days = QueueDailyStatsSerializer(many=True)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fields['from'] = serializers.DateField()
+        fields['to'] = fields.pop('to')
+        fields['days'] = fields.pop('days')
+        return fields
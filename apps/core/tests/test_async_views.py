@@ -0,0 +1,181 @@
+import json
+import os
+import subprocess
+import sys
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import include, path
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.routers import DefaultRouter
+
+from apps.authentication.models import UserProfile, Organization
+from apps.core import views
+from apps.core.models import QueueEntry, Company, Queue
+
+USERNAME = 'me'
+PASSWORD = '<PASSWORD>'
+
+with override_settings(ASYNC_VIEWS=True):
+    router = DefaultRouter()
+    router.register('queues', views.QueueViewSet, 'queues')
+    router.register('queue-entries', views.QueueEntryViewSet, 'queue-entries')
+    async_urlpatterns = router.get_urls()
+
+urlpatterns = [
+    path('api/', include(async_urlpatterns)),
+    path('sync/', include('apps.core.urls')),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncViewTests(TestCase):
+
+    def setUp(self):
+        self.my_organization = Organization.objects.create(
+            name='my_organization'
+        )
+        self.other_organization = Organization.objects.create(
+            name='other_organization'
+        )
+        self.my_company = Company.objects.create(
+            name='my_company',
+            organization=self.my_organization,
+        )
+        self.other_company = Company.objects.create(
+            name='other_company',
+            organization=self.other_organization,
+        )
+        self.my_queue = Queue.objects.create(
+            name='my_queue',
+            company=self.my_company,
+        )
+        self.other_queue = Queue.objects.create(
+            name='other_queue',
+            company=self.other_company,
+        )
+        self.me = UserProfile.objects.create(
+            username=USERNAME,
+            organization=self.my_organization
+        )
+        self.me.set_password(PASSWORD)
+        self.me.save()
+        self.entries = [
+            QueueEntry.objects.create(description=f'Entry {i}', queue=self.my_queue)
+            for i in range(3)
+        ]
+        QueueEntry.objects.create(description='Other', queue=self.other_queue)
+
+    def assert_same_response(self, url: str, expected_status: int = status.HTTP_200_OK):
+        response = self.client.get(f'/api/{url}')
+        self.assertEqual(response.status_code, expected_status, response.content)
+        expected = self.client.get(f'/sync/{url}')
+        self.assertEqual(expected.status_code, expected_status, expected.content)
+        # pagination links only differ by the prefix of the test urls
+        self.assertEqual(response.content.decode(), expected.content.decode().replace('/sync/', '/api/'))
+        return response
+
+    def test_views_are_async(self):
+        match = self.client.get('/api/queue-entries/').resolver_match
+        self.assertTrue(iscoroutinefunction(match.func))
+        self.assertFalse(iscoroutinefunction(self.client.get('/sync/queue-entries/').resolver_match.func))
+
+    def test_list__with_permission(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='view_queueentry'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        response = self.assert_same_response('queue-entries/')
+        self.assertEqual(response.json()['count'], 3)
+        self.assert_same_response(f'queue-entries/?queue_id={self.my_queue.id}&waiting_end_is_null=true&limit=2')
+        self.assert_same_response('queue-entries/?cursor=&limit=2&count=true')
+
+    def test_list__not_modified(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='view_queueentry'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        response = self.client.get('/api/queue-entries/')
+        response = self.client.get('/api/queue-entries/', headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list__without_permission(self):
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        response = self.client.get('/api/queue-entries/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_retrieve(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='view_queueentry'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        self.assert_same_response(f'queue-entries/{self.entries[0].id}/')
+        other_entry = QueueEntry.objects.get(queue=self.other_queue)
+        self.assert_same_response(f'queue-entries/{other_entry.id}/', status.HTTP_404_NOT_FOUND)
+
+    def test_retrieve_public(self):
+        self.entries[0].end_waiting = timezone.now()
+        self.entries[0].save()
+
+        response = self.assert_same_response(f'queue-entries/{self.entries[2].id}/public/')
+        self.assertEqual(response.json()['position'], 2)
+
+    def test_retrieve_public__cached(self):
+        url = f'queue-entries/{self.entries[1].id}/public/'
+        self.assertEqual(self.client.get(f'/api/{url}')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(f'/api/{url}')['X-Cache'], 'HIT')
+        self.assertEqual(self.client.get(f'/sync/{url}')['X-Cache'], 'HIT')
+
+        QueueEntry.objects.call_next(self.my_queue.id)
+        response = self.client.get(f'/api/{url}')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['position'], 1)
+
+    def test_list_queues(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='view_queue'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        response = self.assert_same_response('queues/')
+        self.assertEqual([queue['name'] for queue in response.json()['results']], ['my_queue'])
+
+    def test_writes_stay_sync(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='change_queueentry'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        response = self.client.patch(
+            f'/api/queue-entries/{self.entries[0].id}/',
+            data={'description': 'Changed'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual(QueueEntry.objects.get(id=self.entries[0].id).description, 'Changed')
+
+    async def test_list__async_client(self):
+        await self.me.user_permissions.aadd(await Permission.objects.aget(codename='view_queueentry'))
+        await self.async_client.alogin(username=USERNAME, password=PASSWORD)
+
+        response = await self.async_client.get('/api/queue-entries/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual(response.json()['count'], 3)
+
+
+class AsgiMiddlewareTests(SimpleTestCase):
+
+    def test_asgi_middleware__async_capable(self):
+        # a sync-only middleware would move every async request into a thread
+        script = (
+            'import json, django\n'
+            'from django.conf import settings\n'
+            'from django.utils.module_loading import import_string\n'
+            'django.setup()\n'
+            'print(json.dumps([\n'
+            '    path for path in settings.MIDDLEWARE if not getattr(import_string(path), "async_capable", False)\n'
+            ']))\n'
+        )
+        environment = {**os.environ, 'DJANGO_SERVER': 'asgi', 'DJANGO_SETTINGS_MODULE': 'config.settings'}
+        result = subprocess.run(
+            [sys.executable, '-c', script], env=environment, capture_output=True, text=True, check=True,
+            cwd=settings.BASE_DIR,
+        )
+        self.assertEqual(json.loads(result.stdout.splitlines()[-1]), [])
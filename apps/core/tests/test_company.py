@@ -1,6 +1,9 @@
 from django.contrib.auth.models import Permission
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
+from rest_framework.test import APIClient
 
 from apps.authentication.models import UserProfile, Organization
 from apps.core.models import Company
@@ -39,6 +42,34 @@ class CompanyTests(TestCase):
         created_record = Company.objects.get(id=data['id'])
         self.assertEqual(created_record.organization, self.my_organization)
 
+    def test_create__resolves_user_once(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='add_company'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                '/api/companies/',
+                data={
+                    'name': 'Alpha Corp'
+                },
+                content_type='application/json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        queries = [query['sql'] for query in context.captured_queries]
+        # session, user, user and group permissions, insert
+        self.assertEqual(len(queries), 5, '\n'.join(queries))
+        self.assertEqual(len([sql for sql in queries if 'FROM "authentication_userprofile"' in sql]), 1)
+        self.assertEqual(Company.objects.get(id=response.json()['id']).created_by, USERNAME)
+
+    def test_create__authenticated_by_drf(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='add_company'))
+        client = APIClient()
+        client.force_authenticate(self.me)
+        response = client.post('/api/companies/', data={'name': 'Alpha Corp'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        created_record = Company.objects.get(id=response.json()['id'])
+        self.assertEqual(created_record.organization, self.my_organization)
+        self.assertEqual(created_record.created_by, USERNAME)
+
     def test_create__with_out_permission(self):
         self.client.login(username=USERNAME, password=PASSWORD)
         response = self.client.post(
@@ -138,3 +169,40 @@ class CompanyTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, response.content)
         deleted_record_exists = Company.objects.filter(id=created_record.id).exists()
         self.assertTrue(deleted_record_exists)
+
+    def test_list__not_modified(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='view_company'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        created_record = Company.objects.create(name='Alpha Corp', organization=self.my_organization)
+        response = self.client.get('/api/companies/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        etag = response['ETag']
+
+        response = self.client.get('/api/companies/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, response.content)
+        self.assertEqual(response.content, b'')
+
+        created_record.name = 'Alpha Corp II'
+        created_record.save()
+        response = self.client.get('/api/companies/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertNotEqual(response['ETag'], etag)
+
+        created_record.delete()
+        response = self.client.get('/api/companies/', headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+
+    def test_retrieve__not_modified(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='view_company'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        created_record = Company.objects.create(name='Alpha Corp', organization=self.my_organization)
+        response = self.client.get(f'/api/companies/{created_record.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+
+        response = self.client.get(
+            f'/api/companies/{created_record.id}/',
+            headers={'If-Modified-Since': response['Last-Modified']},
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, response.content)
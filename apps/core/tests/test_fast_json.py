@@ -0,0 +1,65 @@
+import datetime
+import decimal
+import io
+import uuid
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from apps.shared.parsers import FastJSONParser
+from apps.shared.renderers import FastJSONRenderer
+
+
+class FastJSONTests(SimpleTestCase):
+
+    def payload(self) -> dict:
+        return {
+            'id': uuid.UUID('0b9c6e0e-3a5b-4f7e-9d51-7f2d1f3c9a10'),
+            'start_waiting': datetime.datetime(2026, 10, 18, 9, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            'local': timezone.make_aware(datetime.datetime(2026, 10, 18, 9, 30), datetime.timezone(datetime.timedelta(hours=2))),
+            'naive': datetime.datetime(2026, 10, 18, 9, 30),
+            'day': datetime.date(2026, 10, 18),
+            'time': datetime.time(9, 30),
+            'amount': decimal.Decimal('12.50'),
+            'wait': datetime.timedelta(minutes=3),
+            'description': 'Zürich\u2028\u2029 "quoted"',
+            'counts': {1: 2},
+            'results': [{'position': 1, 'estimate': 90.5, 'end': None, 'open': True}],
+        }
+
+    def test_render__same_bytes_as_json_renderer(self):
+        self.assertEqual(FastJSONRenderer().render(self.payload()), JSONRenderer().render(self.payload()))
+
+    def test_render__indent(self):
+        expected = JSONRenderer().render(self.payload(), 'application/json; indent=4')
+        self.assertEqual(FastJSONRenderer().render(self.payload(), 'application/json; indent=4'), expected)
+
+    def test_render__falls_back(self):
+        data = {'big': 2 ** 70}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        with mock.patch('apps.shared.renderers.fast_json_renderer.orjson', None):
+            self.assertEqual(FastJSONRenderer().render(self.payload()), JSONRenderer().render(self.payload()))
+
+    def test_render__none(self):
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_parse(self):
+        body = '{"queue": 1, "description": "Zürich", "amount": 1.5, "items": [null, true], "big": 1180591620717411303424}'
+        expected = JSONParser().parse(io.BytesIO(body.encode()))
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body.encode())), expected)
+        with mock.patch('apps.shared.parsers.fast_json_parser.orjson', None):
+            self.assertEqual(FastJSONParser().parse(io.BytesIO(body.encode())), expected)
+
+    def test_parse__other_encoding(self):
+        body = '{"description": "Zürich"}'.encode('latin-1')
+        data = FastJSONParser().parse(io.BytesIO(body), parser_context={'encoding': 'latin-1'})
+        self.assertEqual(data, {'description': 'Zürich'})
+
+    def test_parse__invalid(self):
+        for body in (b'{"queue": ', b'{"value": NaN}'):
+            with self.assertRaisesMessage(ParseError, 'JSON parse error'):
+                FastJSONParser().parse(io.BytesIO(body))
@@ -0,0 +1,100 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from rest_framework import status
+
+from apps.authentication.models import Organization, UserProfile
+from apps.core.models import Company, Queue, QueueDailyStats, QueueEntry
+
+END = datetime.datetime(2026, 10, 14, 12, tzinfo=datetime.timezone.utc)
+OPTIONS = [
+    '--organizations', '2', '--companies', '1', '--queues', '2', '--entries', '50', '--days', '3',
+    '--end', END.isoformat(), '--seed', '7', '--password', 'secret',
+]
+
+
+def generate(*options: str) -> None:
+    call_command('generate_data', *OPTIONS, *options, stdout=StringIO())
+
+
+def entries() -> list[tuple]:
+    return list(QueueEntry.objects.order_by('start_waiting', 'id').values_list(
+        'id', 'queue__name', 'description', 'start_waiting', 'end_waiting', 'created_at', 'updated_by'
+    ))
+
+
+class GenerateDataTests(TestCase):
+
+    def test_generate(self):
+        generate('--keep-indexes')
+        self.assertEqual(Organization.objects.count(), 2)
+        self.assertEqual(Queue.objects.count(), 4)
+        self.assertEqual(QueueEntry.objects.count(), 200)
+        self.assertEqual(UserProfile.objects.filter(username__startswith='generated-').count(), 4)
+        self.assertFalse(QueueEntry.objects.filter(start_waiting__gte=END).exists())
+        self.assertFalse(QueueEntry.objects.filter(end_waiting__gte=END).exists())
+        for entry in QueueEntry.objects.select_related('queue'):
+            self.assertEqual(entry.organization_id, entry.queue.organization_id)
+            self.assertEqual(entry.created_at, entry.start_waiting)
+            self.assertEqual(entry.id.version, 4)
+
+    def test_generate__daily_stats_match_the_entries(self):
+        generate('--keep-indexes')
+        generated = set(QueueDailyStats.objects.values_list('queue_id', 'day', 'count'))
+        self.assertTrue(generated)
+        call_command('rebuild_queue_stats', stdout=StringIO())
+        self.assertEqual(set(QueueDailyStats.objects.values_list('queue_id', 'day', 'count')), generated)
+
+    def test_generate__same_seed__same_data(self):
+        generate('--keep-indexes')
+        first = entries()
+        for model in (QueueDailyStats, QueueEntry, Queue, Company, UserProfile, Organization):
+            model.objects.all().delete()
+        generate('--keep-indexes')
+        self.assertEqual(entries(), first)
+
+    def test_generate__existing_prefix(self):
+        generate('--keep-indexes')
+        with self.assertRaises(CommandError):
+            generate('--keep-indexes')
+        generate('--keep-indexes', '--prefix', 'other')
+        self.assertEqual(QueueEntry.objects.count(), 400)
+
+    def test_generated_users__drive_the_api(self):
+        generate('--keep-indexes')
+        organization = UserProfile.objects.get(username='generated-1-desk').organization
+
+        self.client.login(username='generated-1-desk', password='secret')
+        response = self.client.get('/api/queue-entries/', {'count': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual(response.json()['count'], 100)
+        queue = Queue.objects.filter(organization=organization).first()
+        response = self.client.post(
+            '/api/queue-entries/', data={'queue': queue.id, 'description': 'Lorem'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        entry_id = response.json()['id']
+        response = self.client.delete(f'/api/queue-entries/{entry_id}/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, response.content)
+
+        self.client.login(username='generated-1-manager', password='secret')
+        response = self.client.delete(f'/api/queue-entries/{entry_id}/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT, response.content)
+
+
+class GenerateDataIndexTests(TransactionTestCase):
+
+    def indexes(self) -> set[str]:
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, QueueEntry._meta.db_table)
+        return {name for name, constraint in constraints.items() if constraint['index']}
+
+    def test_generate__rebuilds_the_indexes(self):
+        indexes = self.indexes()
+        generate()
+        self.assertEqual(QueueEntry.objects.count(), 200)
+        self.assertEqual(self.indexes(), indexes)
@@ -0,0 +1,125 @@
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.test import RequestFactory, TestCase
+from prometheus_client import REGISTRY
+from rest_framework import status
+
+from apps.authentication.models import UserProfile, Organization
+from apps.core.models import Company, Queue, QueueEntry
+from apps.shared.metrics import MetricsMiddleware
+from apps.shared.metrics.request_metrics import _current_stats, render_metrics
+
+USERNAME = 'me'
+PASSWORD = '<PASSWORD>'
+LIST_LABELS = {'route': 'queue-entries-list', 'action': 'list', 'method': 'GET'}
+
+class MetricsTests(TestCase):
+
+    def setUp(self):
+        self.my_organization = Organization.objects.create(name='my_organization')
+        my_company = Company.objects.create(name='my_company', organization=self.my_organization)
+        my_queue = Queue.objects.create(name='my_queue', company=my_company)
+        QueueEntry.objects.create_many([{'queue_id': my_queue.id, 'description': 'Entry'}])
+        self.me = UserProfile.objects.create(username=USERNAME, organization=self.my_organization)
+        self.me.set_password(PASSWORD)
+        self.me.save()
+        self.me.user_permissions.add(Permission.objects.get(codename='view_queueentry'))
+
+    def sample(self, name: str, **labels) -> float:
+        return REGISTRY.get_sample_value(name, {**LIST_LABELS, **labels}) or 0.0
+
+    def assert_recorded(self, request):
+        requests = self.sample('http_requests_total', status='200')
+        latencies = self.sample('http_request_duration_seconds_count')
+        queries = self.sample('http_request_db_queries_sum')
+        db_duration = self.sample('http_request_db_duration_seconds_total')
+        sizes = self.sample('http_response_size_bytes_sum')
+        response = request()
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual(self.sample('http_requests_total', status='200'), requests + 1)
+        self.assertEqual(self.sample('http_request_duration_seconds_count'), latencies + 1)
+        self.assertGreater(self.sample('http_request_db_queries_sum'), queries)
+        self.assertGreater(self.sample('http_request_db_duration_seconds_total'), db_duration)
+        self.assertEqual(self.sample('http_response_size_bytes_sum'), sizes + len(response.content))
+
+    def test_middleware(self):
+        self.assertIn('apps.shared.metrics.MetricsMiddleware', settings.MIDDLEWARE)
+        self.client.login(username=USERNAME, password=PASSWORD)
+        self.assert_recorded(lambda: self.client.get('/api/queue-entries/'))
+
+    async def test_middleware__async(self):
+        await self.async_client.aforce_login(self.me)
+        requests = self.sample('http_requests_total', status='200')
+        response = await self.async_client.get('/api/queue-entries/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual(self.sample('http_requests_total', status='200'), requests + 1)
+
+    def test_middleware__status(self):
+        forbidden = self.sample('http_requests_total', status='403')
+        self.client.get('/api/queue-entries/')
+        self.assertEqual(self.sample('http_requests_total', status='403'), forbidden + 1)
+
+    def test_middleware__exception(self):
+        def get_response(request):
+            raise RuntimeError('view failed')
+
+        errors = self.sample('http_requests_total', route='unmatched', action='', status='500')
+        with self.assertRaises(RuntimeError):
+            MetricsMiddleware(get_response)(RequestFactory().get('/api/queue-entries/'))
+        self.assertEqual(self.sample('http_requests_total', route='unmatched', action='', status='500'), errors + 1)
+        self.assertIsNone(_current_stats.get())
+
+    async def test_middleware__exception__async(self):
+        async def get_response(request):
+            raise RuntimeError('view failed')
+
+        errors = self.sample('http_requests_total', route='unmatched', action='', status='500')
+        with self.assertRaises(RuntimeError):
+            await MetricsMiddleware(get_response)(RequestFactory().get('/api/queue-entries/'))
+        self.assertEqual(self.sample('http_requests_total', route='unmatched', action='', status='500'), errors + 1)
+        self.assertIsNone(_current_stats.get())
+
+    def test_metrics(self):
+        self.me.is_staff = True
+        self.me.save()
+        self.client.login(username=USERNAME, password=PASSWORD)
+        self.client.get('/api/queue-entries/')
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn(
+            b'http_requests_total{action="list",method="GET",route="queue-entries-list",status="200"}',
+            response.content,
+        )
+
+    def test_metrics__no_staff(self):
+        self.client.login(username=USERNAME, password=PASSWORD)
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, response.content)
+
+    def test_metrics__anonymous(self):
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, response.content)
+
+    def test_render_metrics__multiprocess(self):
+        # two worker processes writing to the same directory are summed up
+        script = (
+            'from apps.shared.metrics.request_metrics import REQUESTS;'
+            'REQUESTS.labels("queue-entries-list", "list", "GET", "200").inc(3)'
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            environment = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': directory}
+            for _ in range(2):
+                subprocess.run([sys.executable, '-c', script], env=environment, cwd=settings.BASE_DIR, check=True)
+            with mock.patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': directory}):
+                body = render_metrics()
+        self.assertIn(
+            b'http_requests_total{action="list",method="GET",route="queue-entries-list",status="200"} 6.0',
+            body,
+        )
@@ -0,0 +1,284 @@
+import datetime
+import math
+import time
+import uuid
+
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+
+from apps.authentication.models import UserProfile, Organization
+from apps.core.models import Company, Queue, QueueDailyStats, QueueEntry, QueueEvent
+
+ORGANIZATIONS = 3
+COMPANIES_PER_ORGANIZATION = 2
+QUEUES_PER_COMPANY = 2
+
+# Upper bounds per action, set to the measured counts without slack so one
+# more query fails: SQL queries of one warm request, the session and
+# permission caches of a shared cache backend are filled, and its wall-clock
+# time in seconds. Without a shared cache every request reads its session and
+# permission set from the database as well. The number of queries must not
+# grow with the data, so the same bounds apply to every data size. Only
+# close-all gets one more query per batch.
+BUDGETS = {
+    'company-list': (3, 0.5),
+    'company-retrieve': (2, 0.5),
+    'company-retrieve-sparse': (2, 0.5),
+    'company-create': (2, 0.5),
+    'company-update': (3, 0.5),
+    'company-partial-update': (3, 0.5),
+    'company-destroy': (9, 1.0),
+    'queue-list': (3, 0.5),
+    'queue-retrieve': (2, 0.5),
+    'queue-retrieve-sparse': (2, 0.5),
+    'queue-create': (4, 0.5),
+    'queue-update': (5, 0.5),
+    'queue-partial-update': (3, 0.5),
+    'queue-destroy': (7, 1.0),
+    'queue-call-next': (10, 0.5),
+    'queue-close-all': (9, 1.0),
+    'queue-stats': (3, 0.5),
+    'queue-entry-list': (3, 0.5),
+    'queue-entry-list-cursor': (2, 0.5),
+    'queue-entry-retrieve': (2, 0.5),
+    'queue-entry-retrieve-sparse': (2, 0.5),
+    'queue-entry-retrieve-public': (2, 0.5),
+    'queue-entry-retrieve-public-cached': (0, 0.5),
+    'queue-entry-public-cache-stats': (1, 0.5),
+    'queue-entry-create': (5, 0.5),
+    'queue-entry-update': (10, 0.5),
+    'queue-entry-partial-update': (8, 0.5),
+    'queue-entry-destroy': (4, 0.5),
+    'queue-entry-bulk-create': (6, 1.0),
+    'queue-entry-export': (2, 2.0),
+}
+# bounds which differ by database vendor
+VENDOR_BUDGETS = {}
+
+
+def budget(name: str) -> tuple[int, float]:
+    return VENDOR_BUDGETS.get(connection.vendor, {}).get(name, BUDGETS[name])
+
+
+# what config.settings picks when a shared cache backend is configured
+SHARED_CACHE_SETTINGS = {
+    'SHARED_CACHE': True,
+    'AUTHENTICATION_BACKENDS': ('apps.authentication.backends.CachedModelBackend',),
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+}
+
+
+class QueryBudgetMixin:
+    """
+    Every action of the company, queue and queue entry viewsets against
+    ``ORGANIZATIONS`` tenants with ``entries_per_queue`` entries in each of
+    their queues, half of them closed.
+    """
+    entries_per_queue: int
+
+    @classmethod
+    def setUpTestData(cls):
+        permissions = Permission.objects.filter(content_type__app_label='core')
+        now = timezone.now()
+        entries = []
+        for index in range(ORGANIZATIONS):
+            organization = Organization.objects.create(name=f'organization {index}')
+            user = UserProfile.objects.create(username=f'user {index}', organization=organization)
+            user.user_permissions.add(*permissions)
+            for company_index in range(COMPANIES_PER_ORGANIZATION):
+                company = Company.objects.create(name=f'company {index}.{company_index}', organization=organization)
+                for queue_index in range(QUEUES_PER_COMPANY):
+                    queue = Queue.objects.create(name=f'queue {queue_index}', company=company)
+                    entries += [
+                        QueueEntry(
+                            id=uuid.uuid4(), queue=queue, organization=organization,
+                            description=f'Customer {entry_index}',
+                            start_waiting=now - datetime.timedelta(minutes=entry_index),
+                            end_waiting=now if entry_index % 2 else None,
+                        )
+                        for entry_index in range(cls.entries_per_queue)
+                    ]
+        QueueEntry.objects.bulk_create(entries, batch_size=500)
+        cls.me = UserProfile.objects.get(username='user 0')
+        cls.company = Company.objects.filter(organization=cls.me.organization).first()
+        cls.queue = Queue.objects.filter(organization=cls.me.organization).first()
+        cls.entry = QueueEntry.objects.filter(queue=cls.queue, end_waiting__isnull=True).first()
+        # closing an entry updates the rollup row of its day, the insert path
+        # of the first close of a day would make the counts depend on the data
+        days = {timezone.localdate(start) for start in cls.queue.queueentry_set.values_list('start_waiting', flat=True)}
+        QueueDailyStats.objects.bulk_create([QueueDailyStats(queue=cls.queue, day=day) for day in days])
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.me)
+        # fills the session and permission caches
+        self.client.get('/api/companies/')
+
+    def assert_budget(self, name: str, method: str, path: str, data: dict | list | None = None,
+                      expected_status: int = status.HTTP_200_OK, extra_queries: int = 0):
+        max_queries, max_seconds = budget(name)
+        max_queries += extra_queries
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = getattr(self.client, method)(
+                path, **({} if data is None else {'data': data, 'content_type': 'application/json'})
+            )
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        self.assertEqual(response.status_code, expected_status, response.content if not response.streaming else '')
+        queries = [query['sql'] for query in context.captured_queries]
+        listing = '\n'.join(f'{index}. {sql}' for index, sql in enumerate(queries, 1))
+        self.assertLessEqual(
+            len(queries), max_queries,
+            f'{name} ({self.entries_per_queue} entries per queue) ran {len(queries)} queries, '
+            f'the budget is {max_queries}:\n{listing}',
+        )
+        self.assertLessEqual(
+            elapsed, max_seconds,
+            f'{name} ({self.entries_per_queue} entries per queue) took {elapsed:.3f}s, '
+            f'the budget is {max_seconds}s:\n{listing}',
+        )
+        return response
+
+    # Company
+
+    def test_company_list(self):
+        self.assert_budget('company-list', 'get', '/api/companies/')
+
+    def test_company_retrieve(self):
+        self.assert_budget('company-retrieve', 'get', f'/api/companies/{self.company.id}/')
+
+    def test_company_retrieve_sparse(self):
+        self.assert_budget('company-retrieve-sparse', 'get', f'/api/companies/{self.company.id}/?fields=name')
+
+    def test_company_create(self):
+        self.assert_budget('company-create', 'post', '/api/companies/', {'name': 'new'}, status.HTTP_201_CREATED)
+
+    def test_company_update(self):
+        self.assert_budget('company-update', 'put', f'/api/companies/{self.company.id}/', {'name': 'renamed'})
+
+    def test_company_partial_update(self):
+        self.assert_budget('company-partial-update', 'patch', f'/api/companies/{self.company.id}/', {'name': 'renamed'})
+
+    def test_company_destroy(self):
+        self.assert_budget('company-destroy', 'delete', f'/api/companies/{self.company.id}/', None, status.HTTP_204_NO_CONTENT)
+
+    # Queue
+
+    def test_queue_list(self):
+        self.assert_budget('queue-list', 'get', '/api/queues/')
+
+    def test_queue_list__company(self):
+        self.assert_budget('queue-list', 'get', f'/api/queues/?company_id={self.company.id}')
+
+    def test_queue_retrieve(self):
+        self.assert_budget('queue-retrieve', 'get', f'/api/queues/{self.queue.id}/')
+
+    def test_queue_retrieve_sparse(self):
+        self.assert_budget('queue-retrieve-sparse', 'get', f'/api/queues/{self.queue.id}/?fields=name')
+
+    def test_queue_create(self):
+        self.assert_budget('queue-create', 'post', '/api/queues/', {'name': 'new', 'company': self.company.id}, status.HTTP_201_CREATED)
+
+    def test_queue_update(self):
+        self.assert_budget('queue-update', 'put', f'/api/queues/{self.queue.id}/', {'name': 'renamed', 'company': self.company.id})
+
+    def test_queue_partial_update(self):
+        self.assert_budget('queue-partial-update', 'patch', f'/api/queues/{self.queue.id}/', {'name': 'renamed'})
+
+    def test_queue_destroy(self):
+        self.assert_budget('queue-destroy', 'delete', f'/api/queues/{self.queue.id}/', None, status.HTTP_204_NO_CONTENT)
+
+    def test_queue_call_next(self):
+        self.assert_budget('queue-call-next', 'post', f'/api/queues/{self.queue.id}/next/')
+
+    def test_queue_close_all(self):
+        # entries are closed in chunks of 500 and their events inserted in
+        # batches as large as the database allows
+        entries = list(QueueEntry.objects.filter(queue=self.queue, end_waiting__isnull=True))
+        fields = [field for field in QueueEvent._meta.concrete_fields if not field.primary_key]
+        event_batch_size = connection.ops.bulk_batch_size(fields, entries)
+        extra_queries = math.ceil(len(entries) / 500) - 1 + math.ceil(len(entries) / event_batch_size) - 1
+        self.assert_budget('queue-close-all', 'post', f'/api/queues/{self.queue.id}/close-all/', extra_queries=extra_queries)
+
+    def test_queue_stats(self):
+        self.assert_budget('queue-stats', 'get', f'/api/queues/{self.queue.id}/stats/')
+
+    # Queue Entry
+
+    def test_queue_entry_list(self):
+        self.assert_budget('queue-entry-list', 'get', f'/api/queue-entries/?queue_id={self.queue.id}&waiting_end_is_null=true')
+
+    def test_queue_entry_list__cursor(self):
+        response = self.assert_budget('queue-entry-list-cursor', 'get', '/api/queue-entries/?cursor=')
+        self.assert_budget('queue-entry-list-cursor', 'get', response.json()['next'])
+
+    def test_queue_entry_retrieve(self):
+        self.assert_budget('queue-entry-retrieve', 'get', f'/api/queue-entries/{self.entry.id}/')
+
+    def test_queue_entry_retrieve_sparse(self):
+        self.assert_budget('queue-entry-retrieve-sparse', 'get', f'/api/queue-entries/{self.entry.id}/?fields=id')
+
+    def test_queue_entry_retrieve_public(self):
+        self.client.logout()
+        response = self.assert_budget('queue-entry-retrieve-public', 'get', f'/api/queue-entries/{self.entry.id}/public/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        response = self.assert_budget('queue-entry-retrieve-public-cached', 'get', f'/api/queue-entries/{self.entry.id}/public/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_queue_entry_public_cache_stats(self):
+        self.me.is_staff = True
+        self.me.save()
+        self.client.get('/api/companies/')
+        self.assert_budget('queue-entry-public-cache-stats', 'get', '/api/queue-entries/public/cache-stats/')
+
+    def test_queue_entry_create(self):
+        self.assert_budget(
+            'queue-entry-create', 'post', '/api/queue-entries/',
+            {'queue': self.queue.id, 'description': 'new'}, status.HTTP_201_CREATED,
+        )
+
+    def test_queue_entry_update(self):
+        self.assert_budget(
+            'queue-entry-update', 'put', f'/api/queue-entries/{self.entry.id}/',
+            {'queue': self.queue.id, 'description': 'renamed', 'end_waiting': timezone.now().isoformat()},
+        )
+
+    def test_queue_entry_partial_update(self):
+        self.assert_budget(
+            'queue-entry-partial-update', 'patch', f'/api/queue-entries/{self.entry.id}/',
+            {'end_waiting': timezone.now().isoformat()},
+        )
+
+    def test_queue_entry_destroy(self):
+        self.assert_budget('queue-entry-destroy', 'delete', f'/api/queue-entries/{self.entry.id}/', None, status.HTTP_204_NO_CONTENT)
+
+    def test_queue_entry_bulk_create(self):
+        self.assert_budget(
+            'queue-entry-bulk-create', 'post', '/api/queue-entries/bulk/',
+            [{'queue': self.queue.id, 'description': f'new {index}'} for index in range(50)], status.HTTP_201_CREATED,
+        )
+
+    def test_queue_entry_export(self):
+        self.assert_budget('queue-entry-export', 'get', '/api/queue-entries/export/?output=ndjson')
+
+
+@override_settings(**SHARED_CACHE_SETTINGS)
+class SmallQueryBudgetTests(QueryBudgetMixin, TestCase):
+    entries_per_queue = 10
+
+
+@override_settings(**SHARED_CACHE_SETTINGS)
+class MediumQueryBudgetTests(QueryBudgetMixin, TestCase):
+    entries_per_queue = 100
+
+
+@override_settings(**SHARED_CACHE_SETTINGS)
+class LargeQueryBudgetTests(QueryBudgetMixin, TestCase):
+    entries_per_queue = 1000
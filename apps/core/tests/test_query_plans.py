@@ -0,0 +1,80 @@
+from unittest import skipUnless
+
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from apps.authentication.models import UserProfile, Organization
+from apps.core.models import QueueEntry, Company, Queue
+
+USERNAME = 'me'
+PASSWORD = '<PASSWORD>'
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite specific')
+class QueryPlanTests(TestCase):
+
+    def setUp(self):
+        self.my_organization = Organization.objects.create(
+            name='my_organization'
+        )
+        self.my_company = Company.objects.create(
+            name='my_company',
+            organization=self.my_organization,
+        )
+        self.my_queue = Queue.objects.create(
+            name='my_queue',
+            company=self.my_company,
+        )
+        QueueEntry.objects.create(description='Lorem', queue=self.my_queue)
+        self.me = UserProfile.objects.create(
+            username=USERNAME,
+            organization=self.my_organization
+        )
+        self.me.set_password(PASSWORD)
+        self.me.save()
+        for codename in ['view_company', 'view_queue', 'view_queueentry']:
+            self.me.user_permissions.add(Permission.objects.get(codename=codename))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+    def explain(self, url: str) -> list[str]:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        plan = []
+        for query in context.captured_queries:
+            if '"core_' not in query['sql']:
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+                plan += [row[-1] for row in cursor.fetchall()]
+        self.assertTrue(plan, f'no query on the core tables for {url}')
+        return plan
+
+    def assert_uses_indexes(self, url: str) -> list[str]:
+        plan = self.explain(url)
+        for step in plan:
+            if step.startswith(('SCAN core_', 'SEARCH core_')):
+                self.assertIn(' USING ', step, f'{url} reads a core table without an index:\n' + '\n'.join(plan))
+        return plan
+
+    def test_list_companies(self):
+        self.assert_uses_indexes('/api/companies/')
+        self.assert_uses_indexes('/api/companies/?search=my')
+
+    def test_list_queues(self):
+        self.assert_uses_indexes('/api/queues/')
+        plan = self.assert_uses_indexes(f'/api/queues/?company_id={self.my_company.id}')
+        self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan)
+
+    def test_list_queue_entries(self):
+        self.assert_uses_indexes('/api/queue-entries/')
+        self.assert_uses_indexes(f'/api/queue-entries/?queue_id={self.my_queue.id}&date=2026-01-01')
+        self.assert_uses_indexes(f'/api/queue-entries/?queue_id={self.my_queue.id}&cursor=')
+
+    def test_list_open_queue_entries(self):
+        plan = self.assert_uses_indexes(f'/api/queue-entries/?queue_id={self.my_queue.id}&waiting_end_is_null=true')
+        self.assertIn('core_qe_org_queue_open_idx', '\n'.join(plan))
+        self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan)
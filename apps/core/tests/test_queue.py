@@ -1,9 +1,17 @@
+import datetime
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
 from django.contrib.auth.models import Permission
-from django.test import TestCase
+from django.db import connections
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
 from rest_framework import status
 
 from apps.authentication.models import UserProfile, Organization
-from apps.core.models import Queue, Company
+from apps.core.models import Queue, Company, QueueEntry, QueueEvent
 
 USERNAME = 'me'
 PASSWORD = '<PASSWORD>'
@@ -178,3 +186,214 @@ class QueueTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, response.content)
         deleted_record_exists = Queue.objects.filter(id=created_record.id).exists()
         self.assertTrue(deleted_record_exists)
+
+    def test_call_next__with_permission(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='change_queueentry'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        queue = Queue.objects.create(name='Alpha Corp', company=self.my_company)
+        first = QueueEntry.objects.create(description='First', queue=queue)
+        second = QueueEntry.objects.create(description='Second', queue=queue)
+        called_ids = []
+        for _ in range(2):
+            response = self.client.post(f'/api/queues/{queue.id}/next/')
+            self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+            data = response.json()
+            self.assertIsNotNone(data['end_waiting'])
+            self.assertEqual(data['updated_by'], USERNAME)
+            called_ids.append(data['id'])
+        self.assertEqual(called_ids, [str(first.id), str(second.id)])
+        self.assertFalse(QueueEntry.objects.filter(queue=queue, end_waiting__isnull=True).exists())
+
+        response = self.client.post(f'/api/queues/{queue.id}/next/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT, response.content)
+
+    def test_call_next__skips_closed_entries(self):
+        queue = Queue.objects.create(name='Alpha Corp', company=self.my_company)
+        closed = QueueEntry.objects.create(description='Closed', queue=queue)
+        waiting = QueueEntry.objects.create(description='Waiting', queue=queue)
+        QueueEntry.objects.filter(id=closed.id).update(end_waiting=closed.start_waiting)
+
+        self.assertEqual(QueueEntry.objects.call_next(queue.id), waiting)
+        self.assertIsNone(QueueEntry.objects.call_next(queue.id))
+
+    def test_call_next__without_update_returning(self):
+        queue = Queue.objects.create(name='Alpha Corp', company=self.my_company)
+        first = QueueEntry.objects.create(description='First', queue=queue)
+        second = QueueEntry.objects.create(description='Second', queue=queue)
+
+        with mock.patch('apps.core.models.queue_entries.can_return_from_update', return_value=False):
+            self.assertEqual(QueueEntry.objects.call_next(queue.id), first)
+            self.assertEqual(QueueEntry.objects.call_next(queue.id), second)
+            self.assertIsNone(QueueEntry.objects.call_next(queue.id))
+        self.assertEqual(QueueEvent.objects.filter(kind=QueueEvent.ENTRY_CLOSED).count(), 2)
+
+    def test_call_next__records_in_the_same_transaction(self):
+        queue = Queue.objects.create(name='Alpha Corp', company=self.my_company)
+        entry = QueueEntry.objects.create(description='First', queue=queue)
+
+        with mock.patch.object(QueueEvent.objects, 'publish', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                QueueEntry.objects.call_next(queue.id)
+        entry.refresh_from_db()
+        self.assertIsNone(entry.end_waiting)
+        self.assertEqual(QueueEntry.objects.call_next(queue.id), entry)
+
+    def test_call_next_for_other_company__with_permission(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='change_queueentry'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        queue = Queue.objects.create(name='Alpha Corp', company=self.other_company)
+        entry = QueueEntry.objects.create(description='First', queue=queue)
+        response = self.client.post(f'/api/queues/{queue.id}/next/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, response.content)
+        self.assertIsNone(QueueEntry.objects.get(id=entry.id).end_waiting)
+
+    def test_call_next__without_permission(self):
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        queue = Queue.objects.create(name='Alpha Corp', company=self.my_company)
+        entry = QueueEntry.objects.create(description='First', queue=queue)
+        response = self.client.post(f'/api/queues/{queue.id}/next/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, response.content)
+        self.assertIsNone(QueueEntry.objects.get(id=entry.id).end_waiting)
+
+    def test_close_all__with_permission(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='change_queueentry'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        queue = Queue.objects.create(name='Alpha Corp', company=self.my_company)
+        other_queue = Queue.objects.create(name='Beta Corp', company=self.my_company)
+        for i in range(3):
+            QueueEntry.objects.create(description=f'Entry {i}', queue=queue)
+        other_entry = QueueEntry.objects.create(description='Other', queue=other_queue)
+        response = self.client.post(f'/api/queues/{queue.id}/close-all/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual(response.json(), {'closed': 3})
+        self.assertFalse(QueueEntry.objects.filter(queue=queue, end_waiting__isnull=True).exists())
+        self.assertEqual(set(QueueEntry.objects.filter(queue=queue).values_list('updated_by', flat=True)), {USERNAME})
+        self.assertIsNone(QueueEntry.objects.get(id=other_entry.id).end_waiting)
+        queue.refresh_from_db()
+        self.assertIsNone(queue.avg_service_seconds)
+
+    def test_close_all_for_other_company__with_permission(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='change_queueentry'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        queue = Queue.objects.create(name='Alpha Corp', company=self.other_company)
+        entry = QueueEntry.objects.create(description='First', queue=queue)
+        response = self.client.post(f'/api/queues/{queue.id}/close-all/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, response.content)
+        self.assertIsNone(QueueEntry.objects.get(id=entry.id).end_waiting)
+
+    def test_organization__follows_company(self):
+        queue = Queue.objects.create(name='Alpha Corp', company=self.my_company)
+        entry = QueueEntry.objects.create(description='First', queue=queue)
+        self.assertEqual(queue.organization_id, self.my_organization.id)
+        self.assertEqual(entry.organization_id, self.my_organization.id)
+
+        queue = Queue.objects.get(id=queue.id)
+        queue.company = self.other_company
+        queue.save()
+        self.assertEqual(QueueEntry.objects.get(id=entry.id).organization_id, self.other_organization.id)
+
+        company = Company.objects.get(id=self.other_company.id)
+        company.organization = self.my_organization
+        company.save()
+        self.assertEqual(Queue.objects.get(id=queue.id).organization_id, self.my_organization.id)
+        self.assertEqual(QueueEntry.objects.get(id=entry.id).organization_id, self.my_organization.id)
+
+    def test_stats__with_permission(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='view_queue'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        queue = Queue.objects.create(name='Alpha Corp', company=self.my_company)
+        now = timezone.now()
+        for minutes in [1, 2, 3, 10]:
+            entry = QueueEntry.objects.create(description='Lorem', queue=queue)
+            QueueEntry.objects.filter(id=entry.id).update(start_waiting=now - datetime.timedelta(minutes=minutes))
+            entry.refresh_from_db()
+            entry.end_waiting = now
+            entry.save()
+        QueueEntry.objects.create(description='Waiting', queue=queue)
+
+        today = timezone.localdate(now - datetime.timedelta(minutes=10))
+        response = self.client.get(f'/api/queues/{queue.id}/stats/?from={today}&to={today}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        data = response.json()
+        self.assertEqual(data['count'], 4)
+        self.assertAlmostEqual(data['avg_wait_seconds'], 240, places=0)
+        self.assertTrue(60 <= data['p50_wait_seconds'] <= 180)
+        self.assertTrue(180 <= data['p95_wait_seconds'] <= 600)
+        self.assertEqual(len(data['days']), 1)
+
+        response = self.client.get(f'/api/queues/{queue.id}/stats/?from=2000-01-01&to=2000-01-31')
+        self.assertEqual(response.json()['count'], 0)
+        self.assertIsNone(response.json()['p95_wait_seconds'])
+
+    def test_stats__invalid_range(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='view_queue'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        queue = Queue.objects.create(name='Alpha Corp', company=self.my_company)
+        response = self.client.get(f'/api/queues/{queue.id}/stats/?from=2026-02-01&to=2026-01-01')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, response.content)
+
+    def test_stats_for_other_company__with_permission(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='view_queue'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        queue = Queue.objects.create(name='Alpha Corp', company=self.other_company)
+        response = self.client.get(f'/api/queues/{queue.id}/stats/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, response.content)
+
+    def test_stats__without_permission(self):
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        queue = Queue.objects.create(name='Alpha Corp', company=self.my_company)
+        response = self.client.get(f'/api/queues/{queue.id}/stats/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, response.content)
+
+
+class QueueCallNextConcurrencyTests(TransactionTestCase):
+    # Each thread has its own database connection. On PostgreSQL the callers
+    # skip each other's locked candidates, on SQLite the conditional UPDATE
+    # is the only claim.
+
+    callers = 4
+    entries = 40
+
+    def setUp(self):
+        organization = Organization.objects.create(name='my_organization')
+        company = Company.objects.create(name='my_company', organization=organization)
+        self.queue = Queue.objects.create(name='Alpha Corp', company=company)
+        self.entry_ids = {
+            entry.id for entry in QueueEntry.objects.create_many([
+                {'queue_id': self.queue.id, 'description': f'Entry {i}'} for i in range(self.entries)
+            ])
+        }
+
+    def call_all(self, barrier: threading.Barrier, called: list) -> None:
+        try:
+            barrier.wait()
+            while (entry := QueueEntry.objects.call_next(self.queue.id)) is not None:
+                called.append(entry.id)
+        finally:
+            connections.close_all()
+
+    def test_call_next__concurrent_callers(self):
+        barrier = threading.Barrier(self.callers)
+        called = [[] for _ in range(self.callers)]
+        with ThreadPoolExecutor(self.callers) as executor:
+            futures = [executor.submit(self.call_all, barrier, ids) for ids in called]
+            for future in futures:
+                future.result()
+
+        all_called = [entry_id for ids in called for entry_id in ids]
+        self.assertEqual(len(all_called), len(set(all_called)))
+        self.assertEqual(set(all_called), self.entry_ids)
+        self.assertFalse(QueueEntry.objects.filter(queue=self.queue, end_waiting__isnull=True).exists())
+        closed_events = Counter(
+            QueueEvent.objects.filter(kind=QueueEvent.ENTRY_CLOSED).values_list('entry_id', flat=True)
+        )
+        self.assertEqual(closed_events, Counter(self.entry_ids))
@@ -0,0 +1,157 @@
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connections
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from apps.authentication.models import Organization
+from apps.core.models import QueueEntry, Company, Queue, QueueDailyStats
+from apps.core.models.queue_daily_stats import wait_percentile, empty_buckets
+
+
+class QueueDailyStatsTests(TestCase):
+
+    def setUp(self):
+        self.my_organization = Organization.objects.create(
+            name='my_organization'
+        )
+        self.my_company = Company.objects.create(
+            name='my_company',
+            organization=self.my_organization,
+        )
+        self.my_queue = Queue.objects.create(
+            company=self.my_company,
+        )
+
+    def create_closed_entry(self, start_waiting: datetime.datetime, wait: datetime.timedelta) -> QueueEntry:
+        entry = QueueEntry.objects.create(description='Lorem', queue=self.my_queue)
+        QueueEntry.objects.filter(id=entry.id).update(start_waiting=start_waiting)
+        entry.refresh_from_db()
+        entry.end_waiting = start_waiting + wait
+        entry.save()
+        return entry
+
+    def test_wait_percentile(self):
+        self.assertIsNone(wait_percentile(empty_buckets(), 0, 0, 0.5))
+        stats = QueueDailyStats(queue=self.my_queue, day=datetime.date(2026, 1, 1))
+        stats.add([10, 20, 40, 50, 100000])
+        self.assertEqual(stats.count, 5)
+        self.assertEqual(stats.max_wait_seconds, 100000)
+        self.assertTrue(30 <= wait_percentile(stats.buckets, stats.count, stats.max_wait_seconds, 0.5) <= 60)
+        self.assertTrue(86400 <= wait_percentile(stats.buckets, stats.count, stats.max_wait_seconds, 0.95) <= 100000)
+
+    def test_closing_entries__updates_rollup(self):
+        yesterday = timezone.now() - datetime.timedelta(days=1)
+        self.create_closed_entry(yesterday, datetime.timedelta(minutes=5))
+        self.create_closed_entry(yesterday, datetime.timedelta(minutes=15))
+        QueueEntry.objects.create(description='Waiting', queue=self.my_queue)
+
+        stats = QueueDailyStats.objects.get(queue=self.my_queue)
+        self.assertEqual(stats.day, timezone.localdate(yesterday))
+        self.assertEqual(stats.count, 2)
+        self.assertAlmostEqual(stats.wait_seconds_sum, 1200)
+
+    def test_editing_closed_entry__moves_wait(self):
+        yesterday = timezone.now() - datetime.timedelta(days=1)
+        entry = self.create_closed_entry(yesterday, datetime.timedelta(minutes=5))
+        self.create_closed_entry(yesterday, datetime.timedelta(minutes=15))
+
+        entry.end_waiting = yesterday + datetime.timedelta(minutes=10)
+        entry.save()
+        stats = QueueDailyStats.objects.get(queue=self.my_queue)
+        self.assertEqual(stats.count, 2)
+        self.assertAlmostEqual(stats.wait_seconds_sum, 1500)
+        self.assertEqual(sum(stats.buckets), 2)
+
+        entry.start_waiting = yesterday - datetime.timedelta(days=1)
+        entry.save()
+        moved = QueueDailyStats.objects.get(queue=self.my_queue, day=timezone.localdate(entry.start_waiting))
+        self.assertEqual(moved.count, 1)
+        stats.refresh_from_db()
+        self.assertEqual(stats.count, 1)
+        self.assertAlmostEqual(stats.wait_seconds_sum, 900)
+
+    def test_reopening_entry__removes_wait(self):
+        yesterday = timezone.now() - datetime.timedelta(days=1)
+        entry = self.create_closed_entry(yesterday, datetime.timedelta(minutes=5))
+
+        entry.end_waiting = None
+        entry.save()
+        stats = QueueDailyStats.objects.get(queue=self.my_queue)
+        self.assertEqual(stats.count, 0)
+        self.assertEqual(stats.wait_seconds_sum, 0)
+        self.assertEqual(stats.buckets, empty_buckets())
+
+        entry.end_waiting = yesterday + datetime.timedelta(minutes=20)
+        entry.save()
+        stats.refresh_from_db()
+        self.assertEqual(stats.count, 1)
+        self.assertAlmostEqual(stats.wait_seconds_sum, 1200)
+
+    def test_deleting_closed_entry__removes_wait(self):
+        yesterday = timezone.now() - datetime.timedelta(days=1)
+        entry = self.create_closed_entry(yesterday, datetime.timedelta(minutes=5))
+        self.create_closed_entry(yesterday, datetime.timedelta(minutes=15))
+
+        QueueEntry.objects.get(id=entry.id).delete()
+        stats = QueueDailyStats.objects.get(queue=self.my_queue)
+        self.assertEqual(stats.count, 1)
+        self.assertAlmostEqual(stats.wait_seconds_sum, 900)
+        self.assertEqual(sum(stats.buckets), 1)
+
+    def test_close_all__updates_rollup(self):
+        for _ in range(3):
+            QueueEntry.objects.create(description='Lorem', queue=self.my_queue)
+        QueueEntry.objects.close_all(self.my_queue.id)
+        self.assertEqual(QueueDailyStats.objects.get(queue=self.my_queue).count, 3)
+
+    def test_rebuild_queue_stats(self):
+        now = timezone.now()
+        for days in range(3):
+            self.create_closed_entry(now - datetime.timedelta(days=days), datetime.timedelta(minutes=days + 1))
+        expected = list(QueueDailyStats.objects.values('day', 'count', 'wait_seconds_sum', 'max_wait_seconds', 'buckets'))
+        QueueDailyStats.objects.all().delete()
+        QueueDailyStats.objects.create(queue=self.my_queue, day=timezone.localdate(now), count=99)
+
+        call_command('rebuild_queue_stats', stdout=StringIO())
+        rebuilt = list(QueueDailyStats.objects.values('day', 'count', 'wait_seconds_sum', 'max_wait_seconds', 'buckets'))
+        self.assertEqual(rebuilt, expected)
+
+        call_command('rebuild_queue_stats', '--from', str(timezone.localdate(now)), stdout=StringIO())
+        self.assertEqual(QueueDailyStats.objects.count(), 3)
+
+
+class QueueDailyStatsConcurrencyTests(TransactionTestCase):
+
+    writers = 4
+    rounds = 25
+
+    def setUp(self):
+        organization = Organization.objects.create(name='my_organization')
+        company = Company.objects.create(name='my_company', organization=organization)
+        self.queue = Queue.objects.create(company=company)
+
+    def add_waits(self, barrier: threading.Barrier, day: datetime.date) -> None:
+        try:
+            barrier.wait()
+            for _ in range(self.rounds):
+                QueueDailyStats.objects.add_waits(self.queue.id, day, [10, 100])
+        finally:
+            connections.close_all()
+
+    def test_add_waits__concurrent_writers__lossless(self):
+        day = datetime.date(2026, 1, 1)
+        barrier = threading.Barrier(self.writers)
+        with ThreadPoolExecutor(self.writers) as executor:
+            futures = [executor.submit(self.add_waits, barrier, day) for _ in range(self.writers)]
+            for future in futures:
+                future.result()
+
+        stats = QueueDailyStats.objects.get(queue=self.queue, day=day)
+        self.assertEqual(stats.count, self.writers * self.rounds * 2)
+        self.assertAlmostEqual(stats.wait_seconds_sum, self.writers * self.rounds * 110)
+        self.assertEqual(sum(stats.buckets), stats.count)
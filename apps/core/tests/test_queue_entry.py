@@ -1,5 +1,13 @@
+import csv
+import datetime
+import io
+import json
+
 from django.contrib.auth.models import Permission
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
 
 from apps.authentication.models import UserProfile, Organization
@@ -99,6 +107,25 @@ class QueueEntryTests(TestCase):
         self.assertEqual(updated_record.queue, self.my_queue)
         self.assertEqual(updated_record.description, updated_description)
 
+    def test_update_for_my_queue__checks_tenancy_once(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='change_queueentry'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        created_record = QueueEntry.objects.create(description='Alpha Corp', queue=self.my_queue)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.put(
+                f'/api/queue-entries/{created_record.id}/',
+                data={
+                    'description': 'Alpha Corp II',
+                    'queue': self.my_queue.id,
+                },
+                content_type='application/json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        queries = [query['sql'] for query in context.captured_queries if '"core_' in query['sql']]
+        # tenancy of the target queue, the entry with its queue, the queue of the payload, the update
+        self.assertEqual(len(queries), 4, '\n'.join(queries))
+
     def test_update_for_my_company__with_permission_but_set_to_other_company(self):
         self.me.user_permissions.add(Permission.objects.get(codename='change_queueentry'))
         self.client.login(username=USERNAME, password=PASSWORD)
@@ -183,3 +210,300 @@ class QueueEntryTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, response.content)
         deleted_record_exists = QueueEntry.objects.filter(id=created_record.id).exists()
         self.assertTrue(deleted_record_exists)
+
+    def test_list_cursor__pages_through_all_entries(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='view_queueentry'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        created_ids = [
+            str(QueueEntry.objects.create(description=f'Entry {i}', queue=self.my_queue).id)
+            for i in range(5)
+        ]
+        QueueEntry.objects.create(description='Other', queue=self.other_queue)
+        listed_ids = []
+        url = '/api/queue-entries/?cursor=&limit=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+            data = response.json()
+            self.assertNotIn('count', data)
+            listed_ids += [entry['id'] for entry in data['results']]
+            url = data['next']
+        self.assertEqual(listed_ids, created_ids)
+
+    def test_list_cursor__with_count(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='view_queueentry'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        for i in range(3):
+            QueueEntry.objects.create(description=f'Entry {i}', queue=self.my_queue)
+        response = self.client.get('/api/queue-entries/?cursor=&limit=2&count=true')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        data = response.json()
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(len(data['results']), 2)
+        self.assertNotIn('count=', data['next'])
+
+    def test_list_cursor__invalid_cursor(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='view_queueentry'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        response = self.client.get('/api/queue-entries/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, response.content)
+
+    def test_retrieve_public__position_and_estimated_wait(self):
+        first = QueueEntry.objects.create(description='First', queue=self.my_queue)
+        second = QueueEntry.objects.create(description='Second', queue=self.my_queue)
+        third = QueueEntry.objects.create(description='Third', queue=self.my_queue)
+        QueueEntry.objects.create(description='Other', queue=self.other_queue)
+        Queue.objects.filter(id=self.my_queue.id).update(avg_service_seconds=90.0)
+
+        response = self.client.get(f'/api/queue-entries/{third.id}/public/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        data = response.json()
+        self.assertEqual(data['position'], 3)
+        self.assertEqual(data['estimated_wait_seconds'], 270)
+
+        first.end_waiting = first.start_waiting + datetime.timedelta(minutes=1)
+        first.save()
+        data = self.client.get(f'/api/queue-entries/{third.id}/public/').json()
+        self.assertEqual(data['position'], 2)
+
+        data = self.client.get(f'/api/queue-entries/{first.id}/public/').json()
+        self.assertIsNone(data['position'])
+        self.assertIsNone(data['estimated_wait_seconds'])
+
+    def test_closing_entries__updates_service_time_average(self):
+        entries = [QueueEntry.objects.create(description=f'Entry {i}', queue=self.my_queue) for i in range(4)]
+        closed_at = timezone.now()
+        for minutes, entry in zip([0, 2, 4, 120], entries):
+            entry.end_waiting = closed_at + datetime.timedelta(minutes=minutes)
+            entry.save()
+        self.my_queue.refresh_from_db()
+        # 120s, then 0.2 * 120 + 0.8 * 120 and the 116 minute gap is ignored
+        self.assertAlmostEqual(self.my_queue.avg_service_seconds, 120.0)
+        self.assertEqual(self.my_queue.last_closed_at, entries[-1].end_waiting)
+
+        entries[-1].description = 'Updated'
+        entries[-1].save()
+        self.my_queue.refresh_from_db()
+        self.assertAlmostEqual(self.my_queue.avg_service_seconds, 120.0)
+
+    def test_list__not_modified(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='view_queueentry'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        QueueEntry.objects.create(description='First', queue=self.my_queue)
+        for url in [f'/api/queue-entries/?queue_id={self.my_queue.id}', '/api/queue-entries/?cursor=']:
+            etag = self.client.get(url)['ETag']
+            response = self.client.get(url, headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, response.content)
+
+            QueueEntry.objects.create(description='Second', queue=self.my_queue)
+            response = self.client.get(url, headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+
+    def test_retrieve_public__not_modified_until_position_changes(self):
+        first = QueueEntry.objects.create(description='First', queue=self.my_queue)
+        second = QueueEntry.objects.create(description='Second', queue=self.my_queue)
+
+        response = self.client.get(f'/api/queue-entries/{second.id}/public/')
+        self.assertNotIn('Last-Modified', response)
+        etag = response['ETag']
+        response = self.client.get(f'/api/queue-entries/{second.id}/public/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, response.content)
+
+        first.end_waiting = timezone.now()
+        first.save()
+        response = self.client.get(f'/api/queue-entries/{second.id}/public/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual(response.json()['position'], 1)
+
+    def test_retrieve_public__cached_until_queue_changes(self):
+        first = QueueEntry.objects.create(description='First', queue=self.my_queue)
+        second = QueueEntry.objects.create(description='Second', queue=self.my_queue)
+        url = f'/api/queue-entries/{second.id}/public/'
+
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            cached = self.client.get(url)
+        self.assertEqual(cached['X-Cache'], 'HIT')
+        self.assertEqual(cached.json(), response.json())
+        self.assertEqual(cached['ETag'], response['ETag'])
+        response = self.client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # another entry of the queue
+        self.assertEqual(QueueEntry.objects.call_next(self.my_queue.id), first)
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['position'], 1)
+
+        # the queue
+        self.my_queue.name = 'Renamed'
+        self.my_queue.save()
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+
+        # the entry itself
+        second.description = 'Changed'
+        second.save()
+        self.assertEqual(self.client.get(url).json()['description'], 'Changed')
+        second.delete()
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_retrieve_public__other_queues_stay_cached(self):
+        entry = QueueEntry.objects.create(description='First', queue=self.my_queue)
+        url = f'/api/queue-entries/{entry.id}/public/'
+        self.client.get(url)
+
+        QueueEntry.objects.create_many([{'queue_id': self.other_queue.id, 'description': 'Other'}])
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+        QueueEntry.objects.create_many([{'queue_id': self.my_queue.id, 'description': 'Second'}])
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+
+    @override_settings(QUEUE_ENTRY_PUBLIC_CACHE_TTL=0)
+    def test_retrieve_public__ttl(self):
+        entry = QueueEntry.objects.create(description='First', queue=self.my_queue)
+
+        self.client.get(f'/api/queue-entries/{entry.id}/public/')
+        self.assertEqual(self.client.get(f'/api/queue-entries/{entry.id}/public/')['X-Cache'], 'MISS')
+
+    def test_public_cache_stats(self):
+        entry = QueueEntry.objects.create(description='First', queue=self.my_queue)
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        response = self.client.get('/api/queue-entries/public/cache-stats/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.me.is_staff = True
+        self.me.save()
+        before = self.client.get('/api/queue-entries/public/cache-stats/').json()
+        self.client.get(f'/api/queue-entries/{entry.id}/public/')
+        self.client.get(f'/api/queue-entries/{entry.id}/public/')
+        after = self.client.get('/api/queue-entries/public/cache-stats/').json()
+        self.assertEqual(after['hits'] - before['hits'], 1)
+        self.assertEqual(after['misses'] - before['misses'], 1)
+
+    def test_bulk_create_for_my_queue__with_permission(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='add_queueentry'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+        second_queue = Queue.objects.create(company=self.my_company)
+
+        response = self.client.post(
+            '/api/queue-entries/bulk/',
+            data=[
+                {'queue': self.my_queue.id, 'description': 'First'},
+                {'queue': second_queue.id, 'description': 'Second'},
+                {'queue': self.my_queue.id, 'description': 'Third'},
+            ],
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        data = response.json()
+        self.assertEqual([entry['description'] for entry in data], ['First', 'Second', 'Third'])
+        created_records = QueueEntry.objects.filter(id__in=[entry['id'] for entry in data])
+        self.assertEqual(created_records.count(), 3)
+        for created_record in created_records:
+            self.assertEqual(created_record.created_by, USERNAME)
+            self.assertEqual(created_record.updated_by, USERNAME)
+
+    def test_bulk_create_for_other_queue__with_permission(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='add_queueentry'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        response = self.client.post(
+            '/api/queue-entries/bulk/',
+            data=[
+                {'queue': self.my_queue.id, 'description': 'Mine'},
+                {'queue': self.other_queue.id, 'description': 'Other'},
+            ],
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, response.content)
+        self.assertFalse(QueueEntry.objects.exists())
+
+    def test_bulk_create__invalid(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='add_queueentry'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        for data in [[], [{'queue': self.my_queue.id}], [{'queue': self.my_queue.id, 'description': 'x'}] * 1001]:
+            response = self.client.post('/api/queue-entries/bulk/', data=data, content_type='application/json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, response.content)
+        self.assertFalse(QueueEntry.objects.exists())
+
+    def test_bulk_create__with_out_permission(self):
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        response = self.client.post(
+            '/api/queue-entries/bulk/',
+            data=[{'queue': self.my_queue.id, 'description': 'Lorem'}],
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, response.content)
+
+    def test_export_csv__with_permission(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='view_queueentry'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        entries = [QueueEntry.objects.create(description=f'Lorem, "{i}"', queue=self.my_queue) for i in range(3)]
+        QueueEntry.objects.create(description='Other', queue=self.other_queue)
+        entries[0].end_waiting = timezone.now()
+        entries[0].save()
+
+        response = self.client.get(f'/api/queue-entries/export/?queue_id={self.my_queue.id}&waiting_end_is_null=false')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['id'] for row in rows], [str(entries[0].id)])
+        self.assertEqual(rows[0]['description'], 'Lorem, "0"')
+        detail = self.client.get(f'/api/queue-entries/{entries[0].id}/').json()
+        self.assertEqual(rows[0]['end_waiting'], detail['end_waiting'])
+        self.assertEqual(rows[0]['queue'], str(self.my_queue.id))
+
+        response = self.client.get('/api/queue-entries/export/')
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['id'] for row in rows], [str(entry.id) for entry in entries])
+
+    def test_export__formula_cells(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='view_queueentry'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        description = '=HYPERLINK("http://example.com","Lorem")'
+        QueueEntry.objects.create(description=description, queue=self.my_queue)
+
+        response = self.client.get('/api/queue-entries/export/')
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0]['description'], f"'{description}")
+
+        response = self.client.get('/api/queue-entries/export/?output=ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(rows[0]['description'], description)
+
+    async def test_export_ndjson__asgi(self):
+        await self.me.user_permissions.aadd(await Permission.objects.aget(codename='view_queueentry'))
+        await self.async_client.alogin(username=USERNAME, password=PASSWORD)
+
+        entry = await QueueEntry.objects.acreate(description='Lorem', queue=self.my_queue)
+        await QueueEntry.objects.acreate(description='Other', queue=self.other_queue)
+        response = await self.async_client.get('/api/queue-entries/export/?output=ndjson')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [line async for line in response.streaming_content]
+        rows = [json.loads(line) for line in b''.join(lines).decode().splitlines()]
+        self.assertEqual([row['id'] for row in rows], [str(entry.id)])
+        self.assertIsNone(rows[0]['end_waiting'])
+
+    def test_export__invalid_output(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='view_queueentry'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        response = self.client.get('/api/queue-entries/export/?output=xlsx')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export__without_permission(self):
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        response = self.client.get('/api/queue-entries/export/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
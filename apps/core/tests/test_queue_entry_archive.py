@@ -0,0 +1,125 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth.models import Permission
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+
+from apps.authentication.models import UserProfile, Organization
+from apps.core.models import QueueEntry, Company, Queue, QueueEntryArchive, QueueDailyStats
+
+USERNAME = 'me'
+PASSWORD = '<PASSWORD>'
+
+class QueueEntryArchiveTests(TestCase):
+
+    def setUp(self):
+        self.my_organization = Organization.objects.create(
+            name='my_organization'
+        )
+        self.other_organization = Organization.objects.create(
+            name='other_organization'
+        )
+        self.my_company = Company.objects.create(
+            name='my_company',
+            organization=self.my_organization,
+        )
+        self.other_company = Company.objects.create(
+            name='other_company',
+            organization=self.other_organization,
+        )
+        self.my_queue = Queue.objects.create(
+            company=self.my_company,
+        )
+        self.other_queue = Queue.objects.create(
+            company=self.other_company,
+        )
+        self.me = UserProfile.objects.create(
+            username=USERNAME,
+            organization=self.my_organization
+        )
+        self.me.set_password(PASSWORD)
+        self.me.save()
+
+    def create_entry(self, queue: Queue, days_ago: int, closed: bool = True) -> QueueEntry:
+        start_waiting = timezone.now() - datetime.timedelta(days=days_ago)
+        entry = QueueEntry.objects.create(description=f'{days_ago} days ago', queue=queue)
+        QueueEntry.objects.filter(id=entry.id).update(start_waiting=start_waiting)
+        entry.refresh_from_db()
+        if closed:
+            entry.end_waiting = start_waiting + datetime.timedelta(minutes=5)
+            entry.save()
+        return entry
+
+    def test_archive_queue_entries(self):
+        old = [self.create_entry(self.my_queue, 100 + i) for i in range(5)]
+        old.append(self.create_entry(self.other_queue, 100))
+        still_open = self.create_entry(self.my_queue, 120, closed=False)
+        recent = self.create_entry(self.my_queue, 10)
+
+        call_command('archive_queue_entries', '--days', '90', '--batch-size', '2', '--pause', '0', stdout=StringIO())
+
+        self.assertEqual(
+            set(QueueEntry.objects.values_list('id', flat=True)),
+            {still_open.id, recent.id},
+        )
+        self.assertEqual(set(QueueEntryArchive.objects.values_list('id', flat=True)), {entry.id for entry in old})
+        archived = QueueEntryArchive.objects.get(id=old[0].id)
+        self.assertEqual(archived.organization_id, self.my_organization.id)
+        self.assertEqual(archived.end_waiting, old[0].end_waiting)
+
+    def test_rebuild_queue_stats__includes_archive(self):
+        self.create_entry(self.my_queue, 100)
+        expected = list(QueueDailyStats.objects.values('day', 'count', 'buckets'))
+        call_command('archive_queue_entries', '--pause', '0', stdout=StringIO())
+        call_command('rebuild_queue_stats', stdout=StringIO())
+        self.assertEqual(list(QueueDailyStats.objects.values('day', 'count', 'buckets')), expected)
+
+    def test_list__with_permission(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='view_queueentryarchive'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        entries = [self.create_entry(self.my_queue, 100 + i) for i in range(3)]
+        self.create_entry(self.other_queue, 100)
+        call_command('archive_queue_entries', '--pause', '0', stdout=StringIO())
+
+        response = self.client.get('/api/archived-queue-entries/?limit=2&count=true')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        data = response.json()
+        self.assertEqual(data['count'], 3)
+        ids = [item['id'] for item in data['results']]
+        response = self.client.get(data['next'])
+        ids += [item['id'] for item in response.json()['results']]
+        self.assertEqual(ids, [str(entry.id) for entry in reversed(entries)])
+
+        response = self.client.get(f'/api/archived-queue-entries/{entries[0].id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+
+    def test_retrieve_for_other_organization__with_permission(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='view_queueentryarchive'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        entry = self.create_entry(self.other_queue, 100)
+        call_command('archive_queue_entries', '--pause', '0', stdout=StringIO())
+
+        response = self.client.get(f'/api/archived-queue-entries/{entry.id}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, response.content)
+
+    def test_list__without_permission(self):
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        response = self.client.get('/api/archived-queue-entries/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, response.content)
+
+    def test_archive_is_read_only(self):
+        self.me.user_permissions.add(Permission.objects.get(codename='view_queueentryarchive'))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        entry = self.create_entry(self.my_queue, 100)
+        call_command('archive_queue_entries', '--pause', '0', stdout=StringIO())
+
+        response = self.client.delete(f'/api/archived-queue-entries/{entry.id}/')
+        self.assertIn(response.status_code, [status.HTTP_403_FORBIDDEN, status.HTTP_405_METHOD_NOT_ALLOWED], response.content)
+        self.assertTrue(QueueEntryArchive.objects.filter(id=entry.id).exists())
@@ -0,0 +1,212 @@
+import asyncio
+import datetime
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import Permission
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from oauth2_provider.models import AccessToken, Application
+from rest_framework import status
+
+from apps.authentication.models import UserProfile, Organization
+from apps.core.models import QueueEntry, Company, Queue, QueueEvent
+from apps.core.views.queue_event_view import latest_event_id, queue_entry_public_event_stream
+
+USERNAME = 'me'
+PASSWORD = '<PASSWORD>'
+
+
+async def next_message(response) -> str:
+    return (await asyncio.wait_for(anext(response.streaming_content), 5)).decode()
+
+
+@override_settings(QUEUE_EVENTS_POLL_INTERVAL=0.01)
+class QueueEventTests(TestCase):
+
+    def setUp(self):
+        self.my_organization = Organization.objects.create(
+            name='my_organization'
+        )
+        self.other_organization = Organization.objects.create(
+            name='other_organization'
+        )
+        self.my_company = Company.objects.create(
+            name='my_company',
+            organization=self.my_organization,
+        )
+        self.other_company = Company.objects.create(
+            name='other_company',
+            organization=self.other_organization,
+        )
+        self.my_queue = Queue.objects.create(
+            company=self.my_company,
+        )
+        self.other_queue = Queue.objects.create(
+            company=self.other_company,
+        )
+        self.me = UserProfile.objects.create(
+            username=USERNAME,
+            organization=self.my_organization
+        )
+        self.me.set_password(PASSWORD)
+        self.me.save()
+
+    async def test_queue_events__with_permission(self):
+        await self.me.user_permissions.aadd(await Permission.objects.aget(codename='view_queue'))
+        await self.async_client.alogin(username=USERNAME, password=PASSWORD)
+
+        response = await self.async_client.get(f'/api/queues/{self.my_queue.id}/events/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        try:
+            pending = asyncio.ensure_future(next_message(response))
+            await asyncio.sleep(0.05)
+            entry = await QueueEntry.objects.acreate(description='Lorem', queue=self.my_queue)
+            await QueueEntry.objects.acreate(description='Other', queue=self.other_queue)
+            message = await pending
+            self.assertIn('event: entry-created', message)
+            self.assertIn(str(entry.id), message)
+
+            entry.end_waiting = timezone.now()
+            await sync_to_async(entry.save)()
+            message = await next_message(response)
+            self.assertIn('event: entry-closed', message)
+            self.assertIn(str(entry.id), message)
+        finally:
+            await response.streaming_content.aclose()
+
+    async def test_queue_events__bearer_token(self):
+        await self.me.user_permissions.aadd(await Permission.objects.aget(codename='view_queue'))
+        application = await Application.objects.acreate(
+            name='kiosk',
+            client_type=Application.CLIENT_CONFIDENTIAL,
+            authorization_grant_type=Application.GRANT_CLIENT_CREDENTIALS,
+            user=self.me,
+        )
+        await AccessToken.objects.acreate(
+            user=self.me, application=application, token='kiosk-token',
+            expires=timezone.now() + datetime.timedelta(hours=1), scope='read write',
+        )
+
+        response = await self.async_client.get(
+            f'/api/queues/{self.my_queue.id}/events/', headers={'Authorization': 'Bearer kiosk-token'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        await response.streaming_content.aclose()
+
+        response = await self.async_client.get(
+            f'/api/queues/{self.my_queue.id}/events/', headers={'Authorization': 'Bearer wrong-token'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    async def test_queue_events__replays_after_last_event_id(self):
+        await self.me.user_permissions.aadd(await Permission.objects.aget(codename='view_queue'))
+        await self.async_client.alogin(username=USERNAME, password=PASSWORD)
+
+        first = await QueueEntry.objects.acreate(description='First', queue=self.my_queue)
+        second = await QueueEntry.objects.acreate(description='Second', queue=self.my_queue)
+        first_event = await QueueEvent.objects.aget(entry_id=first.id)
+
+        response = await self.async_client.get(
+            f'/api/queues/{self.my_queue.id}/events/',
+            headers={'Last-Event-ID': str(first_event.id)},
+        )
+        try:
+            message = await next_message(response)
+            self.assertIn(str(second.id), message)
+            self.assertNotIn(str(first.id), message)
+        finally:
+            await response.streaming_content.aclose()
+
+    async def test_queue_events__other_organization(self):
+        await self.me.user_permissions.aadd(await Permission.objects.aget(codename='view_queue'))
+        await self.async_client.alogin(username=USERNAME, password=PASSWORD)
+
+        response = await self.async_client.get(f'/api/queues/{self.other_queue.id}/events/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_queue_events__without_permission(self):
+        await self.async_client.alogin(username=USERNAME, password=PASSWORD)
+
+        response = await self.async_client.get(f'/api/queues/{self.my_queue.id}/events/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    async def test_queue_entry_public_events(self):
+        first = await QueueEntry.objects.acreate(description='First', queue=self.my_queue)
+        mine = await QueueEntry.objects.acreate(description='Mine', queue=self.my_queue)
+
+        response = await self.async_client.get(f'/api/queue-entries/{mine.id}/public/events/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        try:
+            message = await next_message(response)
+            self.assertIn('"position": 2', message)
+            self.assertNotIn(str(first.id), message)
+
+            pending = asyncio.ensure_future(next_message(response))
+            await asyncio.sleep(0.05)
+            await QueueEntry.objects.acreate(description='Behind', queue=self.my_queue)
+            first.end_waiting = timezone.now()
+            await sync_to_async(first.save)()
+            message = await pending
+            self.assertIn('event: entry-closed', message)
+            self.assertIn('"position": 1', message)
+            self.assertNotIn(str(first.id), message)
+
+            mine.end_waiting = timezone.now()
+            await sync_to_async(mine.save)()
+            message = await next_message(response)
+            self.assertIn('event: entry-closed', message)
+            self.assertIn('"position": null', message)
+        finally:
+            await response.streaming_content.aclose()
+
+    async def test_queue_entry_public_events__deleted_entries(self):
+        first = await QueueEntry.objects.acreate(description='First', queue=self.my_queue)
+        mine = await QueueEntry.objects.acreate(description='Mine', queue=self.my_queue)
+
+        response = await self.async_client.get(f'/api/queue-entries/{mine.id}/public/events/')
+        try:
+            message = await next_message(response)
+            self.assertIn('"position": 2', message)
+
+            pending = asyncio.ensure_future(next_message(response))
+            await asyncio.sleep(0.05)
+            await sync_to_async(first.delete)()
+            message = await pending
+            self.assertIn('event: entry-deleted', message)
+            self.assertIn('"position": 1', message)
+
+            await sync_to_async(mine.delete)()
+            message = await next_message(response)
+            self.assertIn('event: entry-deleted', message)
+            self.assertIn('"position": null', message)
+        finally:
+            await response.streaming_content.aclose()
+
+    async def test_queue_entry_public_events__closed_before_subscribing(self):
+        first = await QueueEntry.objects.acreate(description='First', queue=self.my_queue)
+        mine = await QueueEntry.objects.acreate(description='Mine', queue=self.my_queue)
+        # the view read the last event id and loaded the open entry, then the
+        # entries are closed before the stream counts and subscribes
+        after_id = await latest_event_id()
+        entry = await QueueEntry.objects.select_related('queue').aget(id=mine.id)
+        first.end_waiting = timezone.now()
+        await sync_to_async(first.save)()
+        mine.end_waiting = timezone.now()
+        await sync_to_async(mine.save)()
+
+        stream = queue_entry_public_event_stream(entry, after_id)
+        try:
+            message = await asyncio.wait_for(anext(stream), 5)
+            self.assertIn('"position": 1', message)
+            message = await asyncio.wait_for(anext(stream), 5)
+            self.assertIn('event: entry-closed', message)
+            self.assertIn('"position": null', message)
+        finally:
+            await stream.aclose()
+
+    async def test_queue_entry_public_events__closed_entry(self):
+        entry = await QueueEntry.objects.acreate(description='Lorem', queue=self.my_queue, end_waiting=timezone.now())
+
+        response = await self.async_client.get(f'/api/queue-entries/{entry.id}/public/events/')
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
@@ -0,0 +1,94 @@
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from apps.authentication.models import UserProfile, Organization
+from apps.core.models import Queue, Company, QueueEntry
+
+USERNAME = 'me'
+PASSWORD = '<PASSWORD>'
+
+class SparseFieldsTests(TestCase):
+
+    def setUp(self):
+        self.my_organization = Organization.objects.create(name='my_organization')
+        self.my_company = Company.objects.create(name='my_company', organization=self.my_organization)
+        self.my_queue = Queue.objects.create(name='my_queue', company=self.my_company)
+        self.entries = QueueEntry.objects.create_many([
+            {'queue_id': self.my_queue.id, 'description': f'Entry {i}'} for i in range(3)
+        ])
+        self.me = UserProfile.objects.create(username=USERNAME, organization=self.my_organization)
+        self.me.set_password(PASSWORD)
+        self.me.save()
+        self.me.user_permissions.add(*Permission.objects.filter(
+            codename__in=['view_company', 'view_queue', 'view_queueentry', 'add_company']
+        ))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+    def get(self, path: str):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+        selects = [query['sql'] for query in queries if 'core_queueentry' in query['sql']]
+        return response, selects
+
+    def test_list__fields(self):
+        response, selects = self.get('/api/queue-entries/?fields=id,start_waiting,end_waiting')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual(len(response.json()['results']), 3)
+        for entry in response.json()['results']:
+            self.assertEqual(list(entry), ['id', 'start_waiting', 'end_waiting'])
+        self.assertTrue(selects)
+        self.assertFalse([sql for sql in selects if 'description' in sql], selects)
+
+    def test_list__omit(self):
+        response, selects = self.get('/api/queue-entries/?omit=description,created_by')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual(
+            list(response.json()['results'][0]),
+            ['id', 'created_at', 'updated_at', 'updated_by', 'start_waiting', 'end_waiting', 'queue'],
+        )
+        self.assertFalse([sql for sql in selects if 'description' in sql], selects)
+
+    def test_list__fields_and_omit(self):
+        response = self.client.get('/api/queues/?fields=id,name,company&omit=company')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual(response.json()['results'], [{'id': self.my_queue.id, 'name': 'my_queue'}])
+
+    def test_list__keyset(self):
+        response = self.client.get('/api/queue-entries/?cursor=&limit=2&fields=id')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual(response.json()['results'], [{'id': str(entry.id)} for entry in self.entries[:2]])
+        response = self.client.get(response.json()['next'])
+        self.assertEqual(response.json()['results'], [{'id': str(self.entries[2].id)}])
+
+    def test_list__etag_depends_on_fields(self):
+        response = self.client.get('/api/companies/?fields=id')
+        other = self.client.get('/api/companies/?fields=name')
+        self.assertNotEqual(response['ETag'], other['ETag'])
+
+    def test_retrieve__fields(self):
+        entry = self.entries[0]
+        response, selects = self.get(f'/api/queue-entries/{entry.id}/?fields=id,end_waiting')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual(response.json(), {'id': str(entry.id), 'end_waiting': None})
+        self.assertFalse([sql for sql in selects if 'description' in sql], selects)
+
+    def test_unknown_field(self):
+        response = self.client.get('/api/companies/?fields=id,secret&omit=nothing')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, response.content)
+        self.assertEqual(response.json(), {
+            'fields': ['Unknown field: secret.'],
+            'omit': ['Unknown field: nothing.'],
+        })
+
+    def test_unknown_field__no_permission(self):
+        self.me.user_permissions.clear()
+        response = self.client.get('/api/companies/?fields=secret')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, response.content)
+
+    def test_create__ignores_fields(self):
+        response = self.client.post('/api/companies/?fields=id', data={'name': 'new'}, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        self.assertEqual(response.json()['name'], 'new')
@@ -0,0 +1,80 @@
+import os
+import sqlite3
+import tempfile
+import threading
+
+from django.db import OperationalError
+from django.test import SimpleTestCase
+
+from apps.shared.db.sqlite3.base import DatabaseWrapper
+
+
+class SQLiteBackendTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.name = os.path.join(directory.name, 'db.sqlite3')
+        self.connection = DatabaseWrapper({
+            'ENGINE': 'apps.shared.db.sqlite3',
+            'NAME': self.name,
+            'OPTIONS': {
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': 0,
+                'init_command': 'PRAGMA journal_mode=WAL;PRAGMA synchronous=NORMAL',
+                'locked_retries': 5,
+                'locked_backoff': 0.05,
+            },
+            'TIME_ZONE': None,
+            'CONN_HEALTH_CHECKS': False,
+            'AUTOCOMMIT': True,
+            'ATOMIC_REQUESTS': False,
+            'CONN_MAX_AGE': 0,
+            'USER': '',
+            'PASSWORD': '',
+            'HOST': '',
+            'PORT': '',
+        }, alias='sqlite_backend')
+        self.addCleanup(self.connection.close)
+        with self.connection.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (id integer PRIMARY KEY)')
+
+    def lock(self, seconds: float) -> None:
+        # hold the write lock from another connection for a while
+        other = sqlite3.connect(self.name, isolation_level=None, check_same_thread=False)
+        other.execute('BEGIN IMMEDIATE')
+        timer = threading.Timer(seconds, lambda: (other.rollback(), other.close()))
+        timer.start()
+        self.addCleanup(timer.join)
+
+    def test_pragmas(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone(), ('wal',))
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone(), (1,))
+
+    def test_locked__retried(self):
+        self.lock(0.1)
+        with self.connection.cursor() as cursor:
+            cursor.execute('INSERT INTO item (id) VALUES (1)')
+        with self.connection.cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM item')
+            self.assertEqual(cursor.fetchone(), (1,))
+
+    def test_locked__begin_retried(self):
+        # what transaction.atomic() does on SQLite
+        self.lock(0.1)
+        self.connection._start_transaction_under_autocommit()
+        self.assertTrue(self.connection.connection.in_transaction)
+        with self.connection.cursor() as cursor:
+            cursor.execute('INSERT INTO item (id) VALUES (1)')
+        self.connection.commit()
+
+    def test_locked__gives_up(self):
+        self.connection.close()
+        self.connection.settings_dict['OPTIONS']['locked_retries'] = 1
+        self.lock(1)
+        with self.assertRaisesMessage(OperationalError, 'database is locked'):
+            with self.connection.cursor() as cursor:
+                cursor.execute('INSERT INTO item (id) VALUES (1)')
@@ -0,0 +1,87 @@
+from unittest import mock
+
+from django.contrib.auth.models import Permission
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import serializers
+
+from apps.authentication.models import UserProfile, Organization
+from apps.core.models import Queue, Company, QueueEntry
+from apps.core.serializers.company_serializyer import CompanySerializer
+from apps.core.serializers.queue_entry_serializyer import QueueEntryPublicSerializer, QueueEntrySerializer
+from apps.core.serializers.queue_serializyer import QueueSerializer
+from apps.shared.mixins import ConditionalGetMixin
+from apps.shared.serializers import ValuesSerializer
+
+USERNAME = 'me'
+PASSWORD = '<PASSWORD>'
+
+class ValuesSerializerTests(TestCase):
+
+    def setUp(self):
+        self.my_organization = Organization.objects.create(name='my_organization')
+        self.my_company = Company.objects.create(name='my_company', organization=self.my_organization)
+        Company.objects.create(name='Zürich "quoted"', organization=self.my_organization)
+        self.my_queue = Queue.objects.create(name='my_queue', company=self.my_company)
+        Queue.objects.create(name='other_queue', company=self.my_company)
+        entries = QueueEntry.objects.create_many([
+            {'queue_id': self.my_queue.id, 'description': f'Entry {i}'} for i in range(5)
+        ])
+        QueueEntry.objects.filter(id=entries[0].id).update(end_waiting=timezone.now())
+        self.me = UserProfile.objects.create(username=USERNAME, organization=self.my_organization)
+        self.me.set_password(PASSWORD)
+        self.me.save()
+        self.me.user_permissions.add(*Permission.objects.filter(
+            codename__in=['view_company', 'view_queue', 'view_queueentry']
+        ))
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+    def assert_same_content(self, path: str):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, response.content)
+        with mock.patch.object(ConditionalGetMixin, 'values_list', False):
+            expected = self.client.get(path)
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(response['ETag'], expected['ETag'])
+        return response
+
+    def test_compile__list_serializers(self):
+        for serializer_class in (CompanySerializer, QueueSerializer, QueueEntrySerializer):
+            self.assertIsNotNone(ValuesSerializer.compile(serializer_class()), serializer_class)
+
+    def test_compile__unsupported_fields(self):
+        class MethodSerializer(QueueSerializer):
+            label = serializers.SerializerMethodField()
+
+            def get_label(self, instance):
+                return instance.name
+
+        self.assertIsNone(ValuesSerializer.compile(MethodSerializer()))
+        self.assertIsNone(ValuesSerializer.compile(QueueEntryPublicSerializer()))
+
+    def test_list__companies(self):
+        response = self.assert_same_content('/api/companies/')
+        self.assertEqual(response.json()['count'], 2)
+
+    def test_list__queues(self):
+        self.assert_same_content('/api/queues/')
+        self.assert_same_content(f'/api/queues/?company_id={self.my_company.id}&limit=1&offset=1')
+
+    def test_list__queue_entries(self):
+        response = self.assert_same_content('/api/queue-entries/')
+        self.assertEqual(len(response.json()['results']), 5)
+
+    @override_settings(TIME_ZONE='Europe/Zurich')
+    def test_list__queue_entries__local_time(self):
+        response = self.assert_same_content('/api/queue-entries/?waiting_end_is_null=false')
+        self.assertIn('+0', response.json()['results'][0]['end_waiting'])
+
+    def test_list__queue_entries__keyset(self):
+        response = self.assert_same_content('/api/queue-entries/?cursor=&limit=2')
+        response = self.assert_same_content(response.json()['next'])
+        self.assert_same_content(response.json()['next'])
+
+    def test_list__queue_entries__not_modified(self):
+        response = self.client.get('/api/queue-entries/?cursor=')
+        response = self.client.get('/api/queue-entries/?cursor=', headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
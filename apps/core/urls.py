@@ -1,3 +1,4 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
 from apps.core import views
@@ -7,5 +8,9 @@ router = DefaultRouter()
 router.register('companies', views.CompanyViewSet, 'companies')
 router.register('queues', views.QueueViewSet, 'queues')
 router.register('queue-entries', views.QueueEntryViewSet, 'queue-entries')
+router.register('archived-queue-entries', views.QueueEntryArchiveViewSet, 'archived-queue-entries')
 
-urlpatterns = router.get_urls()
+urlpatterns = [
+    path('queues/<int:pk>/events/', views.queue_events, name='queues-events'),
+    path('queue-entries/<uuid:pk>/public/events/', views.queue_entry_public_events, name='queue-entries-public-events'),
+] + router.get_urls()
@@ -1,3 +1,5 @@
 from apps.core.views.company_view import CompanyViewSet
+from apps.core.views.queue_entry_archive_view import QueueEntryArchiveViewSet
 from apps.core.views.queue_entry_view import QueueEntryViewSet
 from apps.core.views.queue_view import QueueViewSet
+from apps.core.views.queue_event_view import queue_events, queue_entry_public_events
@@ -4,12 +4,13 @@ from rest_framework.viewsets import ModelViewSet
 from apps.authentication.models import UserProfile
 from apps.core.models import Company
 from apps.core.serializers.company_serializyer import CompanySerializer, CompanyFilterSerializer
+from apps.shared.mixins import ConditionalGetMixin, SparseFieldsMixin, sparse_fields_parameters
 from apps.shared.permissions import StrictModelPermission
 from config.middlewares import get_current_user
 
 
 @extend_schema(tags=['Company'])
-class CompanyViewSet(ModelViewSet):
+class CompanyViewSet(SparseFieldsMixin, ConditionalGetMixin, ModelViewSet):
     queryset = Company.objects.all()
     serializer_class = CompanySerializer
     permission_classes = [StrictModelPermission]
@@ -20,6 +21,7 @@ class CompanyViewSet(ModelViewSet):
 
     @extend_schema('List Companies', parameters=[
         OpenApiParameter(name='search', required=False, type=str, description='Search term'),
+        *sparse_fields_parameters(CompanySerializer),
     ])
     def list(self, request, *args, **kwargs):
         serializer = CompanyFilterSerializer(data=request.query_params)
@@ -28,11 +30,9 @@ class CompanyViewSet(ModelViewSet):
         queryset = self.get_queryset()
         if search := data.get('search'):
             queryset = queryset.filter(name__icontains=search)
-        queryset = self.paginate_queryset(queryset)
-        serializer = self.get_serializer(queryset, many=True)
-        return self.get_paginated_response(serializer.data)
+        return self.list_response(queryset)
 
-    @extend_schema('Find Company By ID')
+    @extend_schema('Find Company By ID', parameters=sparse_fields_parameters(CompanySerializer))
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
@@ -50,4 +50,4 @@ class CompanyViewSet(ModelViewSet):
 
     def get_queryset(self):
         user: UserProfile = get_current_user()
-        return super().get_queryset().filter(organization=user.organization)
+        return super().get_queryset().filter(organization_id=user.organization_id)
@@ -0,0 +1,56 @@
+import datetime
+
+from django.utils import timezone
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
+from rest_framework.viewsets import ReadOnlyModelViewSet
+
+from apps.authentication.models import UserProfile
+from apps.core.models import QueueEntryArchive
+from apps.core.serializers.queue_entry_serializyer import QueueEntryArchiveSerializer, \
+    QueueEntryArchiveFilterSerializer
+from apps.shared.mixins import ConditionalGetMixin
+from apps.shared.pagination import KeysetPagination
+from apps.shared.permissions import StrictModelPermission
+from config.middlewares import get_current_user
+
+
+class QueueEntryArchivePagination(KeysetPagination):
+    ordering = ('start_waiting', 'id')
+
+
+@extend_schema(tags=['Queue Entry Archive'])
+class QueueEntryArchiveViewSet(ConditionalGetMixin, ReadOnlyModelViewSet):
+    queryset = QueueEntryArchive.objects.all()
+    serializer_class = QueueEntryArchiveSerializer
+    permission_classes = [StrictModelPermission]
+    pagination_class = QueueEntryArchivePagination
+    validator_fields = ()
+
+    @extend_schema('List Archived Queue Entries', parameters=[
+        OpenApiParameter(name='queue_id', required=False, type=int, description='ID of the queue'),
+        OpenApiParameter(name='date', required=False, type=datetime.date, description='Date of the queue entry', examples=[OpenApiExample('Date ISO Format', 'YYYY-mm-dd')]),
+        OpenApiParameter(name='cursor', required=False, type=str, description='Follow `next` for the following pages'),
+        OpenApiParameter(name='count', required=False, type=bool, description='Include the total count'),
+    ])
+    def list(self, request, *args, **kwargs):
+        serializer = QueueEntryArchiveFilterSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        queryset = self.get_queryset()
+        if queue_id := data.get('queue_id'):
+            queryset = queryset.filter(queue_id=queue_id)
+        if date := data.get('date'):
+            day_start = datetime.datetime.combine(date, datetime.time.min, tzinfo=timezone.get_current_timezone())
+            queryset = queryset.filter(
+                start_waiting__gte=day_start,
+                start_waiting__lt=day_start + datetime.timedelta(days=1),
+            )
+        return self.list_response(queryset)
+
+    @extend_schema('Find Archived Queue Entry By ID')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    def get_queryset(self):
+        user: UserProfile = get_current_user()
+        return super().get_queryset().filter(organization_id=user.organization_id)
@@ -1,58 +1,95 @@
 import datetime
 
+from django.utils import timezone
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
-from rest_framework import permissions
+from rest_framework import permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
 from apps.authentication.models import UserProfile
-from apps.core.models import QueueEntry
+from apps.core.caches import public_entry_cache
+from apps.core.models import QueueEntry, Queue
 from apps.core.permissions import QueueEntryPermission
-from apps.core.serializers.queue_entry_serializyer import QueueEntrySerializer, QueueEntryFilterSerializer
+from apps.core.serializers.queue_entry_serializyer import QueueEntrySerializer, QueueEntryFilterSerializer, \
+    QueueEntryPublicSerializer, QueueEntryBulkCreateSerializer, QueueEntryExportSerializer, PublicCacheStatsSerializer
+from apps.shared.export import stream_export, EXPORT_OUTPUTS
+from apps.shared.pagination import KeysetPagination
+from apps.shared.mixins import AsyncReadMixin, ConditionalGetMixin, SparseFieldsMixin, sparse_fields_parameters
 from apps.shared.permissions import StrictModelPermission
 from config.middlewares import get_current_user
 
 
+class QueueEntryCursorPagination(KeysetPagination):
+    ordering = ('start_waiting', 'id')
+
+
+FILTER_PARAMETERS = [
+    OpenApiParameter(name='queue_id', required=False, type=int, description='ID of the queue'),
+    OpenApiParameter(name='date', required=False, type=datetime.date, description='Date of the queue entry', examples=[OpenApiExample('Date ISO Format', 'YYYY-mm-dd')]),
+    OpenApiParameter(name='waiting_end_is_null', required=False, type=bool, description='Whether the waiting end is null'),
+]
+EXPORT_FIELDS = (
+    'id', 'queue', 'description', 'start_waiting', 'end_waiting',
+    'created_at', 'created_by', 'updated_at', 'updated_by',
+)
+
+
 @extend_schema(tags=['Queue Entry'])
-class QueueEntryViewSet(ModelViewSet):
+class QueueEntryViewSet(AsyncReadMixin, SparseFieldsMixin, ConditionalGetMixin, ModelViewSet):
     queryset = QueueEntry.objects.all()
     serializer_class = QueueEntrySerializer
     permission_classes = [StrictModelPermission, QueueEntryPermission]
+    cursor_pagination_class = QueueEntryCursorPagination
+    bulk_max_length = 1000
+    async_actions = ('list', 'retrieve', 'retrieve_public')
 
     @extend_schema('Update Queue Entry')
     def update(self, request, *args, **kwargs):
         return super().update(request, *args, **kwargs)
 
     @extend_schema('List Queue Entry', parameters=[
-        OpenApiParameter(name='queue_id', required=False, type=int, description='ID of the queue'),
-        OpenApiParameter(name='date', required=False, type=datetime.date, description='Date of the queue entry', examples=[OpenApiExample('Date ISO Format', 'YYYY-mm-dd')]),
-        OpenApiParameter(name='waiting_end_is_null', required=False, type=bool, description='Whether the waiting end is null'),
+        *FILTER_PARAMETERS,
+        OpenApiParameter(name='cursor', required=False, type=str, description='Switches to keyset pagination, pass it empty for the first page and then follow `next`'),
+        OpenApiParameter(name='count', required=False, type=bool, description='Include the total count in cursor mode'),
+        *sparse_fields_parameters(QueueEntrySerializer),
     ])
     def list(self, request, *args, **kwargs):
-        serializer = QueueEntryFilterSerializer(data=request.query_params)
-        serializer.is_valid(raise_exception=True)
-        data = serializer.validated_data
-        queryset = self.get_queryset()
-        if queue_id := data.get('queue_id'):
-            queryset = queryset.filter(queue_id=queue_id)
-        if date := data.get('date'):
-            queryset = queryset.filter(start_waiting=date)
-        if data.get('waiting_end_is_null') is not None:
-            print( data.get('waiting_end_is_null'))
-            queryset = queryset.filter(end_waiting__isnull= data.get('waiting_end_is_null'))
-            print(queryset)
-        queryset = self.paginate_queryset(queryset)
-        serializer = self.get_serializer(queryset, many=True)
-        return self.get_paginated_response(serializer.data)
-
-    @extend_schema('Find Queue Entry By ID')
+        return self.list_response(self.get_list_queryset())
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.alist_response(self.get_list_queryset())
+
+    @extend_schema('Find Queue Entry By ID', parameters=sparse_fields_parameters(QueueEntrySerializer))
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
-    @extend_schema('Find Queue Entry By ID - No Login Required', tags=['Public'])
-    @action(url_path='public', detail=True, permission_classes=[])
+    @extend_schema('Find Queue Entry By ID - No Login Required', tags=['Public'], responses=QueueEntryPublicSerializer)
+    @action(url_path='public', detail=True, permission_classes=[], serializer_class=QueueEntryPublicSerializer)
     def retrieve_public(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        key = str(self.kwargs['pk']).lower()
+        if (entry := public_entry_cache.get(key)) is not None:
+            return self.public_response(entry, 'HIT')
+        instance = self.get_object()
+        entry = self.public_entry(instance)
+        public_entry_cache.set(key, instance.queue_id, entry)
+        return self.public_response(entry, 'MISS')
+
+    async def aretrieve_public(self, request, *args, **kwargs):
+        key = str(self.kwargs['pk']).lower()
+        if (entry := await public_entry_cache.aget(key)) is not None:
+            return self.public_response(entry, 'HIT')
+        instance = await self.aget_object()
+        entry = self.public_entry(instance)
+        await public_entry_cache.aset(key, instance.queue_id, entry)
+        return self.public_response(entry, 'MISS')
+
+    @extend_schema('Public Queue Entry Cache Statistics', tags=['Public'], responses=PublicCacheStatsSerializer)
+    @action(url_path='public/cache-stats', detail=False, permission_classes=[permissions.IsAdminUser])
+    def public_cache_stats(self, request, *args, **kwargs):
+        return Response(PublicCacheStatsSerializer(public_entry_cache.stats()).data)
 
     @extend_schema('Update Queue Entry Partial')
     def partial_update(self, request, *args, **kwargs):
@@ -66,8 +103,97 @@ class QueueEntryViewSet(ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         return super().destroy(request, *args, **kwargs)
 
+    @extend_schema(
+        'Create Queue Entries In Bulk',
+        request=QueueEntryBulkCreateSerializer(many=True),
+        responses={201: QueueEntrySerializer(many=True)},
+    )
+    @action(url_path='bulk', detail=False, methods=['post'], permission_classes=[StrictModelPermission])
+    def bulk_create(self, request, *args, **kwargs):
+        serializer = QueueEntryBulkCreateSerializer(data=request.data, many=True, allow_empty=False, max_length=self.bulk_max_length)
+        serializer.is_valid(raise_exception=True)
+        user: UserProfile = get_current_user()
+        queue_ids = {item['queue'] for item in serializer.validated_data}
+        owned_queue_ids = Queue.objects.filter(
+            id__in=queue_ids, organization_id=user.organization_id
+        ).values_list('id', flat=True)
+        if queue_ids - set(owned_queue_ids):
+            raise PermissionDenied()
+        # every queue belongs to the organization of the user, checked above
+        entries = QueueEntry.objects.create_many([
+            {'queue_id': item['queue'], 'description': item['description']}
+            for item in serializer.validated_data
+        ], organization_ids=dict.fromkeys(queue_ids, user.organization_id))
+        serializer = self.get_serializer(entries, many=True)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @extend_schema(
+        'Export Queue Entries',
+        parameters=[
+            *FILTER_PARAMETERS,
+            OpenApiParameter(name='output', required=False, type=str, enum=tuple(EXPORT_OUTPUTS), description='Export format, defaults to csv'),
+        ],
+        responses={(200, media_type): OpenApiTypes.STR for media_type in EXPORT_OUTPUTS.values()},
+    )
+    @action(url_path='export', detail=False, methods=['get'])
+    def export(self, request, *args, **kwargs):
+        serializer = QueueEntryExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        queryset = self.get_list_queryset().order_by('start_waiting', 'id')
+        return stream_export(request, queryset, EXPORT_FIELDS, serializer.validated_data['output'], 'queue-entries')
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.action == 'list' and self.cursor_pagination_class.cursor_query_param in self.request.query_params:
+                self._paginator = self.cursor_pagination_class()
+            else:
+                return super().paginator
+        return self._paginator
+
+    async def aget_object(self):
+        instance = await super().aget_object()
+        if self.action == 'retrieve_public':
+            await instance.aposition()
+        return instance
+
+    def public_entry(self, instance: QueueEntry) -> dict:
+        return {
+            'data': dict(self.get_serializer(instance).data),
+            'validators': [
+                instance.pk,
+                *(getattr(instance, field) for field in self.validator_fields),
+                instance.position,
+                instance.queue.avg_service_seconds,
+            ],
+        }
+
+    def public_response(self, entry: dict, cache_status: str) -> Response:
+        # position and estimate depend on other entries, so only the ETag can tell
+        etag = self.make_etag(*entry['validators'])
+        response = self.conditional_response(etag) or self.add_validators(Response(entry['data']), etag, None)
+        response['X-Cache'] = cache_status
+        return response
+
+    def get_list_queryset(self):
+        serializer = QueueEntryFilterSerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        queryset = self.get_queryset()
+        if queue_id := data.get('queue_id'):
+            queryset = queryset.filter(queue_id=queue_id)
+        if date := data.get('date'):
+            day_start = datetime.datetime.combine(date, datetime.time.min, tzinfo=timezone.get_current_timezone())
+            queryset = queryset.filter(
+                start_waiting__gte=day_start,
+                start_waiting__lt=day_start + datetime.timedelta(days=1),
+            )
+        if data.get('waiting_end_is_null') is not None:
+            queryset = queryset.filter(end_waiting__isnull=data.get('waiting_end_is_null'))
+        return queryset
+
     def get_queryset(self):
         user: UserProfile = get_current_user()
         if self.action == 'retrieve_public':
-            return super().get_queryset()
-        return super().get_queryset().filter(queue__company__organization=user.organization)
+            return super().get_queryset().select_related('queue')
+        return super().get_queryset().filter(organization_id=user.organization_id)
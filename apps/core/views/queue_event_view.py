@@ -0,0 +1,151 @@
+import asyncio
+import json
+import uuid
+from typing import AsyncIterator
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import Max
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from apps.authentication.models import UserProfile
+from apps.core.broadcast import hub
+from apps.core.models import Queue, QueueEntry, QueueEvent
+
+
+def format_event(event: str, data: dict, event_id: int | None = None) -> str:
+    message = f'event: {event}\ndata: {json.dumps(data)}\n\n'
+    if event_id is not None:
+        message = f'id: {event_id}\n{message}'
+    return message
+
+
+def last_event_id(request) -> int | None:
+    try:
+        return int(request.headers['Last-Event-ID'])
+    except (KeyError, ValueError):
+        return None
+
+
+def event_stream_response(stream: AsyncIterator[str]) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def subscribe(queue_id: int, after_id: int | None) -> AsyncIterator[str | QueueEvent]:
+    # Events are read from the database after subscribing, so nothing that is
+    # committed in between is missed; duplicates are dropped by their id.
+    subscription = await hub.subscribe(queue_id)
+    try:
+        if after_id is not None:
+            async for event in QueueEvent.objects.filter(queue_id=queue_id, id__gt=after_id).order_by('id'):
+                after_id = event.id
+                yield event
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.events.get(), settings.QUEUE_EVENTS_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            if event is None:
+                return
+            if after_id is None or event.id > after_id:
+                yield event
+    finally:
+        hub.unsubscribe(subscription)
+
+
+async def queue_event_stream(queue_id: int, after_id: int | None) -> AsyncIterator[str]:
+    async for event in subscribe(queue_id, after_id):
+        if isinstance(event, str):
+            yield event
+            continue
+        yield format_event(event.kind, {
+            'id': str(event.entry_id),
+            'queue': event.queue_id,
+            'start_waiting': event.start_waiting.isoformat(),
+            'end_waiting': event.end_waiting and event.end_waiting.isoformat(),
+        }, event.id)
+
+
+async def latest_event_id() -> int:
+    state = await QueueEvent.objects.aaggregate(last_id=Max('id'))
+    return state['last_id'] or 0
+
+
+async def queue_entry_public_event_stream(entry: QueueEntry, after_id: int) -> AsyncIterator[str]:
+    # Only the state of the ticket itself is sent, never other entries, since
+    # the entry id is what grants access to the public endpoints. The events
+    # after `after_id`, read before the entry was loaded, are replayed. The
+    # entries ahead are tracked by id, so an entry which left the queue is
+    # only counted once, whether the position or the replay saw it first.
+    ahead = {pk async for pk in entry.waiting_ahead().values_list('id', flat=True)}
+    position = len(ahead) + 1
+    avg_service_seconds = entry.queue.avg_service_seconds
+
+    def ticket(waiting: bool = True, end_waiting=None) -> dict:
+        return {
+            'id': str(entry.id),
+            'position': position if waiting else None,
+            'estimated_wait_seconds': round(position * avg_service_seconds) if waiting and avg_service_seconds is not None else None,
+            'end_waiting': end_waiting and end_waiting.isoformat(),
+        }
+
+    yield format_event(QueueEvent.ENTRY_CREATED, ticket())
+    async for event in subscribe(entry.queue_id, after_id):
+        if isinstance(event, str):
+            yield event
+            continue
+        if event.kind == QueueEvent.ENTRY_CREATED:
+            continue
+        if event.avg_service_seconds is not None:
+            avg_service_seconds = event.avg_service_seconds
+        if event.entry_id == entry.id:
+            yield format_event(event.kind, ticket(False, event.end_waiting), event.id)
+            return
+        # a deleted entry leaves the queue just like a closed one
+        if event.entry_id in ahead:
+            ahead.discard(event.entry_id)
+            position = len(ahead) + 1
+            yield format_event(event.kind, ticket(), event.id)
+
+
+def authenticate(request) -> UserProfile | AnonymousUser:
+    # the authentication classes of the API, so OAuth2 bearer tokens work too
+    drf_request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+    try:
+        return drf_request.user
+    except exceptions.APIException:
+        return AnonymousUser()
+
+
+@require_GET
+async def queue_events(request, pk: int):
+    user = await sync_to_async(authenticate)(request)
+    if not user.is_authenticated or not await user.ahas_perm('core.view_queue'):
+        return JsonResponse(
+            {'detail': 'You do not have permission to perform this action.'},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    if not await Queue.objects.filter(id=pk, organization_id=user.organization_id).aexists():
+        raise Http404
+    return event_stream_response(queue_event_stream(pk, last_event_id(request)))
+
+
+@require_GET
+async def queue_entry_public_events(request, pk: uuid.UUID):
+    after_id = await latest_event_id()
+    try:
+        entry = await QueueEntry.objects.select_related('queue').aget(id=pk)
+    except QueueEntry.DoesNotExist:
+        raise Http404
+    if entry.end_waiting is not None:
+        return JsonResponse({'detail': 'The queue entry is already closed.'}, status=status.HTTP_410_GONE)
+    return event_stream_response(queue_entry_public_event_stream(entry, after_id))
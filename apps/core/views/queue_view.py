@@ -1,19 +1,29 @@
-from drf_spectacular.utils import extend_schema, OpenApiParameter
+import datetime
+
+from drf_spectacular.utils import extend_schema, OpenApiParameter, inline_serializer
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
 from apps.authentication.models import UserProfile
-from apps.core.models import Queue
-from apps.core.permissions import QueuePermission
-from apps.core.serializers.queue_serializyer import QueueSerializer, QueueFilterSerializer
+from apps.core.models import Queue, QueueEntry, QueueDailyStats
+from apps.core.permissions import QueuePermission, QueueEntryClosePermission
+from apps.core.serializers.queue_entry_serializyer import QueueEntrySerializer
+from apps.core.serializers.queue_serializyer import QueueSerializer, QueueFilterSerializer, \
+    QueueStatsFilterSerializer, QueueStatsSerializer
+from apps.shared.mixins import AsyncReadMixin, ConditionalGetMixin, SparseFieldsMixin, sparse_fields_parameters
 from apps.shared.permissions import StrictModelPermission
 from config.middlewares import get_current_user
 
 
 @extend_schema(tags=['Queue'])
-class QueueViewSet(ModelViewSet):
+class QueueViewSet(AsyncReadMixin, SparseFieldsMixin, ConditionalGetMixin, ModelViewSet):
     queryset = Queue.objects.all()
     serializer_class = QueueSerializer
     permission_classes = [StrictModelPermission, QueuePermission]
+    validator_fields = ('updated_at', 'last_closed_at')
+    async_actions = ('list',)
 
     @extend_schema('Update Queue')
     def update(self, request, *args, **kwargs):
@@ -21,19 +31,15 @@ class QueueViewSet(ModelViewSet):
 
     @extend_schema('List Queues', parameters=[
         OpenApiParameter(name='company_id', required=False, type=int, description='The ID of the company'),
+        *sparse_fields_parameters(QueueSerializer),
     ])
     def list(self, request, *args, **kwargs):
-        serializer = QueueFilterSerializer(data=request.query_params)
-        serializer.is_valid(raise_exception=True)
-        data = serializer.validated_data
-        queryset = self.get_queryset()
-        if company_id := data.get('company_id'):
-            queryset = queryset.filter(company_id=company_id)
-        queryset = self.paginate_queryset(queryset)
-        serializer = self.get_serializer(queryset, many=True)
-        return self.get_paginated_response(serializer.data)
+        return self.list_response(self.get_list_queryset())
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.alist_response(self.get_list_queryset())
 
-    @extend_schema('Find Queue By ID')
+    @extend_schema('Find Queue By ID', parameters=sparse_fields_parameters(QueueSerializer))
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
@@ -48,8 +54,52 @@ class QueueViewSet(ModelViewSet):
     @extend_schema('Delete Queue')
     def destroy(self, request, *args, **kwargs):
         return super().destroy(request, *args, **kwargs)
-        
+
+    @extend_schema('Call Next Queue Entry', request=None, responses={200: QueueEntrySerializer, 204: None})
+    @action(url_path='next', detail=True, methods=['post'], permission_classes=[QueueEntryClosePermission])
+    def call_next(self, request, *args, **kwargs):
+        queue = self.get_object()
+        entry = QueueEntry.objects.call_next(queue.id)
+        if entry is None:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response(QueueEntrySerializer(entry, context=self.get_serializer_context()).data)
+
+    @extend_schema('Close All Open Queue Entries', request=None, responses={200: inline_serializer('ClosedQueueEntries', {'closed': serializers.IntegerField()})})
+    @action(url_path='close-all', detail=True, methods=['post'], permission_classes=[QueueEntryClosePermission])
+    def close_all(self, request, *args, **kwargs):
+        queue = self.get_object()
+        entries = QueueEntry.objects.close_all(queue.id)
+        return Response({'closed': len(entries)})
+
+    @extend_schema(
+        'Queue Wait Time Stats',
+        description='Daily and total wait times of the entries that started waiting in the range. '
+                    'Percentiles are interpolated from a histogram.',
+        parameters=[
+            OpenApiParameter(name='from', required=False, type=datetime.date, description='First day, defaults to 29 days before `to`'),
+            OpenApiParameter(name='to', required=False, type=datetime.date, description='Last day, defaults to today'),
+        ],
+        responses=QueueStatsSerializer,
+    )
+    @action(url_path='stats', detail=True, methods=['get'])
+    def stats(self, request, *args, **kwargs):
+        queue = self.get_object()
+        serializer = QueueStatsFilterSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        stats = QueueDailyStats.objects.summarize(queue.id, data['from'], data['to'])
+        return Response(QueueStatsSerializer(stats).data)
+
+    def get_list_queryset(self):
+        serializer = QueueFilterSerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        queryset = self.get_queryset()
+        if company_id := data.get('company_id'):
+            queryset = queryset.filter(company_id=company_id)
+        return queryset
+
     def get_queryset(self):
         user: UserProfile = get_current_user()
-        return super().get_queryset().filter(company__organization=user.organization)
+        return super().get_queryset().filter(organization_id=user.organization_id)
 
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
 
 
 class SharedConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.shared'
+
+    def ready(self):
+        if settings.METRICS:
+            from apps.shared.metrics.request_metrics import install_query_recorder
+            connection_created.connect(install_query_recorder, dispatch_uid='metrics_query_recorder')
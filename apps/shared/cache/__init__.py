@@ -0,0 +1,2 @@
+from apps.shared.cache.expiring_lru_cache import ExpiringLRUCache
+from apps.shared.cache.versioned_cache import VersionedCache
@@ -0,0 +1,102 @@
+import uuid
+from typing import Any, Hashable
+
+from django.conf import settings
+from django.core.cache import caches, BaseCache
+from django.db import transaction
+
+
+class VersionedCache:
+    """
+    Cache entries which belong to a group, e.g. the entries of a queue.
+
+    Every group has a version token in the cache and each entry is stored
+    with the token of its group. Bumping a group replaces the token, which
+    invalidates all of its entries at once without knowing their keys. A
+    random token survives an evicted version key, a counter would restart
+    and revive old entries.
+
+    Entries expire after the number of seconds in the ``timeout_setting``
+    setting in any case, which bounds a stale read when an invalidation is
+    missed, e.g. when a concurrent request caches a response it read just
+    before a change it did not see yet.
+
+    Hits and misses are counted per process.
+    """
+
+    def __init__(self, prefix: str, timeout_setting: str, alias: str = 'default'):
+        self.prefix = prefix
+        self.timeout_setting = timeout_setting
+        self.alias = alias
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self) -> BaseCache:
+        return caches[self.alias]
+
+    @property
+    def timeout(self) -> int:
+        return getattr(settings, self.timeout_setting)
+
+    def key(self, key: Hashable) -> str:
+        return f'{self.prefix}:{key}'
+
+    def version_key(self, group: Hashable) -> str:
+        return f'{self.prefix}:version:{group}'
+
+    def get(self, key: Hashable) -> Any:
+        entry = self.cache.get(self.key(key))
+        if entry is not None and self.cache.get(self.version_key(entry[0])) == entry[1]:
+            return self.hit(entry[2])
+        return self.miss()
+
+    async def aget(self, key: Hashable) -> Any:
+        entry = await self.cache.aget(self.key(key))
+        if entry is not None and await self.cache.aget(self.version_key(entry[0])) == entry[1]:
+            return self.hit(entry[2])
+        return self.miss()
+
+    def version(self, group: Hashable) -> str:
+        return self.cache.get_or_set(self.version_key(group), self.new_version, timeout=None)
+
+    def set(self, key: Hashable, group: Hashable, value: Any) -> None:
+        version = self.version(group)
+        self.cache.set(self.key(key), (group, version, value), timeout=self.timeout)
+
+    async def aset(self, key: Hashable, group: Hashable, value: Any) -> None:
+        version = await self.cache.aget_or_set(self.version_key(group), self.new_version, timeout=None)
+        await self.cache.aset(self.key(key), (group, version, value), timeout=self.timeout)
+
+    def bump(self, *groups: Hashable, using: str | None = None) -> None:
+        # once now for this connection and again once the change is visible
+        # to everyone else
+        groups = {group for group in groups if group is not None}
+        if not groups:
+            return
+        self._bump(groups)
+        if transaction.get_connection(using).in_atomic_block:
+            transaction.on_commit(lambda: self._bump(groups), using=using)
+
+    def _bump(self, groups: set) -> None:
+        self.cache.set_many({self.version_key(group): self.new_version() for group in groups}, timeout=None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else None,
+        }
+
+    def hit(self, value: Any) -> Any:
+        self.hits += 1
+        return value
+
+    def miss(self) -> None:
+        self.misses += 1
+        return None
+
+    @staticmethod
+    def new_version() -> str:
+        return uuid.uuid4().hex
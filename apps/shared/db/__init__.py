@@ -0,0 +1 @@
+from apps.shared.db.database_url import database_from_url
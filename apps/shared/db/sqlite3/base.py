@@ -0,0 +1,67 @@
+import logging
+import random
+import time
+
+from django.db.backends.sqlite3 import base
+
+logger = logging.getLogger(__name__)
+
+
+def is_locked(exc: Exception) -> bool:
+    return 'database is locked' in str(exc) or 'database table is locked' in str(exc)
+
+
+class SQLiteCursorWrapper(base.SQLiteCursorWrapper):
+    """
+    Retries statements which still find the database locked once the busy
+    timeout ran out, with exponential backoff and jitter.
+
+    Only statements outside of an open transaction are retried, i.e. the
+    ``BEGIN IMMEDIATE`` of an atomic block and autocommit statements. Inside a
+    transaction the error is raised as usual, the work done so far would be
+    lost.
+    """
+    locked_retries = 0
+    locked_backoff = 0.05
+
+    def execute(self, query, params=None):
+        return self._retry(super().execute, query, params)
+
+    def executemany(self, query, param_list):
+        return self._retry(super().executemany, query, param_list)
+
+    def _retry(self, execute, *args):
+        attempt = 0
+        while True:
+            in_transaction = self.connection.in_transaction
+            try:
+                return execute(*args)
+            except base.Database.OperationalError as exc:
+                if in_transaction or attempt >= self.locked_retries or not is_locked(exc):
+                    raise
+                delay = self.locked_backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+                attempt += 1
+                logger.info('Database is locked, retry %s of %s in %.3fs', attempt, self.locked_retries, delay)
+                time.sleep(delay)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    The sqlite3 backend with transparent retries of locked statements, see
+    ``SQLiteCursorWrapper``. Takes two more ``OPTIONS``: ``locked_retries``
+    and ``locked_backoff`` (seconds before the first retry).
+    """
+    locked_retries = SQLiteCursorWrapper.locked_retries
+    locked_backoff = SQLiteCursorWrapper.locked_backoff
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        self.locked_retries = kwargs.pop('locked_retries', self.locked_retries)
+        self.locked_backoff = kwargs.pop('locked_backoff', self.locked_backoff)
+        return kwargs
+
+    def create_cursor(self, name=None):
+        cursor = self.connection.cursor(factory=SQLiteCursorWrapper)
+        cursor.locked_retries = self.locked_retries
+        cursor.locked_backoff = self.locked_backoff
+        return cursor
@@ -0,0 +1 @@
+from apps.shared.export.stream_export import stream_export, EXPORT_OUTPUTS
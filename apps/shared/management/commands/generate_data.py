@@ -0,0 +1,384 @@
+import datetime
+import heapq
+import math
+import random
+import time
+import uuid
+from argparse import ArgumentParser
+from contextlib import contextmanager, nullcontext
+from itertools import repeat
+from statistics import NormalDist
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Permission
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, models, transaction
+from django.utils import timezone
+
+from apps.authentication.models import Organization, UserProfile
+from apps.core.models import Company, Queue, QueueDailyStats, QueueEntry
+
+QUEUE_NAMES = (
+    'Reception', 'Billing', 'Pharmacy', 'Returns', 'Customer Service',
+    'Registration', 'Pickup', 'Information', 'Appointments', 'Payments',
+)
+OPENING_HOUR, CLOSING_HOUR = 8, 18
+# arrivals peak in the late morning and in the early afternoon:
+# (weight, hour of the peak, standard deviation in hours)
+ARRIVAL_PEAKS = ((0.55, 10.5, 1.2), (0.45, 15.0, 1.0))
+# share of the time the desks of a queue are busy, on average
+UTILIZATION = 0.85
+# spread of the log-normal service times
+SERVICE_SIGMA = 0.6
+# service times are drawn from these quantiles of a log-normal with mean 1,
+# drawing them is much cheaper than random.lognormvariate
+SERVICE_QUANTILES = tuple(
+    math.exp(SERVICE_SIGMA * NormalDist().inv_cdf((index + 0.5) / 1000) - SERVICE_SIGMA ** 2 / 2)
+    for index in range(1000)
+)
+ROLES = {
+    'desk': ('view_company', 'view_queue', 'view_queueentry', 'add_queueentry', 'change_queueentry'),
+    'manager': None,  # every permission of the core app
+}
+# the version and variant bits of a random (version 4) UUID
+UUID_VERSION_MASK = 0xf << 76 | 0x3 << 62
+UUID_VERSION_4 = 0x4 << 76 | 0x2 << 62
+ENTRY_COLUMNS = (
+    'id', 'queue', 'organization', 'description', 'start_waiting', 'end_waiting',
+    'created_at', 'created_by', 'updated_at', 'updated_by',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates organizations, companies, queues and queue entries with realistic arrival and '
+        'service times, plus a desk and a manager user per organization. The same --seed and --end '
+        'always generate the same data.'
+    )
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument('--organizations', type=int, default=10)
+        parser.add_argument('--companies', type=int, default=3, help='companies per organization')
+        parser.add_argument('--queues', type=int, default=4, help='queues per company')
+        parser.add_argument('--entries', type=int, default=1000, help='queue entries per queue')
+        parser.add_argument('--days', type=int, default=30, help='the entries are spread over this many days')
+        parser.add_argument(
+            '--end', type=datetime.datetime.fromisoformat,
+            help='end of the generated history, e.g. 2026-10-18T12:00:00+00:00, defaults to now; '
+                 'entries the desks have not reached by then are still waiting'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=100_000, help='queue entries per transaction')
+        parser.add_argument('--prefix', default='generated', help='prefix of the usernames')
+        parser.add_argument('--password', default='password', help='password of the generated users')
+        parser.add_argument(
+            '--keep-indexes', action='store_true',
+            help='keep the queue entry indexes during the load instead of rebuilding them at the end, '
+                 'slower but the database stays usable'
+        )
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options) -> None:
+        using = options['database']
+        prefix = options['prefix']
+        if UserProfile.objects.using(using).filter(username__startswith=f'{prefix}-').exists():
+            raise CommandError(f'Users with the prefix {prefix!r} exist already, pass another --prefix')
+        end = options['end'] or timezone.now()
+        if timezone.is_naive(end):
+            end = timezone.make_aware(end)
+        # the prefix is part of the seed, another prefix gets other primary keys
+        rng = random.Random(f"{options['seed']}:{prefix}")
+        started = time.perf_counter()
+
+        with transaction.atomic(using=using):
+            organizations = self.create_organizations(options, using)
+            self.create_users(organizations, prefix, options['password'], using)
+            queues = self.create_queues(organizations, options, rng, using)
+
+        windows = self.opening_windows(end, options['days'])
+        slots = self.arrival_slots(windows)
+        if not slots[0]:
+            raise CommandError('No opening hours before --end, pass more --days')
+        inserter = EntryInserter(using, options['batch_size'])
+        desk_users = {organization.id: f'{prefix}-{index + 1}-desk' for index, organization in enumerate(organizations)}
+        daily_stats = []
+        with nullcontext() if options['keep_indexes'] else bulk_load(QueueEntry, using):
+            for queue in queues:
+                daily_stats += self.generate_entries(
+                    queue, windows, slots, end, options['entries'], rng, inserter, desk_users[queue.organization_id]
+                )
+            inserter.flush()
+
+        with transaction.atomic(using=using):
+            Queue.objects.using(using).bulk_update(queues, ['avg_service_seconds', 'last_closed_at'], batch_size=500)
+            QueueDailyStats.objects.using(using).bulk_create(daily_stats, batch_size=500)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {len(organizations)} organizations, {len(queues)} queues and {inserter.count} queue entries '
+            f'in {elapsed:.1f}s ({inserter.count / elapsed:,.0f} entries/s)'
+        ))
+
+    def create_organizations(self, options: dict, using: str) -> list[Organization]:
+        return Organization.objects.using(using).bulk_create([
+            Organization(name=f'Organization {index + 1}') for index in range(options['organizations'])
+        ])
+
+    def create_users(self, organizations: list[Organization], prefix: str, password: str, using: str) -> None:
+        # one hash for all users, hashing is slow on purpose
+        password = make_password(password)
+        permissions = Permission.objects.using(using).filter(content_type__app_label='core')
+        role_permissions = {
+            role: [permission for permission in permissions if codenames is None or permission.codename in codenames]
+            for role, codenames in ROLES.items()
+        }
+        users = UserProfile.objects.using(using).bulk_create([
+            UserProfile(username=f'{prefix}-{index + 1}-{role}', password=password, organization=organization)
+            for index, organization in enumerate(organizations)
+            for role in ROLES
+        ])
+        through = UserProfile.user_permissions.through
+        through.objects.using(using).bulk_create([
+            through(userprofile_id=user.id, permission_id=permission.id)
+            for user in users
+            for permission in role_permissions[user.username.rsplit('-', 1)[1]]
+        ], batch_size=500)
+
+    def create_queues(self, organizations: list[Organization], options: dict, rng: random.Random,
+                      using: str) -> list[Queue]:
+        companies = Company.objects.using(using).bulk_create([
+            Company(name=f'Company {index + 1}.{company_index + 1}', organization=organization)
+            for index, organization in enumerate(organizations)
+            for company_index in range(options['companies'])
+        ], batch_size=500)
+        queues = [
+            Queue(
+                name=rng.choice(QUEUE_NAMES), company=company, organization_id=company.organization_id,
+                created_by='generator', updated_by='generator',
+            )
+            for company in companies
+            for _ in range(options['queues'])
+        ]
+        return Queue.objects.using(using).bulk_create(queues, batch_size=500)
+
+    @staticmethod
+    def opening_windows(end: datetime.datetime, days: int) -> list[tuple[datetime.date, int, int]]:
+        # (day, opening, closing) as whole second timestamps, the last day is cut at `end`
+        windows = []
+        last_day = timezone.localdate(end)
+        for offset in range(days - 1, -1, -1):
+            day = last_day - datetime.timedelta(days=offset)
+            midnight = datetime.datetime.combine(day, datetime.time.min, tzinfo=timezone.get_current_timezone())
+            opening = int(midnight.timestamp()) + OPENING_HOUR * 3600
+            closing = min(int(midnight.timestamp()) + CLOSING_HOUR * 3600, math.floor(end.timestamp()))
+            if opening < closing:
+                windows.append((day, opening, closing))
+        return windows
+
+    @staticmethod
+    def arrival_slots(windows: list) -> tuple[list[int], list[float]]:
+        # every whole minute of the opening hours and the cumulated arrival
+        # density around the peaks of the day, for random.choices
+        slots, cum_weights, total = [], [], 0.0
+        for _, opening, closing in windows:
+            for minute in range((closing - opening) // 60):
+                hour = OPENING_HOUR + (minute + 0.5) / 60
+                total += sum(
+                    weight / deviation * math.exp(-((hour - peak) / deviation) ** 2 / 2)
+                    for weight, peak, deviation in ARRIVAL_PEAKS
+                )
+                slots.append(opening + minute * 60)
+                cum_weights.append(total)
+        return slots, cum_weights
+
+    def generate_entries(self, queue: Queue, windows: list, slots: tuple[list[int], list[float]],
+                         end: datetime.datetime, count: int, rng: random.Random, inserter: 'EntryInserter',
+                         desk_user: str) -> list[QueueDailyStats]:
+        # Poisson-like arrivals around the peaks of the day, served in order
+        # of arrival by 1 to 4 desks with log-normal service times. All
+        # random values of a queue are drawn up front and the times are whole
+        # seconds.
+        arrivals = sorted([
+            slot + int(rng.random() * 60) for slot in rng.choices(slots[0], cum_weights=slots[1], k=count)
+        ])
+        services = rng.choices(SERVICE_QUANTILES, k=count)
+        ids = [rng.getrandbits(128) for _ in range(count)]
+        desks = rng.randint(1, 4)
+        open_seconds = sum(closing - opening for _, opening, closing in windows)
+        service_mean = UTILIZATION * desks * open_seconds / max(count, 1)
+        free_at = [0] * desks
+        end_timestamp = end.timestamp()
+        calls = []
+        waits: dict[datetime.date, list[int]] = {}
+        # the arrivals are sorted, so the windows are walked along with them
+        remaining_windows = iter(windows)
+        day, _, closing = next(remaining_windows)
+        day_waits = waits.setdefault(day, [])
+        heapreplace = heapq.heapreplace
+        for arrived, service in zip(arrivals, services):
+            called = free_at[0]
+            if called < arrived:
+                called = arrived
+            # the desks only get later, every entry from here on is still waiting
+            if called >= end_timestamp:
+                break
+            heapreplace(free_at, called + int(service_mean * service))
+            calls.append(called)
+            while arrived >= closing:
+                day, _, closing = next(remaining_windows)
+                day_waits = waits.setdefault(day, [])
+            day_waits.append(called - arrived)
+        inserter.add(ids, queue.id, queue.organization_id, arrivals, calls, desk_user)
+
+        queue.avg_service_seconds = service_mean / desks
+        queue.last_closed_at = datetime.datetime.fromtimestamp(calls[-1], datetime.timezone.utc) if calls else None
+        daily_stats = []
+        for day, day_waits in waits.items():
+            if day_waits:
+                stats = QueueDailyStats(queue_id=queue.id, day=day)
+                stats.add(day_waits)
+                daily_stats.append(stats)
+        return daily_stats
+
+
+@contextmanager
+def bulk_load(model, using: str):
+    # Nothing else uses the database during the load, so SQLite can skip
+    # the fsyncs and keep the rollback journal in memory until it is done.
+    connection = connections[using]
+    pragmas = {}
+    if connection.vendor == 'sqlite' and not connection.in_atomic_block:
+        with connection.cursor() as cursor:
+            for name, value in (('synchronous', 'OFF'), ('journal_mode', 'MEMORY')):
+                pragmas[name] = cursor.execute(f'PRAGMA {name}').fetchone()[0]
+                cursor.execute(f'PRAGMA {name} = {value}')
+    try:
+        with deferred_indexes(model, using):
+            yield
+    finally:
+        if pragmas:
+            with connection.cursor() as cursor:
+                for name, value in pragmas.items():
+                    cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@contextmanager
+def deferred_indexes(model, using: str):
+    # Maintaining the indexes of a table row by row is most of the time of a
+    # bulk load, building them once afterwards is much cheaper.
+    indexes = [*model._meta.indexes, *field_indexes(model, using)]
+    with connections[using].schema_editor() as schema_editor:
+        for index in indexes:
+            schema_editor.remove_index(model, index)
+    try:
+        yield
+    finally:
+        with connections[using].schema_editor() as schema_editor:
+            for index in indexes:
+                schema_editor.add_index(model, index)
+
+
+def field_indexes(model, using: str) -> list[models.Index]:
+    # the db_index of the foreign keys, under the name they have in the database
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+    columns = {field.column: field.name for field in model._meta.local_fields if field.db_index and not field.unique}
+    meta_indexes = {index.name for index in model._meta.indexes}
+    return [
+        models.Index(fields=[columns[constraint['columns'][0]]], name=name)
+        for name, constraint in constraints.items()
+        if constraint['index'] and not constraint['unique'] and name not in meta_indexes
+        and len(constraint['columns'] or ()) == 1 and constraint['columns'][0] in columns
+    ]
+
+
+class EntryInserter:
+    """
+    Writes queue entries with executemany in transactions of at least
+    ``batch_size`` rows. ``bulk_create`` would overwrite the
+    ``auto_now_add`` timestamps and is limited to 999 parameters per
+    statement on SQLite.
+    """
+
+    def __init__(self, using: str, batch_size: int):
+        self.using = using
+        self.batch_size = batch_size
+        self.rows = []
+        self.count = 0
+        self.descriptions = []
+        connection = connections[using]
+        opts = QueueEntry._meta
+        fields = [opts.get_field(name) for name in ENTRY_COLUMNS]
+        self.sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            connection.ops.quote_name(opts.db_table),
+            ', '.join(connection.ops.quote_name(field.column) for field in fields),
+            ', '.join(['%s'] * len(fields)),
+        )
+        # UUIDField.get_db_prep_value and adapt_datetimefield_value without
+        # their checks, they are most of the time per row otherwise
+        self.native_uuid = connection.features.has_native_uuid_field
+        self.timezone = connection.timezone
+        self.utc = connection.timezone_name == 'UTC'
+        self.day_prefixes = DayPrefixes()
+        self.times_of_day = []
+
+    def prepare_ids(self, bits: list[int]) -> list[uuid.UUID] | list[str]:
+        values = [value & ~UUID_VERSION_MASK | UUID_VERSION_4 for value in bits]
+        if self.native_uuid:
+            return [uuid.UUID(int=value) for value in values]
+        return ['%032x' % value for value in values]
+
+    def prepare_datetimes(self, timestamps: list[int]) -> list[str]:
+        # naive in the timezone of the connection, as Django stores it
+        if not self.utc:
+            return [
+                str(datetime.datetime.fromtimestamp(timestamp, self.timezone).replace(tzinfo=None))
+                for timestamp in timestamps
+            ]
+        # the date and the time of the day are looked up, not formatted
+        if not self.times_of_day:
+            self.times_of_day = [
+                '%02d:%02d:%02d' % (second // 3600, second // 60 % 60, second % 60) for second in range(86400)
+            ]
+        days, times = self.day_prefixes, self.times_of_day
+        return [days[timestamp // 86400] + times[timestamp % 86400] for timestamp in timestamps]
+
+    def add(self, ids: list[int], queue_id: int, organization_id: int, arrivals: list[int], calls: list[int],
+            desk_user: str) -> None:
+        # the first len(calls) entries are closed, the others still waiting
+        closed = len(calls)
+        while len(self.descriptions) < len(arrivals):
+            self.descriptions.append(f'Customer {len(self.descriptions) + 1}')
+        ids = self.prepare_ids(ids)
+        starts = self.prepare_datetimes(arrivals)
+        ends = self.prepare_datetimes(calls)
+        self.rows += zip(
+            ids, repeat(queue_id), repeat(organization_id), self.descriptions, starts, ends,
+            starts, repeat('kiosk'), ends, repeat(desk_user),
+        )
+        waiting = starts[closed:]
+        self.rows += zip(
+            ids[closed:], repeat(queue_id), repeat(organization_id), self.descriptions[closed:len(arrivals)],
+            waiting, repeat(None), waiting, repeat('kiosk'), waiting, repeat('kiosk'),
+        )
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.rows:
+            return
+        # in primary key order the pages of the table are filled one after
+        # the other instead of at random places
+        self.rows.sort()
+        with transaction.atomic(using=self.using), connections[self.using].cursor() as cursor:
+            cursor.executemany(self.sql, self.rows)
+        self.count += len(self.rows)
+        self.rows = []
+
+
+class DayPrefixes(dict):
+    # 'YYYY-MM-DD ' by the number of days since the epoch
+    def __missing__(self, day: int) -> str:
+        prefix = self[day] = (datetime.date(1970, 1, 1) + datetime.timedelta(days=day)).isoformat() + ' '
+        return prefix
@@ -0,0 +1,2 @@
+from apps.shared.metrics.metrics_middleware import MetricsMiddleware
+from apps.shared.metrics.metrics_view import MetricsView
@@ -0,0 +1,43 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from apps.shared.metrics.request_metrics import finish_request, start_request
+
+
+class MetricsMiddleware:
+    """
+    Records latency, database queries and time, response size and status of
+    every request, labelled by URL name, viewset action and method. Goes
+    first in ``MIDDLEWARE`` to time the whole stack.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        stats, token = start_request()
+        response = None
+        try:
+            response = self.get_response(request)
+            return response
+        finally:
+            finish_request(token, stats, request, response, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        stats, token = start_request()
+        response = None
+        try:
+            response = await self.get_response(request)
+            return response
+        finally:
+            finish_request(token, stats, request, response, time.perf_counter() - started)
@@ -0,0 +1,17 @@
+from django.http import HttpResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from prometheus_client import CONTENT_TYPE_LATEST
+from rest_framework import permissions
+from rest_framework.views import APIView
+
+from apps.shared.metrics.request_metrics import render_metrics
+
+
+@extend_schema(tags=['Metrics'])
+class MetricsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema('Prometheus Metrics', responses={(200, 'text/plain'): OpenApiTypes.STR})
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
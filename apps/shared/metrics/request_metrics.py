@@ -0,0 +1,104 @@
+import functools
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+
+LABELS = ('route', 'action', 'method')
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Latency of the requests', LABELS,
+)
+REQUESTS = Counter(
+    'http_requests', 'Responses by status code', (*LABELS, 'status'),
+)
+DB_QUERIES = Histogram(
+    'http_request_db_queries', 'Database queries per request', LABELS,
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+DB_DURATION = Counter(
+    'http_request_db_duration_seconds', 'Time spent in database queries', LABELS,
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'Size of the response bodies, without streamed ones', LABELS,
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_duration: float = 0.0
+
+
+_current_stats: ContextVar[RequestStats | None] = ContextVar('current_request_stats', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    # installed on every connection, counts the queries of the current request
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_duration += time.perf_counter() - started
+
+
+def install_query_recorder(sender, connection, **kwargs) -> None:
+    # connection_created receiver, a pooled connection is created again for
+    # every request on the same wrapper
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def start_request() -> tuple[RequestStats, object]:
+    stats = RequestStats()
+    return stats, _current_stats.set(stats)
+
+
+def finish_request(token, stats: RequestStats, request, response, duration: float) -> None:
+    # response is None when the view raised, counted as a server error
+    _current_stats.reset(token)
+    match = request.resolver_match
+    if match is None:
+        labels = ('unmatched', '', request.method)
+    else:
+        actions = getattr(match.func, 'actions', None) or {}
+        labels = (match.view_name, actions.get(request.method.lower(), ''), request.method)
+    request_duration, db_queries, db_duration, response_size = _children(labels)
+    request_duration.observe(duration)
+    _requests(*labels, 500 if response is None else response.status_code).inc()
+    db_queries.observe(stats.queries)
+    db_duration.inc(stats.db_duration)
+    if response is not None and not response.streaming:
+        response_size.observe(len(response.content))
+
+
+@functools.cache
+def _children(labels: tuple[str, str, str]) -> tuple:
+    # labels() takes a lock and builds the key on every call, the routes are
+    # a fixed set
+    return tuple(metric.labels(*labels) for metric in (REQUEST_DURATION, DB_QUERIES, DB_DURATION, RESPONSE_SIZE))
+
+
+@functools.cache
+def _requests(route: str, action: str, method: str, status: int):
+    return REQUESTS.labels(route, action, method, str(status))
+
+
+def render_metrics() -> bytes:
+    """
+    The metrics in the Prometheus text format. With ``PROMETHEUS_MULTIPROC_DIR``
+    set every worker process writes its values to its own files in there,
+    which are summed up here, otherwise only this process is reported.
+    """
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
@@ -0,0 +1,3 @@
+from apps.shared.mixins.async_read_mixin import AsyncReadMixin
+from apps.shared.mixins.conditional_get_mixin import ConditionalGetMixin
+from apps.shared.mixins.sparse_fields_mixin import SparseFieldsMixin, sparse_fields_parameters
@@ -0,0 +1,80 @@
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import QuerySet
+from django.http import Http404
+from django.views.decorators.csrf import csrf_exempt
+
+
+class AsyncReadMixin:
+    """
+    Serves the GET actions listed in ``async_actions`` from a native async view.
+
+    For every action ``x`` in ``async_actions`` the viewset implements
+    ``async def ax(...)``, which loads its rows with the async ORM. All other
+    methods go through the usual sync DRF view. Authentication, permissions
+    and throttling run the regular sync DRF code in one thread hop.
+
+    The view is only made async when ``settings.ASYNC_VIEWS`` is set, i.e. when
+    the app is served by an ASGI worker. Under WSGI an async view would cost
+    an event loop per request.
+    """
+    async_actions: tuple[str, ...] = ()
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if not settings.ASYNC_VIEWS or not set(cls.async_actions) & set(actions.values()):
+            return view
+        sync_view = sync_to_async(view)
+
+        async def async_view(request, *args, **kwargs):
+            method = request.method.lower()
+            action = actions.get('get' if method == 'head' else method)
+            if action not in cls.async_actions:
+                return await sync_view(request, *args, **kwargs)
+            self = cls(**initkwargs)
+            self.action_map = {'head': actions['get'], **actions}
+            for name, handler in self.action_map.items():
+                setattr(self, name, getattr(self, handler))
+            self.request = request
+            self.args = args
+            self.kwargs = kwargs
+            return await self.adispatch(request, *args, **kwargs)
+
+        update_wrapper(async_view, view)
+        return csrf_exempt(async_view)
+
+    async def adispatch(self, request, *args, **kwargs):
+        # APIView.dispatch with an async handler
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = getattr(self, f'a{self.action}')
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def aget_object(self):
+        # GenericAPIView.get_object on the async ORM
+        queryset: QuerySet = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, ValidationError, TypeError, ValueError):
+            raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def apaginate_queryset(self, queryset: QuerySet) -> list | None:
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
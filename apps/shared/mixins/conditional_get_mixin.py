@@ -0,0 +1,146 @@
+import datetime
+import hashlib
+
+from django.db.models import Count, Max, QuerySet
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from apps.shared.pagination import KeysetPagination
+from apps.shared.serializers import ValuesSerializer
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified validators for list and retrieve responses.
+
+    The validators of a list are computed with a single aggregate query
+    (max of ``validator_fields`` and the row count of the filtered queryset),
+    so an unchanged poll is answered with ``304 Not Modified`` before any row
+    is loaded or serialized. Lists only honour ``If-None-Match``: a deleted
+    row changes the count but not ``Last-Modified``.
+
+    With ``values_list`` set, a page is read with ``values()`` and serialized
+    by a ``ValuesSerializer`` compiled from the serializer of the action,
+    whenever that serializer allows it.
+    """
+    validator_fields = ('updated_at',)
+    values_list = True
+
+    def list_response(self, queryset: QuerySet) -> HttpResponse:
+        values_serializer = self.get_values_serializer()
+        if isinstance(self.paginator, KeysetPagination) and not self.paginator.include_count(self.request):
+            # a COUNT over the whole filtered queryset would defeat seek
+            # pagination, so the validators are taken from the page itself
+            page = self.paginate_queryset(self.page_queryset(queryset, values_serializer))
+            etag, last_modified = self.page_validators(page)
+            if response := self.conditional_response(etag):
+                return response
+        else:
+            etag, last_modified = self.queryset_validators(queryset)
+            if response := self.conditional_response(etag):
+                return response
+            page = self.paginate_queryset(self.page_queryset(queryset, values_serializer))
+        return self.add_validators(self.get_paginated_response(self.page_data(page, values_serializer)), etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = self.instance_validators(instance)
+        if response := self.conditional_response(etag, last_modified):
+            return response
+        serializer = self.get_serializer(instance)
+        return self.add_validators(Response(serializer.data), etag, last_modified)
+
+    async def alist_response(self, queryset: QuerySet) -> HttpResponse:
+        values_serializer = self.get_values_serializer()
+        if isinstance(self.paginator, KeysetPagination) and not self.paginator.include_count(self.request):
+            page = await self.apaginate_queryset(self.page_queryset(queryset, values_serializer))
+            etag, last_modified = self.page_validators(page)
+            if response := self.conditional_response(etag):
+                return response
+        else:
+            etag, last_modified = await self.aqueryset_validators(queryset)
+            if response := self.conditional_response(etag):
+                return response
+            page = await self.apaginate_queryset(self.page_queryset(queryset, values_serializer))
+        return self.add_validators(self.get_paginated_response(self.page_data(page, values_serializer)), etag, last_modified)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        etag, last_modified = self.instance_validators(instance)
+        if response := self.conditional_response(etag, last_modified):
+            return response
+        serializer = self.get_serializer(instance)
+        return self.add_validators(Response(serializer.data), etag, last_modified)
+
+    def get_values_serializer(self) -> ValuesSerializer | None:
+        if not self.values_list:
+            return None
+        return ValuesSerializer.compile(self.get_serializer())
+
+    def page_queryset(self, queryset: QuerySet, values_serializer: ValuesSerializer | None) -> QuerySet:
+        if values_serializer is None:
+            return queryset
+        # the validators and the keyset position are read from the rows too
+        columns = ['pk', *values_serializer.columns, *self.validator_fields]
+        if isinstance(self.paginator, KeysetPagination):
+            columns += self.paginator.ordering
+        return queryset.values(*dict.fromkeys(columns))
+
+    def page_data(self, page: list, values_serializer: ValuesSerializer | None) -> list:
+        if values_serializer is None:
+            return self.get_serializer(page, many=True).data
+        return values_serializer.to_representation(page)
+
+    def queryset_validators(self, queryset: QuerySet) -> tuple[str, datetime.datetime | None]:
+        aggregates = {f'max_{field}': Max(field) for field in self.validator_fields}
+        state = queryset.order_by().aggregate(count=Count('pk'), **aggregates)
+        if self.paginator is not None:
+            self.paginator.known_count = state['count']
+        values = [state[f'max_{field}'] for field in self.validator_fields]
+        return self.make_etag(state['count'], *values), self.latest(values)
+
+    async def aqueryset_validators(self, queryset: QuerySet) -> tuple[str, datetime.datetime | None]:
+        aggregates = {f'max_{field}': Max(field) for field in self.validator_fields}
+        state = await queryset.order_by().aaggregate(count=Count('pk'), **aggregates)
+        if self.paginator is not None:
+            self.paginator.known_count = state['count']
+        values = [state[f'max_{field}'] for field in self.validator_fields]
+        return self.make_etag(state['count'], *values), self.latest(values)
+
+    def page_validators(self, page: list) -> tuple[str, datetime.datetime | None]:
+        if page and isinstance(page[0], dict):
+            values = [row[field] for row in page for field in self.validator_fields]
+            pks = [row['pk'] for row in page]
+        else:
+            values = [getattr(instance, field) for instance in page for field in self.validator_fields]
+            pks = [instance.pk for instance in page]
+        return self.make_etag(*pks, *values, self.paginator.has_next), self.latest(values)
+
+    def instance_validators(self, instance, *extra) -> tuple[str, datetime.datetime | None]:
+        values = [getattr(instance, field) for field in self.validator_fields]
+        return self.make_etag(instance.pk, *values, *extra), self.latest(values)
+
+    def make_etag(self, *parts) -> str:
+        key = '|'.join(map(str, (self.request.get_full_path(), self.request.accepted_media_type, *parts)))
+        return quote_etag(hashlib.md5(key.encode()).hexdigest())
+
+    def conditional_response(self, etag: str, last_modified: datetime.datetime | None = None) -> HttpResponse | None:
+        timestamp = last_modified and int(last_modified.timestamp())
+        response = get_conditional_response(self.request, etag=etag, last_modified=timestamp)
+        if response is not None:
+            response['ETag'] = etag
+        return response
+
+    def add_validators(self, response: HttpResponse, etag: str, last_modified: datetime.datetime | None) -> HttpResponse:
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    @staticmethod
+    def latest(values: list) -> datetime.datetime | None:
+        values = [value for value in values if value is not None]
+        return max(values) if values else None
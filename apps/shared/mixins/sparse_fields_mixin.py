@@ -0,0 +1,94 @@
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from apps.shared.pagination import KeysetPagination
+from apps.shared.serializers.values_serializer import source_field
+
+FIELDS_QUERY_PARAM = 'fields'
+OMIT_QUERY_PARAM = 'omit'
+
+
+def sparse_fields_parameters(serializer_class: type[serializers.Serializer]) -> list[OpenApiParameter]:
+    names = [name for name, field in serializer_class().fields.items() if not field.write_only]
+    schema = {'type': 'array', 'items': {'type': 'string', 'enum': names}}
+    return [
+        OpenApiParameter(
+            name=FIELDS_QUERY_PARAM, required=False, type=schema, style='form', explode=False,
+            description='Comma separated fields to return, all by default',
+        ),
+        OpenApiParameter(
+            name=OMIT_QUERY_PARAM, required=False, type=schema, style='form', explode=False,
+            description='Comma separated fields to leave out',
+        ),
+    ]
+
+
+class SparseFieldsMixin:
+    """
+    ``?fields=id,start_waiting`` and ``?omit=description`` on the actions in
+    ``sparse_fields_actions``.
+
+    Both the serializer and the SQL are trimmed: the queryset loads only the
+    columns of the remaining fields plus the primary key, the
+    ``validator_fields``, the ``object_fields`` of the permission classes and
+    the keyset ordering. Unknown field names are rejected with 400, after
+    authentication and permissions.
+    """
+    sparse_fields_actions: tuple[str, ...] = ('list', 'retrieve')
+    sparse_fields: list[str] | None = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.sparse_fields = self.get_sparse_fields()
+
+    def get_sparse_fields(self) -> list[str] | None:
+        params = self.request.query_params
+        if self.action not in self.sparse_fields_actions or not (
+            params.get(FIELDS_QUERY_PARAM) or params.get(OMIT_QUERY_PARAM)
+        ):
+            return None
+        available = [name for name, field in self.get_serializer_class()().fields.items() if not field.write_only]
+        requested = {param: self.split_fields(params.get(param)) for param in (FIELDS_QUERY_PARAM, OMIT_QUERY_PARAM)}
+        errors = {
+            param: [f'Unknown field: {name}.' for name in names if name not in available]
+            for param, names in requested.items()
+        }
+        if errors := {param: messages for param, messages in errors.items() if messages}:
+            raise ValidationError(errors)
+        selected = requested[FIELDS_QUERY_PARAM] or available
+        return [name for name in available if name in selected and name not in requested[OMIT_QUERY_PARAM]]
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.sparse_fields is not None:
+            fields = getattr(serializer, 'child', serializer).fields
+            for name in list(fields):
+                if name not in self.sparse_fields:
+                    fields.pop(name)
+        return serializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.sparse_fields is not None and (columns := self.sparse_columns(queryset.model)):
+            queryset = queryset.only(*columns)
+        return queryset
+
+    def sparse_columns(self, model) -> list[str] | None:
+        # None when a field does not map to a column, the queryset is not trimmed then
+        opts = model._meta
+        fields = self.get_serializer_class()().fields
+        columns = [opts.pk.name, *getattr(self, 'validator_fields', ())]
+        for permission in self.get_permissions():
+            columns += getattr(permission, 'object_fields', ())
+        if isinstance(self.paginator, KeysetPagination):
+            columns += self.paginator.ordering
+        for name in self.sparse_fields:
+            if (model_field := source_field(opts, fields[name])) is None:
+                return None
+            columns.append(model_field.name)
+        return list(dict.fromkeys(columns))
+
+    @staticmethod
+    def split_fields(value: str | None) -> list[str]:
+        return [name.strip() for name in (value or '').split(',') if name.strip()]
@@ -0,0 +1,2 @@
+from apps.shared.pagination.keyset_pagination import KeysetPagination
+from apps.shared.pagination.limit_offset_pagination import LimitOffsetPagination
\ No newline at end of file
@@ -0,0 +1,141 @@
+import contextlib
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Seek based pagination on a unique ordering, e.g. ``('start_waiting', 'id')``.
+
+    Every page is fetched with ``WHERE (a, b) > (:a, :b) ORDER BY a, b LIMIT n``,
+    so the cost of a page does not depend on how deep it is. The total count
+    is only computed when ``?count=true`` is passed.
+    """
+    ordering: tuple[str, ...] = ()
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+    known_count: int | None = None
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> list:
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.count = self.get_count(queryset) if self.include_count(request) else None
+        queryset = self.seek(queryset.order_by(*self.ordering), self.decode_cursor(request, queryset))
+        results = list(queryset[:self.limit + 1])
+        self.has_next = len(results) > self.limit
+        results = results[:self.limit]
+        self.last_position = self.get_position(results[-1]) if results else None
+        return results
+
+    async def apaginate_queryset(self, queryset: QuerySet, request, view=None) -> list:
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.count = await self.aget_count(queryset) if self.include_count(request) else None
+        queryset = self.seek(queryset.order_by(*self.ordering), self.decode_cursor(request, queryset))
+        results = [instance async for instance in queryset[:self.limit + 1]]
+        self.has_next = len(results) > self.limit
+        results = results[:self.limit]
+        self.last_position = self.get_position(results[-1]) if results else None
+        return results
+
+    def get_paginated_response(self, data) -> Response:
+        response = {
+            'next': self.get_next_link(),
+            'results': data,
+        }
+        if self.count is not None:
+            response = {'count': self.count, **response}
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {
+                    'type': 'integer',
+                    'example': 123,
+                },
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                    'example': f'http://api.example.org/accounts/?{self.cursor_query_param}=eyJ...',
+                },
+                'results': schema,
+            },
+        }
+
+    def get_limit(self, request) -> int:
+        with contextlib.suppress(KeyError, ValueError):
+            limit = int(request.query_params[self.limit_query_param])
+            if limit > 0:
+                return min(limit, self.max_page_size)
+        return self.page_size
+
+    def get_count(self, queryset: QuerySet) -> int:
+        if self.known_count is not None:
+            return self.known_count
+        return queryset.count()
+
+    async def aget_count(self, queryset: QuerySet) -> int:
+        if self.known_count is not None:
+            return self.known_count
+        return await queryset.acount()
+
+    def include_count(self, request) -> bool:
+        return request.query_params.get(self.count_query_param, '').lower() in ('1', 'true')
+
+    def get_position(self, instance) -> list:
+        if isinstance(instance, dict):
+            # a row of a values() queryset
+            return [instance[field] for field in self.ordering]
+        return [getattr(instance, field) for field in self.ordering]
+
+    def seek(self, queryset: QuerySet, position: list | None) -> QuerySet:
+        if position is None:
+            return queryset
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            step = Q(**{f'{field}__gt': position[index]})
+            for previous_index, previous_field in enumerate(self.ordering[:index]):
+                step &= Q(**{previous_field: position[previous_index]})
+            condition |= step
+        return queryset.filter(condition)
+
+    def encode_cursor(self, position: list) -> str:
+        payload = json.dumps(position, default=str, separators=(',', ':'))
+        return urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request, queryset: QuerySet) -> list | None:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4))
+            values = json.loads(payload)
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError(values)
+            opts = queryset.model._meta
+            return [opts.get_field(field).to_python(value) for field, value in zip(self.ordering, values)]
+        except (ValueError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.count_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.last_position))
@@ -0,0 +1,26 @@
+from rest_framework import pagination
+
+
+class LimitOffsetPagination(pagination.LimitOffsetPagination):
+    known_count: int | None = None
+
+    def get_count(self, queryset) -> int:
+        if self.known_count is not None:
+            return self.known_count
+        return super().get_count(queryset)
+
+    async def apaginate_queryset(self, queryset, request, view=None) -> list | None:
+        # same as paginate_queryset, on the async ORM
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count = self.known_count if self.known_count is not None else await queryset.acount()
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return [instance async for instance in queryset[self.offset:self.offset + self.limit]]
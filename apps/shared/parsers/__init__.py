@@ -0,0 +1 @@
+from apps.shared.parsers.fast_json_parser import FastJSONParser
@@ -0,0 +1 @@
+from apps.shared.renderers.fast_json_renderer import FastJSONRenderer
@@ -0,0 +1 @@
+from apps.shared.serializers.values_serializer import ValuesSerializer
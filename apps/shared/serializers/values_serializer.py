@@ -0,0 +1,96 @@
+from typing import Callable, Iterable
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.settings import ISO_8601, api_settings
+
+
+def _datetime_converter(field: serializers.DateTimeField) -> Callable:
+    # DateTimeField.to_representation with the timezone and format resolved once
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        if isinstance(value, str) or value.tzinfo is None:
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+def _converter(field: serializers.Field) -> Callable | None:
+    # None stands for a value that is passed on as it is
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        # the row already holds the related primary key
+        return field.pk_field.to_representation if field.pk_field is not None else None
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_converter(field)
+    if isinstance(field, serializers.UUIDField) and field.uuid_format == 'hex_verbose':
+        return str
+    if type(field) is serializers.CharField:
+        return str
+    if type(field) is serializers.IntegerField:
+        return int
+    return field.to_representation
+
+
+def source_field(opts, field: serializers.Field):
+    # the concrete model field a serializer field reads as it is, if any
+    if len(field.source_attrs) != 1 or isinstance(field, (serializers.BaseSerializer, serializers.ManyRelatedField)):
+        return None
+    try:
+        model_field = opts.get_field(field.source)
+    except FieldDoesNotExist:
+        return None
+    if not model_field.concrete or model_field.many_to_many:
+        return None
+    return model_field
+
+
+class ValuesSerializer:
+    """
+    Read-only twin of a flat ``ModelSerializer`` on ``queryset.values()`` rows.
+
+    Every field is compiled once into the column it reads and a converter,
+    so a page is serialized without model instances and field lookups per
+    row, into exactly the same data as ``serializer.data``. ``compile``
+    returns ``None`` for serializers it cannot reproduce, e.g. nested or
+    method fields, many to many relations or an own ``to_representation``.
+    """
+
+    def __init__(self, fields: list[tuple[str, str, Callable | None]]):
+        self.fields = fields
+
+    @classmethod
+    def compile(cls, serializer: serializers.ModelSerializer) -> 'ValuesSerializer | None':
+        if (
+            not isinstance(serializer, serializers.ModelSerializer)
+            or type(serializer).to_representation is not serializers.Serializer.to_representation
+        ):
+            return None
+        opts = serializer.Meta.model._meta
+        fields = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if (model_field := source_field(opts, field)) is None:
+                return None
+            fields.append((name, model_field.attname, _converter(field)))
+        return cls(fields)
+
+    @property
+    def columns(self) -> list[str]:
+        return [column for _, column, _ in self.fields]
+
+    def to_representation(self, rows: Iterable[dict]) -> list[dict]:
+        fields = self.fields
+        data = []
+        for row in rows:
+            item = {}
+            for name, column, convert in fields:
+                value = row[column]
+                item[name] = value if value is None or convert is None else convert(value)
+            data.append(item)
+        return data
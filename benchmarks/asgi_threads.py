@@ -0,0 +1,202 @@
+"""
+Thread usage of the async read path under ASGI, measured in process through
+Django's ASGIHandler, i.e. without any server or network in between.
+
+Fires a number of concurrent GET /api/queue-entries/ requests whose view
+first waits for --view-wait seconds without blocking (like awaiting another
+service) and whose queries each take --query-wait seconds longer (like a
+slow database). Reports the wall time of the burst, the peak number of
+threads and the peak number of threads blocked in async_to_sync while it
+runs. Django runs the sync-only parts (sessions, authentication) of every
+async request in a thread of its own, so the number of threads grows with the
+requests either way. A blocked thread is parked until the rest of the request
+is done:
+
+    async views             the middleware of DJANGO_SERVER=asgi
+    async views + WhiteNoise with a sync-only middleware in the chain, which
+                             Django adapts by moving the whole request into
+                             a thread
+
+Runs against a fresh SQLite database in a temporary directory.
+
+    python benchmarks/asgi_threads.py --requests 10 20 40 --view-wait 0.2 --query-wait 0.01
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('DJANGO_DEBUG', 'false')
+os.environ['DJANGO_SERVER'] = 'asgi'
+
+USERNAME = 'benchmark'
+PASSWORD = 'benchmark-password'
+PATH = '/api/queue-entries/'
+WHITENOISE = 'whitenoise.middleware.WhiteNoiseMiddleware'
+
+
+def setup(directory: str) -> str:
+    os.environ['DJANGO_DB_DIR'] = directory
+    import django
+    from django.conf import settings
+
+    settings.LOGGING_CONFIG = None
+    settings.ALLOWED_HOSTS = ['*']
+    settings.METRICS = False
+    django.setup()
+
+    from django.contrib.auth.models import Permission
+    from django.core.management import call_command
+    from django.test import Client
+    from apps.authentication.models import Organization, UserProfile
+    from apps.core.models import Company, Queue, QueueEntry
+
+    call_command('migrate', verbosity=0)
+    organization = Organization.objects.create(name='benchmark')
+    user = UserProfile.objects.create(username=USERNAME, organization=organization)
+    user.set_password(PASSWORD)
+    user.save()
+    user.user_permissions.add(Permission.objects.get(codename='view_queueentry'))
+    company = Company.objects.create(name='benchmark', organization=organization)
+    queue = Queue.objects.create(name='benchmark', company=company)
+    QueueEntry.objects.create_many([{'queue_id': queue.id, 'description': f'Entry {i}'} for i in range(20)])
+    client = Client()
+    client.login(username=USERNAME, password=PASSWORD)
+    return '; '.join(f'{name}={cookie.value}' for name, cookie in client.cookies.items())
+
+
+def slow_down(view_wait: float, query_wait: float) -> None:
+    from django.db.backends.signals import connection_created
+    from apps.core.views import QueueEntryViewSet
+
+    alist = QueueEntryViewSet.alist
+
+    async def slow_alist(self, request, *args, **kwargs):
+        await asyncio.sleep(view_wait)
+        return await alist(self, request, *args, **kwargs)
+
+    def slow_execute(execute, sql, params, many, context):
+        time.sleep(query_wait)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        connection.execute_wrappers.append(slow_execute)
+
+    QueueEntryViewSet.alist = slow_alist
+    connection_created.connect(install, weak=False)
+
+
+async def request(application, cookie: str) -> int:
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': PATH, 'raw_path': PATH.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'testserver'), (b'cookie', cookie.encode())],
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+    }
+    sent = []
+    disconnected = asyncio.Event()
+
+    async def receive():
+        if not sent:
+            sent.append(None)
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    status = []
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+        elif not message.get('more_body'):
+            disconnected.set()
+
+    await application(scope, receive, send)
+    return status[0]
+
+
+def blocked(frame) -> bool:
+    # a thread waiting in async_to_sync for a coroutine of the event loop
+    while frame is not None:
+        if frame.f_code.co_qualname == 'AsyncToSync.__call__':
+            return True
+        frame = frame.f_back
+    return False
+
+
+def run(name: str, middleware: list, cookie: str, requests: int) -> dict:
+    from django.conf import settings
+    from django.core.handlers.asgi import ASGIHandler
+
+    settings.MIDDLEWARE = middleware
+    application = ASGIHandler()
+    peak = threading.active_count()
+    peak_blocked = 0
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak, peak_blocked
+        while not done.wait(0.001):
+            peak = max(peak, threading.active_count())
+            peak_blocked = max(peak_blocked, sum(map(blocked, sys._current_frames().values())))
+
+    async def burst():
+        return await asyncio.gather(*(request(application, cookie) for _ in range(requests)))
+
+    asyncio.run(burst())  # warm up
+    baseline = threading.active_count()
+    sampler = threading.Thread(target=sample)
+    sampler.start()
+    started = time.perf_counter()
+    statuses = asyncio.run(burst())
+    elapsed = time.perf_counter() - started
+    done.set()
+    sampler.join()
+    assert set(statuses) == {200}, statuses
+    return {
+        'middleware': name,
+        'requests': requests,
+        'seconds': elapsed,
+        'extra threads': peak - baseline,
+        'blocked threads': peak_blocked,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, nargs='+', default=[10, 20, 40], help='concurrent requests')
+    parser.add_argument('--view-wait', type=float, default=0.2, help='non-blocking wait in the view, seconds')
+    parser.add_argument('--query-wait', type=float, default=0.01, help='extra time of every query, seconds')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cookie = setup(directory)
+        slow_down(args.view_wait, args.query_wait)
+        from django.conf import settings
+
+        assert WHITENOISE not in settings.MIDDLEWARE
+        security = settings.MIDDLEWARE.index('django.middleware.security.SecurityMiddleware')
+        cases = [
+            ('async views', list(settings.MIDDLEWARE)),
+            ('async views + WhiteNoise', [
+                *settings.MIDDLEWARE[:security + 1], WHITENOISE, *settings.MIDDLEWARE[security + 1:]
+            ]),
+        ]
+        columns = ['middleware', 'requests', 'seconds', 'extra threads', 'blocked threads']
+        print(''.join(f'{column:>26}' for column in columns))
+        for requests in args.requests:
+            for name, middleware in cases:
+                result = run(name, middleware, cookie, requests)
+                print(''.join(
+                    f'{result[column]:>26.2f}' if isinstance(result[column], float) else f'{str(result[column]):>26}'
+                    for column in columns
+                ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Authentication benchmark of GET /api/queue-entries/ through the Django test
+client, i.e. without any server or network in between:
+
+    session         session cookie, the way the browser clients log in
+    token           OAuth2 bearer token through the stock OAuth2Authentication
+    token (cached)  OAuth2 bearer token through CachedOAuth2Authentication
+
+Runs against a fresh SQLite database in a temporary directory.
+
+    python benchmarks/auth.py --requests 2000
+"""
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('DJANGO_DEBUG', 'false')
+
+USERNAME = 'benchmark'
+PASSWORD = 'benchmark-password'
+TOKEN = 'benchmark-token'
+PATH = '/api/queue-entries/'
+
+
+def setup(directory: str) -> None:
+    os.environ['DJANGO_DB_DIR'] = directory
+    import django
+    from django.conf import settings
+
+    settings.LOGGING_CONFIG = None
+    settings.ALLOWED_HOSTS = ['*']
+    django.setup()
+
+    from django.contrib.auth.models import Permission
+    from django.core.management import call_command
+    from django.utils import timezone
+    from oauth2_provider.models import AccessToken, Application
+    from apps.authentication.models import Organization, UserProfile
+    from apps.core.models import Company, Queue, QueueEntry
+
+    call_command('migrate', verbosity=0)
+    organization = Organization.objects.create(name='benchmark')
+    user = UserProfile.objects.create(username=USERNAME, organization=organization)
+    user.set_password(PASSWORD)
+    user.save()
+    user.user_permissions.add(Permission.objects.get(codename='view_queueentry'))
+    company = Company.objects.create(name='benchmark', organization=organization)
+    queue = Queue.objects.create(name='benchmark', company=company)
+    QueueEntry.objects.create_many([{'queue_id': queue.id, 'description': f'Entry {i}'} for i in range(20)])
+    application = Application.objects.create(
+        name='benchmark',
+        client_type=Application.CLIENT_CONFIDENTIAL,
+        authorization_grant_type=Application.GRANT_CLIENT_CREDENTIALS,
+        user=user,
+    )
+    AccessToken.objects.create(
+        user=user, application=application, token=TOKEN,
+        expires=timezone.now() + datetime.timedelta(days=1), scope='read write',
+    )
+
+
+def run(name: str, authentication: str, requests: int) -> dict:
+    from django.db import connection
+    from django.test import Client
+    from django.utils.module_loading import import_string
+    from apps.core.views import QueueEntryViewSet
+
+    client = Client()
+    headers = {}
+    if name == 'session':
+        client.login(username=USERNAME, password=PASSWORD)
+    else:
+        headers['Authorization'] = f'Bearer {TOKEN}'
+    # the view reads its authentication classes once, when it is created
+    QueueEntryViewSet.authentication_classes = [import_string(authentication)]
+    response = client.get(PATH, headers=headers)
+    assert response.status_code == 200, response.content
+    queries = []
+    with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+        client.get(PATH, headers=headers)
+    started = time.perf_counter()
+    for _ in range(requests):
+        client.get(PATH, headers=headers)
+    elapsed = time.perf_counter() - started
+    return {
+        'auth': name,
+        'requests/s': requests / elapsed,
+        'ms/request': elapsed / requests * 1000,
+        'queries': len(queries),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup(directory)
+        columns = ['auth', 'requests/s', 'ms/request', 'queries']
+        print(''.join(f'{column:>16}' for column in columns))
+        for name, authentication in [
+            ('session', 'rest_framework.authentication.SessionAuthentication'),
+            ('token', 'oauth2_provider.contrib.rest_framework.OAuth2Authentication'),
+            ('token (cached)', 'apps.authentication.authentication.CachedOAuth2Authentication'),
+        ]:
+            result = run(name, authentication, args.requests)
+            print(''.join(
+                f'{result[column]:>16.2f}' if isinstance(result[column], float) else f'{str(result[column]):>16}'
+                for column in columns
+            ))
+
+
+if __name__ == '__main__':
+    main()
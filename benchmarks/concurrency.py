@@ -0,0 +1,137 @@
+"""
+Concurrency benchmark of a running deployment.
+
+Opens a number of slow clients, which trickle their request headers one byte
+per second like a client on a bad connection, and measures how many
+requests per second the remaining fast clients still get through.
+
+A sync gunicorn worker is blocked by each slow client, so the default
+deployment (3 workers) stops answering at 3 slow clients. The ASGI deployment
+keeps serving.
+
+    # sync (current default)
+    DJANGO_DEBUG=false gunicorn config.wsgi:application --workers=3 --bind 127.0.0.1:8000
+    # async
+    DJANGO_DEBUG=false DJANGO_SERVER=asgi gunicorn config.asgi:application \\
+        --worker-class=uvicorn.workers.UvicornWorker --workers=3 --bind 127.0.0.1:8000
+
+    python benchmarks/concurrency.py --url http://127.0.0.1:8000 \\
+        --username me --password secret --path /api/queue-entries/ --slow 0 2 3 8 32
+"""
+import argparse
+import http.client
+import http.cookiejar
+import socket
+import statistics
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+
+def login(url: str, username: str, password: str) -> str:
+    jar = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    opener.open(f'{url}/api/auth/csrf/')
+    csrf_token = next(cookie.value for cookie in jar if cookie.name == 'csrftoken')
+    request = urllib.request.Request(
+        f'{url}/api/auth/login/',
+        data=urllib.parse.urlencode({'username': username, 'password': password}).encode(),
+        headers={'X-CSRFToken': csrf_token, 'Referer': url},
+    )
+    opener.open(request)
+    return '; '.join(f'{cookie.name}={cookie.value}' for cookie in jar)
+
+
+def slow_client(host: str, port: int, path: str, stop: threading.Event) -> None:
+    request = f'GET {path} HTTP/1.1\r\nHost: {host}\r\nX-Padding: {"x" * 3600}\r\n\r\n'.encode()
+    try:
+        with socket.create_connection((host, port), timeout=5) as connection:
+            for byte in request:
+                if stop.wait(1):
+                    return
+                connection.sendall(bytes([byte]))
+    except OSError:
+        pass
+
+
+def fast_client(host: str, port: int, path: str, headers: dict, timeout: float, deadline: float,
+                latencies: list, errors: list) -> None:
+    while time.monotonic() < deadline:
+        started = time.monotonic()
+        try:
+            connection = http.client.HTTPConnection(host, port, timeout=timeout)
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            connection.close()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+            latencies.append(time.monotonic() - started)
+        except OSError as exc:
+            errors.append(type(exc).__name__)
+
+
+def run(url: str, path: str, headers: dict, slow: int, concurrency: int, duration: float, timeout: float) -> dict:
+    parsed = urllib.parse.urlsplit(url)
+    host, port = parsed.hostname, parsed.port or 80
+    stop = threading.Event()
+    slow_threads = [
+        threading.Thread(target=slow_client, args=(host, port, path, stop), daemon=True)
+        for _ in range(slow)
+    ]
+    for thread in slow_threads:
+        thread.start()
+    time.sleep(1)
+
+    latencies, errors = [], []
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=fast_client, args=(host, port, path, headers, timeout, deadline, latencies, errors))
+        for _ in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stop.set()
+
+    latencies.sort()
+    return {
+        'slow': slow,
+        'requests/s': len(latencies) / duration,
+        'p50 ms': statistics.median(latencies) * 1000 if latencies else None,
+        'p95 ms': latencies[int(len(latencies) * 0.95)] * 1000 if latencies else None,
+        'errors': len(errors),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--path', default='/api/queue-entries/')
+    parser.add_argument('--username')
+    parser.add_argument('--password')
+    parser.add_argument('--slow', type=int, nargs='+', default=[0, 1, 2, 3, 8, 32], help='numbers of slow clients')
+    parser.add_argument('--concurrency', type=int, default=8, help='number of fast clients')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--timeout', type=float, default=5)
+    args = parser.parse_args()
+
+    headers = {}
+    if args.username:
+        headers['Cookie'] = login(args.url, args.username, args.password)
+
+    columns = ['slow', 'requests/s', 'p50 ms', 'p95 ms', 'errors']
+    print(''.join(f'{column:>12}' for column in columns))
+    for slow in args.slow:
+        result = run(args.url, args.path, headers, slow, args.concurrency, args.duration, args.timeout)
+        print(''.join(
+            f'{result[column]:>12.1f}' if isinstance(result[column], float) else f'{str(result[column]):>12}'
+            for column in columns
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Micro-benchmark of the JSON renderer and parser on a page of 1,000 queue
+entries as produced by QueueEntrySerializer, without any database.
+
+    python benchmarks/json_render.py --entries 1000 --repeat 200
+"""
+import argparse
+import datetime
+import io
+import os
+import sys
+import timeit
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('DJANGO_DEBUG', 'false')
+
+
+def page(entries: int) -> dict:
+    from django.utils import timezone
+    from apps.core.models import QueueEntry
+    from apps.core.serializers.queue_entry_serializyer import QueueEntrySerializer
+
+    now = timezone.now()
+    instances = [
+        QueueEntry(
+            id=uuid.uuid4(), queue_id=1, description=f'Customer {i}',
+            start_waiting=now - datetime.timedelta(minutes=i), end_waiting=now if i % 2 else None,
+            created_at=now, created_by='desk', updated_at=now, updated_by='desk',
+        )
+        for i in range(entries)
+    ]
+    return {'count': entries, 'next': None, 'previous': None, 'results': QueueEntrySerializer(instances, many=True).data}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    import django
+    django.setup()
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from apps.shared.parsers import FastJSONParser
+    from apps.shared.renderers import FastJSONRenderer
+
+    data = page(args.entries)
+    body = JSONRenderer().render(data)
+    assert FastJSONRenderer().render(data) == body
+    print(f'{args.entries} entries, {len(body) / 1024:.0f} KiB')
+    print(f'{"":>24}{"ms/page":>12}{"speedup":>12}')
+    for name, slow, fast in [
+        ('render', lambda: JSONRenderer().render(data), lambda: FastJSONRenderer().render(data)),
+        ('parse', lambda: JSONParser().parse(io.BytesIO(body)), lambda: FastJSONParser().parse(io.BytesIO(body))),
+    ]:
+        slow_ms = min(timeit.repeat(slow, number=args.repeat, repeat=3)) / args.repeat * 1000
+        fast_ms = min(timeit.repeat(fast, number=args.repeat, repeat=3)) / args.repeat * 1000
+        print(f'{name + " (stdlib)":>24}{slow_ms:>12.3f}')
+        print(f'{name + " (orjson)":>24}{fast_ms:>12.3f}{slow_ms / fast_ms:>11.1f}x')
+
+
+if __name__ == '__main__':
+    main()
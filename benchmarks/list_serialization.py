@@ -0,0 +1,118 @@
+"""
+Serialization benchmark of a queue entry list page, from the queryset to the
+data handed to the renderer:
+
+    instances   model instances through QueueEntrySerializer, as before
+    values      values() rows through the compiled ValuesSerializer
+
+Both produce the same data, which is checked before timing. Reports the time
+and the peak of traced memory per page and per row. Runs against a fresh
+SQLite database in a temporary directory.
+
+    python benchmarks/list_serialization.py --rows 1000 10000 100000
+"""
+import argparse
+import datetime
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('DJANGO_DEBUG', 'false')
+
+
+def setup(directory: str, rows: int) -> int:
+    os.environ['DJANGO_DB_DIR'] = directory
+    import django
+    from django.conf import settings
+
+    settings.LOGGING_CONFIG = None
+    django.setup()
+
+    from django.core.management import call_command
+    from django.utils import timezone
+    from apps.authentication.models import Organization
+    from apps.core.models import Company, Queue, QueueEntry
+
+    call_command('migrate', verbosity=0)
+    organization = Organization.objects.create(name='benchmark')
+    company = Company.objects.create(name='benchmark', organization=organization)
+    queue = Queue.objects.create(name='benchmark', company=company)
+    now = timezone.now()
+    QueueEntry.objects.bulk_create([
+        QueueEntry(
+            id=uuid.uuid4(), queue_id=queue.id, organization_id=organization.id, description=f'Customer {i}',
+            start_waiting=now - datetime.timedelta(seconds=i), end_waiting=now if i % 2 else None,
+            created_by='desk', updated_by='desk',
+        )
+        for i in range(rows)
+    ], batch_size=2000)
+    return queue.id
+
+
+def paths(rows: int) -> dict:
+    from apps.core.models import QueueEntry
+    from apps.core.serializers.queue_entry_serializyer import QueueEntrySerializer
+    from apps.shared.serializers import ValuesSerializer
+
+    queryset = QueueEntry.objects.order_by('start_waiting', 'id')
+    values_serializer = ValuesSerializer.compile(QueueEntrySerializer())
+    return {
+        'instances': lambda: QueueEntrySerializer(list(queryset[:rows]), many=True).data,
+        'values': lambda: values_serializer.to_representation(
+            list(queryset.values('pk', *values_serializer.columns)[:rows])
+        ),
+    }
+
+
+def measure(page, repeat: int) -> tuple[float, int]:
+    gc.collect()
+    elapsed = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        page()
+        elapsed.append(time.perf_counter() - started)
+    gc.collect()
+    tracemalloc.start()
+    page()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(elapsed), peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000], help='page sizes')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup(directory, max(args.rows))
+        columns = ['rows', 'path', 'ms/page', 'us/row', 'peak MiB', 'bytes/row']
+        print(''.join(f'{column:>12}' for column in columns))
+        for rows in args.rows:
+            pages = paths(rows)
+            assert list(pages['instances']()) == pages['values']()
+            for name, page in pages.items():
+                seconds, peak = measure(page, args.repeat)
+                result = {
+                    'rows': rows,
+                    'path': name,
+                    'ms/page': seconds * 1000,
+                    'us/row': seconds / rows * 1e6,
+                    'peak MiB': peak / 2 ** 20,
+                    'bytes/row': peak // rows,
+                }
+                print(''.join(
+                    f'{result[column]:>12.2f}' if isinstance(result[column], float) else f'{str(result[column]):>12}'
+                    for column in columns
+                ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Write burst benchmark of the SQLite database profile.
+
+Starts a number of worker processes, like gunicorn workers, which each
+create and close queue entries as fast as they can while reading the open
+entries of their queue inside the same transaction. Reports the throughput
+and the "database is locked" error rate of:
+
+    plain   Django's sqlite3 backend without options: rollback journal,
+            deferred transactions and the default 5s busy timeout
+    tuned   the profile of config/settings.py: WAL, synchronous=NORMAL,
+            BEGIN IMMEDIATE and retries of locked statements
+
+Every profile runs against a fresh database in a temporary directory.
+
+    python benchmarks/sqlite_locking.py --workers 3 6 12 --duration 10
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('DJANGO_DEBUG', 'false')
+
+PROFILES = ('plain', 'tuned')
+
+
+def setup(profile: str, directory: str) -> None:
+    os.environ['DJANGO_DB_DIR'] = directory
+    import django
+    from django.conf import settings
+
+    if profile == 'plain':
+        settings.DATABASES['default'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(directory, 'db.sqlite3'),
+        }
+    settings.LOGGING_CONFIG = None
+    django.setup()
+
+
+def prepare(profile: str, directory: str) -> int:
+    setup(profile, directory)
+    from django.core.management import call_command
+    from apps.authentication.models import Organization
+    from apps.core.models import Company, Queue
+
+    call_command('migrate', verbosity=0)
+    organization = Organization.objects.create(name='benchmark')
+    company = Company.objects.create(name='benchmark', organization=organization)
+    return Queue.objects.create(name='benchmark', company=company).id
+
+
+def work(profile: str, directory: str, queue_id: int, duration: float, results) -> None:
+    setup(profile, directory)
+    from django.db import OperationalError, transaction
+    from django.utils import timezone
+    from apps.core.models import QueueEntry
+
+    done, errors = 0, 0
+    deadline = time.time() + duration
+    while time.time() < deadline:
+        try:
+            with transaction.atomic():
+                QueueEntry.objects.filter(queue_id=queue_id, end_waiting__isnull=True).count()
+                entry = QueueEntry.objects.create(queue_id=queue_id, description='benchmark')
+            entry.end_waiting = timezone.now()
+            entry.save()
+            done += 1
+        except OperationalError:
+            errors += 1
+    results.put((done, errors))
+
+
+def run(profile: str, workers: int, duration: float) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(1) as pool:
+            queue_id = pool.apply(prepare, (profile, directory))
+        results = context.Queue()
+        processes = [
+            context.Process(target=work, args=(profile, directory, queue_id, duration, results))
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        counts = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+    done = sum(count[0] for count in counts)
+    errors = sum(count[1] for count in counts)
+    return {
+        'profile': profile,
+        'workers': workers,
+        'writes/s': done / duration,
+        'errors': errors,
+        'error %': 100 * errors / (done + errors) if done + errors else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profile', choices=PROFILES, nargs='+', default=list(PROFILES))
+    parser.add_argument('--workers', type=int, nargs='+', default=[3, 6, 12], help='numbers of worker processes')
+    parser.add_argument('--duration', type=float, default=10)
+    args = parser.parse_args()
+
+    columns = ['profile', 'workers', 'writes/s', 'errors', 'error %']
+    print(''.join(f'{column:>12}' for column in columns))
+    for workers in args.workers:
+        for profile in args.profile:
+            result = run(profile, workers, args.duration)
+            print(''.join(
+                f'{result[column]:>12.1f}' if isinstance(result[column], float) else f'{str(result[column]):>12}'
+                for column in columns
+            ))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,26 +1,49 @@
-import threading
+from contextvars import ContextVar
 
-from django.contrib.auth.middleware import get_user
-from django.utils.deprecation import MiddlewareMixin
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import HttpRequest
 
 
-class ThreadLocalMiddleware(MiddlewareMixin):
-    def process_request(self, request):
-        set_current_user(request)
+class ThreadLocalMiddleware:
+    """
+    Makes the current request available to code without access to it, like
+    AuditableModel.save. The request lives in a ContextVar, so concurrent
+    requests of an ASGI worker never see each other.
+    """
+    sync_capable = True
+    async_capable = True
 
-    def process_response(self, request, response):
-        _thread_locals.__dict__.clear()
-        return response
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = _current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _current_request.reset(token)
 
-_thread_locals = threading.local()
+    async def __acall__(self, request):
+        token = _current_request.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            _current_request.reset(token)
 
 
-def get_current_user():
-    if hasattr(_thread_locals, 'cached_request'):
-        return get_user(_thread_locals.cached_request)
-    return None
+_current_request: ContextVar[HttpRequest | None] = ContextVar('current_request', default=None)
+
 
+def get_current_user():
+    # request.user is resolved once per request by the AuthenticationMiddleware
+    # and replaced by DRF with the user of the token, if any.
+    request = _current_request.get()
+    if request is None:
+        return None
+    return request.user
 
-def set_current_user(request):
-    _thread_locals.cached_request = request
@@ -3,10 +3,14 @@ from django.urls import path, include
 from drf_spectacular.views import SpectacularRedocView, SpectacularAPIView
 from django.views.generic import RedirectView
 
+from apps.shared.metrics import MetricsView
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('apps.authentication.urls')),
+    path('api/oauth/', include('oauth2_provider.urls', namespace='oauth2_provider')),
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
     path('api/', include('apps.core.urls')),
 
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
@@ -1,5 +1,17 @@
 #!/bin/sh
 
-python ./manage.py migrate
-python ./manage.py collectstatic --no-input -c
-gunicorn config.wsgi:application --workers=3 --bind 0.0.0.0:8000
\ No newline at end of file
+if [ "${DJANGO_MIGRATE:-true}" = "true" ]; then
+    python ./manage.py migrate
+    python ./manage.py collectstatic --no-input -c
+fi
+
+# every worker writes its metrics to its own files in there
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/metrics}
+rm -rf "${PROMETHEUS_MULTIPROC_DIR}"
+mkdir -p "${PROMETHEUS_MULTIPROC_DIR}"
+
+if [ "${DJANGO_SERVER:-wsgi}" = "asgi" ]; then
+    gunicorn config.asgi:application --worker-class=uvicorn.workers.UvicornWorker --workers=${GUNICORN_WORKERS:-3} --bind 0.0.0.0:8000
+else
+    gunicorn config.wsgi:application --workers=3 --bind 0.0.0.0:8000
+fi
\ No newline at end of file